@@ -0,0 +1,54 @@
+"""
+Shared fixtures for the pfp benchmark suite.
+
+Fixtures are generated once per session from ``pfp.synthetic`` and cached
+under pytest's temporary directory.
+"""
+import pytest
+
+from pfp import synthetic
+
+pytest.importorskip("pytest_benchmark")
+
+# Appendix sizes (pages) timed by the PDF-level benchmarks.
+PDF_SIZES = [10, 50, pytest.param(200, marks=pytest.mark.slow)]
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: large fixture sizes (deselect with -m 'not slow')")
+
+
+@pytest.fixture(scope="session")
+def pdf_factory(tmp_path_factory):
+    """Return a function that writes (and caches) a synthetic CEI PDF."""
+    root = tmp_path_factory.mktemp("cei_pdfs")
+    cache = {}
+
+    def make(n_pages, columns=1, image_only=False, ruled=False):
+        key = (n_pages, columns, image_only, ruled)
+        if key not in cache:
+            kind = "image" if image_only else ("ruled" if ruled else "text")
+            path = root / f"CEI-2019-{kind}-{columns}col-{n_pages}p.pdf"
+            labels = synthetic.write_cei_pdf(
+                str(path), n_pages, columns=columns, image_only=image_only, ruled=ruled
+            )
+            cache[key] = (str(path), labels)
+        return cache[key]
+
+    return make
+
+
+@pytest.fixture(scope="session")
+def price_csv_factory(tmp_path_factory):
+    """Return a function that writes (and caches) a synthetic daily price file."""
+    root = tmp_path_factory.mktemp("prices")
+    cache = {}
+
+    def make(n_firms, n_days):
+        key = (n_firms, n_days)
+        if key not in cache:
+            path = root / f"prices_{n_firms}x{n_days}.csv"
+            cache[key] = synthetic.make_price_csv(str(path), n_firms, n_days)
+        return cache[key]
+
+    return make
@@ -0,0 +1,51 @@
+"""
+Benchmarks for the PDF-level extraction entry points.
+"""
+import pytest
+
+from conftest import PDF_SIZES
+
+pytest.importorskip("camelot")
+
+from pfp.cei_improved_extractor import extract_cei_data_improved  # noqa: E402
+from pfp.comprehensive_cei_extractor import extract_cei_comprehensive  # noqa: E402
+
+
+@pytest.mark.parametrize("n_pages", PDF_SIZES)
+@pytest.mark.parametrize("columns", [1, 2])
+def test_extract_cei_comprehensive(benchmark, pdf_factory, n_pages, columns):
+    pdf_path, labels = pdf_factory(n_pages, columns=columns)
+
+    result = benchmark.pedantic(extract_cei_comprehensive, args=(pdf_path, 2019), rounds=1, iterations=1)
+
+    assert len(result) > 0
+
+
+@pytest.mark.parametrize("n_pages", PDF_SIZES)
+def test_extract_cei_comprehensive_ruled(benchmark, pdf_factory, n_pages):
+    pdf_path, labels = pdf_factory(n_pages, ruled=True)
+
+    result = benchmark.pedantic(extract_cei_comprehensive, args=(pdf_path, 2019), rounds=1, iterations=1)
+
+    assert len(result) > 0
+
+
+@pytest.mark.parametrize("n_pages", PDF_SIZES)
+@pytest.mark.parametrize("columns", [1, 2])
+def test_extract_cei_data_improved(benchmark, pdf_factory, n_pages, columns):
+    pdf_path, labels = pdf_factory(n_pages, columns=columns)
+
+    result = benchmark.pedantic(extract_cei_data_improved, args=(pdf_path, 2019), rounds=1, iterations=1)
+
+    assert len(result) > 0
+
+
+@pytest.mark.parametrize("n_pages", [10, 50])
+def test_extract_cei_comprehensive_image_only(benchmark, pdf_factory, n_pages):
+    # Image-only reports have no text layer; this times the cost of every
+    # camelot strategy coming back empty before OCR takes over.
+    pdf_path, labels = pdf_factory(n_pages, image_only=True)
+
+    result = benchmark.pedantic(extract_cei_comprehensive, args=(pdf_path, 2019), rounds=1, iterations=1)
+
+    assert result.empty
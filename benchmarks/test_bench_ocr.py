@@ -0,0 +1,52 @@
+"""
+Benchmarks for the OCR path against a stub OCR backend.
+
+Rasterization and tesseract are replaced by stubs that hand back
+pre-generated page text, so these time the pipeline around OCR (page loop,
+text parsing, filtering and frame construction) independently of the
+tesseract install.
+"""
+import pytest
+
+from pfp import ocr_cei_extractor, synthetic
+from pfp.ocr_cei_extractor import _parse_cei_text, ocr_extract_cei_data
+
+ROWS_PER_PAGE = 40
+
+
+def _stub_ocr_backend(monkeypatch, n_pages, year):
+    text, labels = synthetic.make_ocr_text(n_pages * ROWS_PER_PAGE, noise=0.1)
+    lines = text.split("\n")
+    page_text = [
+        "\n".join(lines[i:i + ROWS_PER_PAGE]) for i in range(0, len(lines), ROWS_PER_PAGE)
+    ]
+    start, _ = ocr_cei_extractor._page_range(year)
+
+    def convert_from_path(pdf_path, first_page=1, last_page=None, dpi=200, **kwargs):
+        return [p - start for p in range(first_page, last_page + 1) if 0 <= p - start < len(page_text)]
+
+    def image_to_string(page, config=""):
+        return page_text[page]
+
+    monkeypatch.setattr(ocr_cei_extractor, "_convert_from_path", convert_from_path)
+    monkeypatch.setattr(ocr_cei_extractor, "_image_to_string", image_to_string)
+
+
+@pytest.mark.parametrize("n_pages", [10, 40])
+@pytest.mark.parametrize("year", [2008, 2012, 2019])
+def test_ocr_extract_cei_data_stub_backend(benchmark, monkeypatch, n_pages, year):
+    _stub_ocr_backend(monkeypatch, n_pages, year)
+
+    result = benchmark(ocr_extract_cei_data, "CEI-stub.pdf", year)
+
+    assert len(result) > 0
+
+
+@pytest.mark.parametrize("n_companies", [400, 2000, 8000])
+@pytest.mark.parametrize("year", [2008, 2012, 2019])
+def test_parse_cei_text(benchmark, n_companies, year):
+    text, labels = synthetic.make_ocr_text(n_companies)
+
+    result = benchmark(_parse_cei_text, text, year)
+
+    assert len(result) > 0
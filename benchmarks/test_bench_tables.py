@@ -0,0 +1,29 @@
+"""
+Benchmarks for table-level heuristics and chunked CSV loading.
+"""
+import pytest
+
+from pfp import synthetic
+from pfp.comprehensive_cei_extractor import _extract_companies_comprehensive
+from pfp.utils import load_date_range_rows
+
+
+@pytest.mark.parametrize("n_rows", [50, 500, 2000])
+@pytest.mark.parametrize("n_cols", [2, 6, 12])
+def test_extract_companies_comprehensive(benchmark, n_rows, n_cols):
+    table = synthetic.make_score_table(n_rows, n_cols)
+
+    result = benchmark(_extract_companies_comprehensive, table, 2019)
+
+    assert len(result) > 0
+
+
+@pytest.mark.parametrize("n_firms", [100, 1000])
+def test_load_date_range_rows(benchmark, price_csv_factory, n_firms):
+    csv_path = price_csv_factory(n_firms, 250)
+
+    result = benchmark.pedantic(
+        load_date_range_rows, args=(csv_path, "2015-06-01", "2015-06-30"), rounds=3, iterations=1
+    )
+
+    assert len(result) == n_firms * 22  # business days in June 2015
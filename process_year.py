@@ -7,11 +7,13 @@ import sys
 import os
 sys.path.append('src')
 
-from src.pfp.comprehensive_cei_extractor import extract_cei_comprehensive
+from src.pfp.profiling import enable_profiling, write_trace
 import logging
 
 def process_single_year(year):
     """Process a single year."""
+    from src.pfp.comprehensive_cei_extractor import extract_cei_comprehensive
+
     logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
     
     cei_folder = "/Users/guy/Projects/noni/pfp/data/raw/CEI"
@@ -50,10 +52,15 @@ def process_single_year(year):
     return True
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python process_year.py YEAR")
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python process_year.py YEAR [TRACE_FILE]")
         sys.exit(1)
     
     year = int(sys.argv[1])
+    trace_file = sys.argv[2] if len(sys.argv) == 3 else None
+    if trace_file:
+        enable_profiling()
     success = process_single_year(year)
+    if trace_file:
+        print(f"Trace written to {write_trace(trace_file)}")
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -9,11 +9,14 @@ sys.path.append('src')
 
 import logging
 import re
-import camelot
-import pandas as pd
 
 def quick_extract_year(year):
     """Quick extraction for a single year."""
+    import camelot
+    import pandas as pd
+
+    from pfp.merge import RowMerger
+
     cei_folder = "/Users/guy/Projects/noni/pfp/data/raw/CEI"
     output_folder = "/Users/guy/Projects/noni/pfp/data/processed/cei"
     
@@ -45,8 +48,8 @@ def quick_extract_year(year):
             print(f"No tables found in {pdf_path}")
             return False
         
-        # Process tables to find company data
-        all_data = []
+        # Process tables to find company data, merging on normalized names
+        merger = RowMerger()
         for table in tables:
             df = table.df
             if df.empty or df.shape[1] < 2:
@@ -89,16 +92,14 @@ def quick_extract_year(year):
             result_df = result_df[~result_df['Company'].str.match(r'^\d+\.?\d*$', na=False)]
             
             if len(result_df) > 5:  # Only keep if we have reasonable amount
-                all_data.append(result_df)
+                # Tables with a larger share of valid scores win conflicts
+                merger.add_frame(result_df, confidence=len(result_df) / len(df))
         
-        if not all_data:
+        if not len(merger):
             print(f"No valid data found for year {year}")
             return False
         
-        # Combine and clean
-        final_df = pd.concat(all_data, ignore_index=True)
-        final_df = final_df.drop_duplicates(subset=['Company'])
-        final_df['Year'] = year
+        final_df = merger.to_frame(year=year)
         
         # Save
         os.makedirs(output_folder, exist_ok=True)
@@ -0,0 +1,408 @@
+"""
+Event-study helpers for CEI scores and stock returns around release dates.
+
+``ReturnCube`` holds sufficient statistics (count, sum, sum of squares) of
+daily returns over year x integer CEI score x day from release, built in one
+vectorized pass over the firm-day panel. Score bins, all-year roll-ups,
+cumulative returns and standard errors are then computed from the cube
+without touching the panel again.
+"""
+
+from typing import List, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+# Upper-exclusive bin edges: 0-9, 10-19, ..., 90-99 and a separate 100-100.
+SCORE_BIN_EDGES = list(range(10, 101, 10))
+
+
+def score_bin_labels(edges: Sequence[int] = SCORE_BIN_EDGES) -> List[str]:
+    """
+    Labels of the score bins defined by ``edges``.
+
+    Args:
+        edges: Increasing upper-exclusive bin edges; the last edge starts
+            the final bin, which runs to 100
+
+    Returns:
+        Labels such as ['0-9', ..., '90-99', '100-100'].
+    """
+    starts = [0] + list(edges)
+    ends = [edge - 1 for edge in edges] + [100]
+    return [f'{start}-{end}' for start, end in zip(starts, ends)]
+
+
+# Score bin labels in order: 0-9, 10-19, ..., 90-99 and a separate 100-100.
+SCORE_BINS = score_bin_labels()
+
+
+def score_bin_codes(scores, edges: Sequence[int] = SCORE_BIN_EDGES) -> np.ndarray:
+    """
+    Integer bin codes of CEI scores.
+
+    Args:
+        scores: Array-like of scores
+        edges: Upper-exclusive bin edges (default: tens with a 100-only bin)
+
+    Returns:
+        int8 array of indexes into ``score_bin_labels(edges)``; -1 where the
+        score is missing or outside 0-100.
+    """
+    scores = np.asarray(scores, dtype='float64')
+    codes = np.digitize(scores, edges)
+    return np.where((scores >= 0) & (scores <= 100), codes, -1).astype('int8')
+
+
+def add_score_bins(df: pd.DataFrame, score_col: str = 'cei_score') -> pd.DataFrame:
+    """
+    Add a 'score_bin' label column (0-9, 10-19, ..., 90-99, 100-100).
+
+    Args:
+        df: DataFrame with a CEI score column
+        score_col: Name of the score column
+
+    Returns:
+        Copy of ``df`` with 'score_bin' as an ordered categorical over
+        ``SCORE_BINS`` (missing where the score is missing or out of range).
+    """
+    df = df.copy()
+    scores = pd.to_numeric(df[score_col], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    df['score_bin'] = pd.Categorical.from_codes(score_bin_codes(scores), categories=SCORE_BINS, ordered=True)
+    return df
+
+
+def cusip6_codes(cusips) -> np.ndarray:
+    """
+    Fixed-width integer codes of 6-character CUSIP issuer prefixes.
+
+    The first six characters are packed big-endian into an integer, so codes
+    sort like the strings and can be used as join keys.
+
+    Args:
+        cusips: Array-like of CUSIPs (8/9 characters) or CUSIP6 strings
+
+    Returns:
+        int64 array of codes; -1 where the CUSIP is missing or shorter than 6.
+    """
+    text = pd.Series(cusips, copy=False).astype('string').str.strip().str.upper()
+    valid = (text.str.len() >= 6).fillna(False).to_numpy(dtype=bool)
+    prefix = np.asarray(text.str[:6].where(valid, '').fillna('').tolist(), dtype='S6')
+    padded = np.zeros(len(prefix), dtype='S8')
+    padded[:] = prefix  # right-padded with two zero bytes
+    codes = (padded.view('>u8') >> 16).astype('int64')
+    codes[~valid] = -1
+    return codes
+
+
+def cusip6_from_codes(codes) -> np.ndarray:
+    """Decode ``cusip6_codes`` back to CUSIP6 strings (None for -1)."""
+    codes = np.asarray(codes, dtype='int64')
+    raw = (np.where(codes < 0, 0, codes).astype('uint64') << np.uint64(16)).astype('>u8').view('S8')
+    return np.where(codes < 0, None, np.char.decode(raw, 'ascii').astype(object))
+
+
+def _join_keys(cusip_codes: np.ndarray, years: np.ndarray) -> np.ndarray:
+    # 48-bit CUSIP6 code and 12 bits of year offset fit in one int64
+    return (cusip_codes << 12) | (np.asarray(years, dtype='int64') - 1900)
+
+
+def attach_release_dates(
+    cei_df: pd.DataFrame,
+    dates_df: pd.DataFrame,
+    year_col: str = 'year',
+) -> pd.DataFrame:
+    """
+    Add the CEI release date of each row's report year.
+
+    Args:
+        cei_df: CEI rows with a report year column
+        dates_df: Release dates with 'Year' and 'Release Date' columns
+        year_col: Report year column of ``cei_df``
+
+    Returns:
+        Copy of ``cei_df`` with 'cei_release_date' (NaT for unknown years).
+    """
+    order = np.argsort(dates_df['Year'].to_numpy(dtype='int64'), kind='stable')
+    years = dates_df['Year'].to_numpy(dtype='int64')[order]
+    release = pd.to_datetime(dates_df['Release Date']).to_numpy()[order]
+
+    wanted = pd.to_numeric(cei_df[year_col], errors='coerce').fillna(-1).to_numpy(dtype='int64')
+    df = cei_df.copy()
+    df['cei_release_date'] = pd.NaT
+    if len(years):
+        pos = np.minimum(np.searchsorted(years, wanted), len(years) - 1)
+        found = years[pos] == wanted
+        df['cei_release_date'] = np.where(found, release[pos], np.datetime64('NaT'))
+    return df
+
+
+def join_cei_to_panel(
+    panel: pd.DataFrame,
+    cei_df: pd.DataFrame,
+    columns: Sequence[str] = ('cei_score', 'score_bin', 'employer'),
+    panel_cusip_col: str = 'cusip6',
+    panel_year_col: str = 'cei_year',
+    cei_cusip_col: str = 'cusip',
+    cei_year_col: str = 'year',
+) -> pd.DataFrame:
+    """
+    Inner-join price panel rows to the CEI rating of their firm and report year.
+
+    Both sides are keyed by one int64 built from the CUSIP6 code and the
+    year, and matched with a sorted-array lookup instead of a string merge.
+
+    Args:
+        panel: Firm-day panel with a CUSIP/CUSIP6 column and the report
+            year of each row's release window (as written by
+            ``build_event_panel``)
+        cei_df: CEI rows with CUSIP and report year
+        columns: CEI columns to bring over (missing ones are skipped)
+        panel_cusip_col: Panel CUSIP or CUSIP6 column
+        panel_year_col: Panel report-year column. Not the calendar year of
+            the release date: some reports came out the following year
+        cei_cusip_col: CEI CUSIP column
+        cei_year_col: CEI report year column
+
+    Returns:
+        Panel rows with a CEI match, plus 'year' and the requested CEI
+        columns. When a (CUSIP6, year) occurs more than once in ``cei_df`` the
+        first row is used.
+    """
+    cei_codes = cusip6_codes(cei_df[cei_cusip_col])
+    cei_years = pd.to_numeric(cei_df[cei_year_col], errors='coerce')
+    usable = (cei_codes >= 0) & cei_years.notna().to_numpy()
+    cei_keys = _join_keys(cei_codes[usable], cei_years.to_numpy()[usable])
+    cei_rows = np.flatnonzero(usable)
+
+    keys, first = np.unique(cei_keys, return_index=True)
+    cei_rows = cei_rows[first]
+
+    if panel_year_col not in panel.columns:
+        raise ValueError(f"Panel has no {panel_year_col!r} report-year column; rebuild it with build_event_panel")
+    panel_years = pd.to_numeric(panel[panel_year_col], errors='coerce')
+    panel_codes = cusip6_codes(panel[panel_cusip_col])
+    panel_ok = (panel_codes >= 0) & panel_years.notna().to_numpy()
+    panel_keys = _join_keys(panel_codes, panel_years.fillna(1900).to_numpy())
+
+    hit = np.zeros(len(panel), dtype=bool)
+    pos = np.zeros(len(panel), dtype='int64')
+    if len(keys):
+        pos = np.minimum(np.searchsorted(keys, panel_keys), len(keys) - 1)
+        hit = panel_ok & (keys[pos] == panel_keys)
+
+    joined = panel[hit].copy()
+    joined['year'] = panel_years[hit].astype('int64').to_numpy()
+    matched = cei_rows[pos[hit]]
+    for col in columns:
+        if col in cei_df.columns and col != 'year':
+            joined[col] = cei_df[col].iloc[matched].to_numpy()
+    return joined
+
+
+def summarize_event_returns(
+    panel: pd.DataFrame,
+    by: Sequence[str] = ('year', 'score_bin', 'days_from_release'),
+    value_col: str = 'RET',
+) -> pd.DataFrame:
+    """
+    Mean, standard deviation, count and standard error of returns per group.
+
+    Args:
+        panel: Firm-day panel with return and grouping columns
+        by: Grouping columns
+        value_col: Return column to summarize
+
+    Returns:
+        DataFrame with the grouping columns plus avg_return, std_return,
+        count and std_error.
+    """
+    summary = panel.groupby(list(by), observed=True)[value_col].agg(['mean', 'std', 'count']).reset_index()
+    summary = summary.rename(columns={'mean': 'avg_return', 'std': 'std_return'})
+    summary['std_error'] = summary['std_return'] / np.sqrt(summary['count'])
+    return summary
+
+
+class ReturnCube:
+    """
+    Sufficient statistics of returns over year x CEI score x day from release.
+
+    ``stats`` has shape (measure, statistic, year, score, day) where the
+    statistics are count, sum and sum of squares and the score axis holds
+    integer scores 0-100 (scores floored, like ``np.digitize`` in
+    ``score_bin_codes``), so any binning of scores can be derived later.
+
+    Example:
+        cube = ReturnCube.build(panel, measures=('RET', 'excess_return'))
+        cube.save('results/return_cube.npz')
+        overall = cube.summary('excess_return', by_year=False, cumulative=True)
+    """
+
+    STATISTICS = ('count', 'sum', 'sumsq')
+    N_SCORES = 101
+
+    def __init__(self, years: np.ndarray, days: np.ndarray, measures: Sequence[str], stats: np.ndarray):
+        self.years = np.asarray(years)
+        self.days = np.asarray(days)
+        self.measures = list(measures)
+        self.stats = stats
+
+    @classmethod
+    def build(
+        cls,
+        panel: pd.DataFrame,
+        measures: Sequence[str] = ('RET', 'excess_return'),
+        score_col: str = 'cei_score',
+        year_col: str = 'year',
+        day_col: str = 'days_from_release',
+    ) -> 'ReturnCube':
+        """
+        Aggregate a firm-day panel in one pass.
+
+        Args:
+            panel: Panel with score, year, day and return columns
+            measures: Return columns to aggregate (missing columns are skipped)
+            score_col: CEI score column (floored to integer scores, so a
+                fractional score lands in the same bin as in ``score_bin_codes``)
+            year_col: Report year column
+            day_col: Trading days from release column
+
+        Returns:
+            ReturnCube over the years and day range present in the panel.
+        """
+        measures = [m for m in measures if m in panel.columns]
+        scores = pd.to_numeric(panel[score_col], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        years_raw = panel[year_col].to_numpy()
+        days_raw = panel[day_col].to_numpy()
+
+        keep = (scores >= 0) & (scores <= 100) & pd.notna(years_raw) & pd.notna(days_raw)
+        years, year_idx = np.unique(years_raw[keep].astype('int64'), return_inverse=True)
+        day_values = days_raw[keep].astype('int64')
+        days = np.arange(day_values.min(), day_values.max() + 1) if keep.any() else np.arange(0)
+        n_cells = len(years) * cls.N_SCORES * len(days)
+        first_day = days[0] if len(days) else 0
+        cell = (year_idx * cls.N_SCORES + np.floor(scores[keep]).astype('int64')) * len(days) + (day_values - first_day)
+
+        stats = np.zeros((len(measures), len(cls.STATISTICS), n_cells))
+        for m, measure in enumerate(measures):
+            values = pd.to_numeric(panel[measure], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)[keep]
+            valid = np.isfinite(values)
+            stats[m, 0] = np.bincount(cell[valid], minlength=n_cells)
+            stats[m, 1] = np.bincount(cell[valid], weights=values[valid], minlength=n_cells)
+            stats[m, 2] = np.bincount(cell[valid], weights=values[valid] ** 2, minlength=n_cells)
+        stats = stats.reshape(len(measures), len(cls.STATISTICS), len(years), cls.N_SCORES, len(days))
+        return cls(years, days, measures, stats)
+
+    def save(self, path: str) -> str:
+        """Write the cube to a compressed ``.npz`` file."""
+        np.savez_compressed(path, years=self.years, days=self.days,
+                            measures=np.array(self.measures), stats=self.stats)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> 'ReturnCube':
+        """Read a cube written by ``save``."""
+        with np.load(path) as data:
+            return cls(data['years'], data['days'], data['measures'].tolist(), data['stats'])
+
+    @classmethod
+    def concat(cls, cubes: Sequence['ReturnCube']) -> 'ReturnCube':
+        """
+        Combine cubes over their years; a year in a later cube replaces it in earlier ones.
+
+        The day axis becomes the union of the cubes' day ranges. Used to
+        update a stored cube by re-aggregating only the years that changed.
+        """
+        cubes = [cube for cube in cubes if len(cube.years)]
+        if not cubes:
+            return cls(np.array([], dtype='int64'), np.array([], dtype='int64'), [], np.zeros((0, 3, 0, cls.N_SCORES, 0)))
+        measures = cubes[0].measures
+        if any(cube.measures != measures for cube in cubes):
+            raise ValueError("Cubes must have the same measures")
+        days = np.arange(min(cube.days[0] for cube in cubes), max(cube.days[-1] for cube in cubes) + 1)
+        slices = {}
+        for cube in cubes:
+            offset = cube.days[0] - days[0]
+            for i, year in enumerate(cube.years):
+                padded = np.zeros(cube.stats.shape[:2] + (cls.N_SCORES, len(days)))
+                padded[..., offset:offset + len(cube.days)] = cube.stats[:, :, i]
+                slices[int(year)] = padded
+        years = np.array(sorted(slices), dtype='int64')
+        return cls(years, days, measures, np.stack([slices[y] for y in years], axis=2))
+
+    def drop_years(self, years: Sequence[int]) -> 'ReturnCube':
+        """Cube without the given years."""
+        keep = ~np.isin(self.years, list(years))
+        return ReturnCube(self.years[keep], self.days, self.measures, self.stats[:, :, keep])
+
+    def rebin(self, edges: Sequence[int] = SCORE_BIN_EDGES) -> np.ndarray:
+        """
+        Sum the score axis into bins.
+
+        Args:
+            edges: Upper-exclusive score bin edges
+
+        Returns:
+            Array of shape (measure, statistic, year, bin, day).
+        """
+        codes = score_bin_codes(np.arange(self.N_SCORES), edges)
+        one_hot = np.eye(len(edges) + 1)[codes]  # score x bin
+        return np.einsum('mtysd,sb->mtybd', self.stats, one_hot)
+
+    def summary(
+        self,
+        measure: str = 'RET',
+        edges: Sequence[int] = SCORE_BIN_EDGES,
+        by_year: bool = True,
+        z: float = 1.96,
+        cumulative: bool = False,
+    ) -> pd.DataFrame:
+        """
+        Mean, standard deviation, count, standard error and confidence interval per cell.
+
+        Args:
+            measure: Return column the cube was built with
+            edges: Upper-exclusive score bin edges
+            by_year: Keep years separate; False rolls all years up
+            z: Normal quantile of the confidence interval
+            cumulative: Add 'cumulative_return', the compounded average
+                return over days within each (year,) score bin
+
+        Returns:
+            DataFrame with [year,] score_bin, days_from_release, avg_return,
+            std_return, count, std_error, ci_low and ci_high for cells with
+            observations (same columns as ``summarize_event_returns``).
+        """
+        binned = self.rebin(edges)[self.measures.index(measure)]
+        if not by_year:
+            binned = binned.sum(axis=1, keepdims=True)
+        n, total, total_sq = binned
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = total / n
+            var = (total_sq - total * mean) / (n - 1)
+            std = np.sqrt(np.clip(var, 0, None))
+            std_error = std / np.sqrt(n)
+
+        labels = score_bin_labels(edges)
+        year_index = self.years if by_year else np.array([0])
+        grid = pd.MultiIndex.from_product(
+            [year_index, pd.CategoricalIndex(labels, categories=labels, ordered=True), self.days],
+            names=['year', 'score_bin', 'days_from_release'],
+        )
+        summary = pd.DataFrame({
+            'avg_return': mean.ravel(),
+            'std_return': std.ravel(),
+            'count': n.ravel().astype('int64'),
+            'std_error': std_error.ravel(),
+        }, index=grid)
+        summary['ci_low'] = summary['avg_return'] - z * summary['std_error']
+        summary['ci_high'] = summary['avg_return'] + z * summary['std_error']
+        summary = summary[summary['count'] > 0].reset_index()
+        if cumulative:
+            growth = np.log1p(summary['avg_return'])
+            summary['cumulative_return'] = np.expm1(growth.groupby([summary['year'], summary['score_bin']], observed=True).cumsum())
+        if not by_year:
+            summary = summary.drop(columns='year')
+        return summary
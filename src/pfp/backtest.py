@@ -0,0 +1,259 @@
+"""
+Long-short CEI portfolios around report release dates.
+
+The panel is pivoted once into a firm x trading-day return matrix and the
+CEI ratings into a firm x release score matrix. A portfolio is then a pair
+of long/short weight matrices (firm x release), and its daily returns over
+every release and event day come from one ``einsum`` over the returns
+gathered at release-relative positions. Sweeping score thresholds stacks
+their weight matrices, and holding windows are slices of the same daily
+returns, so hundreds of configurations cost little more than one.
+"""
+
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .analysis import _join_keys, cusip6_codes
+
+
+class FirmDayReturns:
+    """
+    Dense firm x trading-day return matrix (NaN where a firm has no return).
+
+    Example:
+        data = FirmDayReturns.from_panel(panel, cap_col='market_cap')
+        scores = data.release_scores(cei_df, dates['Year'])
+        positions = data.release_positions(dates['Release Date'])
+        daily = hml_returns(data, scores, positions, low=0, high=100, days=(0, 10))
+    """
+
+    def __init__(self, firms: pd.Index, dates: pd.DatetimeIndex, returns: np.ndarray,
+                 caps: Optional[np.ndarray] = None):
+        self.firms = firms
+        self.dates = dates
+        self.returns = returns
+        self.caps = caps
+
+    @classmethod
+    def from_panel(
+        cls,
+        panel: pd.DataFrame,
+        firm_col: str = 'cusip6',
+        date_col: str = 'date',
+        ret_col: str = 'RET',
+        cap_col: Optional[str] = None,
+    ) -> 'FirmDayReturns':
+        """
+        Pivot a long firm-day panel.
+
+        Args:
+            panel: One row per firm and trading day
+            firm_col: Firm identifier (CUSIP or CUSIP6)
+            date_col: Trading date column
+            ret_col: Daily return column (non-numeric codes become NaN)
+            cap_col: Market capitalization column for value weights
+
+        Returns:
+            FirmDayReturns over the firms and dates present in the panel.
+        """
+        firm_idx, firms = pd.factorize(panel[firm_col], sort=True)
+        date_idx, dates = pd.factorize(pd.to_datetime(panel[date_col]), sort=True)
+        keep = (firm_idx >= 0) & (date_idx >= 0)
+
+        def dense(col):
+            values = pd.to_numeric(panel[col], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+            matrix = np.full((len(firms), len(dates)), np.nan)
+            matrix[firm_idx[keep], date_idx[keep]] = values[keep]
+            return matrix
+
+        caps = np.abs(dense(cap_col)) if cap_col else None
+        return cls(pd.Index(firms), pd.DatetimeIndex(dates), dense(ret_col), caps)
+
+    def release_positions(self, release_dates) -> np.ndarray:
+        """Index of the first trading day on or after each release date."""
+        return np.searchsorted(self.dates.to_numpy(), pd.to_datetime(pd.Series(release_dates)).to_numpy())
+
+    def release_scores(
+        self,
+        cei_df: pd.DataFrame,
+        years: Sequence[int],
+        score_col: str = 'cei_score',
+        cusip_col: str = 'cusip',
+        year_col: str = 'year',
+    ) -> np.ndarray:
+        """
+        Firm x release matrix of CEI scores (NaN where a firm is unrated).
+
+        Args:
+            cei_df: CEI rows with CUSIP, report year and score
+            years: Report year of each release
+            score_col: CEI score column
+            cusip_col: CEI CUSIP column
+            year_col: CEI report year column
+
+        Returns:
+            Array of shape (firms, releases).
+        """
+        codes = cusip6_codes(cei_df[cusip_col])
+        cei_years = pd.to_numeric(cei_df[year_col], errors='coerce')
+        usable = (codes >= 0) & cei_years.notna().to_numpy()
+        keys, first = np.unique(_join_keys(codes[usable], cei_years.to_numpy()[usable]), return_index=True)
+        values = pd.to_numeric(cei_df[score_col], errors='coerce').to_numpy(dtype='float64')[usable][first]
+
+        firm_codes = cusip6_codes(self.firms)
+        query = _join_keys(firm_codes[:, None], np.asarray(years, dtype='int64')[None, :])
+        scores = np.full(query.shape, np.nan)
+        if len(keys):
+            pos = np.minimum(np.searchsorted(keys, query), len(keys) - 1)
+            hit = (firm_codes[:, None] >= 0) & (keys[pos] == query)
+            scores[hit] = values[pos[hit]]
+        return scores
+
+    def event_returns(self, positions: np.ndarray, days: np.ndarray) -> np.ndarray:
+        """Returns at ``positions + days``, shape (firms, releases, days); NaN outside the sample."""
+        cols = np.asarray(positions)[:, None] + np.asarray(days)[None, :]
+        inside = (cols >= 0) & (cols < len(self.dates))
+        gathered = self.returns[:, np.clip(cols, 0, max(len(self.dates) - 1, 0))]
+        gathered[:, ~inside] = np.nan
+        return gathered
+
+
+def leg_weights(
+    scores: np.ndarray,
+    low: float,
+    high: float,
+    caps: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Unnormalized long (score >= high) and short (score <= low) weights.
+
+    Args:
+        scores: Firm x release scores
+        low: Highest score of the short leg
+        high: Lowest score of the long leg
+        caps: Firm x release market caps for value weights (default: equal)
+
+    Returns:
+        (long, short) firm x release weights; each leg is normalized over
+        the firms with a return on each day by ``hml_returns``.
+    """
+    base = np.ones_like(scores) if caps is None else np.nan_to_num(caps)
+    with np.errstate(invalid='ignore'):
+        return np.where(scores >= high, base, 0.0), np.where(scores <= low, base, 0.0)
+
+
+def _leg_returns(weights: np.ndarray, returns: np.ndarray) -> np.ndarray:
+    """Weighted mean return per (config,) release and day over firms with data."""
+    available = np.isfinite(returns)
+    filled = np.where(available, returns, 0.0)
+    subscripts = 'fr,frk->rk' if weights.ndim == 2 else 'cfr,frk->crk'
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.einsum(subscripts, weights, filled) / np.einsum(subscripts, weights, available.astype('float64'))
+
+
+def _release_caps(data: FirmDayReturns, positions: np.ndarray) -> Optional[np.ndarray]:
+    """Market cap on the last trading day before each release (firm x release)."""
+    if data.caps is None:
+        return None
+    return data.caps[:, np.clip(np.asarray(positions) - 1, 0, None)]
+
+
+def hml_returns(
+    data: FirmDayReturns,
+    scores: np.ndarray,
+    positions: np.ndarray,
+    low: float = 0,
+    high: float = 100,
+    days: Tuple[int, int] = (0, 10),
+    weighting: str = 'equal',
+) -> pd.DataFrame:
+    """
+    Daily long, short and high-minus-low returns around every release.
+
+    Args:
+        data: Firm x day returns
+        scores: Firm x release scores (``release_scores``)
+        positions: Trading-day index of each release (``release_positions``)
+        low: Highest score of the short leg
+        high: Lowest score of the long leg
+        days: First and last trading day from release held
+        weighting: 'equal' or 'value' (needs ``data.caps``)
+
+    Returns:
+        DataFrame indexed by (release, days_from_release) with long, short
+        and hml columns.
+    """
+    offsets = np.arange(days[0], days[1] + 1)
+    caps = _release_caps(data, positions) if weighting == 'value' else None
+    if weighting == 'value' and caps is None:
+        raise ValueError("Value weighting needs FirmDayReturns built with cap_col")
+    long_w, short_w = leg_weights(scores, low, high, caps)
+    returns = data.event_returns(positions, offsets)
+    long_ret, short_ret = _leg_returns(long_w, returns), _leg_returns(short_w, returns)
+
+    index = pd.MultiIndex.from_product([np.arange(len(positions)), offsets],
+                                       names=['release', 'days_from_release'])
+    return pd.DataFrame({'long': long_ret.ravel(), 'short': short_ret.ravel(),
+                         'hml': (long_ret - short_ret).ravel()}, index=index)
+
+
+def sweep(
+    data: FirmDayReturns,
+    scores: np.ndarray,
+    positions: np.ndarray,
+    thresholds: Sequence[Tuple[float, float]],
+    windows: Sequence[Tuple[int, int]],
+    weighting: str = 'equal',
+) -> pd.DataFrame:
+    """
+    Cumulative high-minus-low returns for every threshold x window configuration.
+
+    Daily returns are computed once over the union of all windows for all
+    thresholds at once; each window is then a slice of their cumulative
+    log growth. A release enters a window's statistics only if both legs
+    have a return on every day of the window; a day with one leg missing
+    is not counted as a flat day.
+
+    Args:
+        data: Firm x day returns
+        scores: Firm x release scores
+        positions: Trading-day index of each release
+        thresholds: (low, high) score cutoffs
+        windows: (first, last) trading days from release
+        weighting: 'equal' or 'value'
+
+    Returns:
+        DataFrame with low, high, start, end, mean_return (mean over releases
+        of the compounded window return), std_return, n_releases and t_stat.
+    """
+    first = min(w[0] for w in windows)
+    offsets = np.arange(first, max(w[1] for w in windows) + 1)
+    caps = _release_caps(data, positions) if weighting == 'value' else None
+    legs = [leg_weights(scores, low, high, caps) for low, high in thresholds]
+    returns = data.event_returns(positions, offsets)
+    long_ret = _leg_returns(np.stack([leg[0] for leg in legs]), returns)
+    short_ret = _leg_returns(np.stack([leg[1] for leg in legs]), returns)
+
+    # Cumulative log growth and count of days missing a leg per
+    # (config, release, day), with a leading zero
+    hml = long_ret - short_ret
+    missing = ~np.isfinite(hml)
+    growth = np.log1p(np.where(missing, 0.0, hml))
+    zero = np.zeros(growth.shape[:2] + (1,))
+    cum = np.concatenate([zero, np.cumsum(growth, axis=2)], axis=2)
+    cum_missing = np.concatenate([zero, np.cumsum(missing, axis=2)], axis=2)
+
+    rows = []
+    for c, (low, high) in enumerate(thresholds):
+        for start, end in windows:
+            a, b = start - first, end - first + 1
+            observed = cum_missing[c, :, b] == cum_missing[c, :, a]
+            window = np.expm1(cum[c, :, b] - cum[c, :, a])[observed]
+            n = len(window)
+            mean = window.mean() if n else np.nan
+            std = window.std(ddof=1) if n > 1 else np.nan
+            rows.append((low, high, start, end, mean, std, n, mean / (std / np.sqrt(n)) if n > 1 else np.nan))
+    return pd.DataFrame(rows, columns=['low', 'high', 'start', 'end', 'mean_return',
+                                       'std_return', 'n_releases', 't_stat'])
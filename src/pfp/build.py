@@ -0,0 +1,209 @@
+"""
+Incremental, year-partitioned build of the combined CEI table and panel.
+
+Each report year is one partition from source to aggregate:
+
+    processed/cei/cei_2019.csv  ─┐
+    processed/dates.csv (2019)  ─┴─> build/cei/year=2019.csv ─┐
+    processed/event_panel/year=2019.csv ──────────────────────┴─> build/panel/year=2019.csv
+                                                                    └─> year 2019 of build/return_cube.npz
+
+``build/manifest.json`` records the hash of every partition's inputs, the
+combined output path and the cube's measures. A run rebuilds only the years
+whose inputs changed (or that are new), drops years whose source
+disappeared, and then:
+
+* regenerates ``build/cei_with_dates.csv`` (or an explicit ``output``) by
+  concatenating partition files (appending when only later years were
+  added), without parsing. The curated ``processed/cei_with_dates.csv`` is
+  never written by default;
+* replaces the changed years' slices of the stored ``ReturnCube``, so the
+  downstream summaries never re-aggregate unchanged years. The whole cube
+  is rebuilt when the measures change.
+"""
+
+import glob
+import json
+import logging
+import os
+import shutil
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from .analysis import ReturnCube, join_cei_to_panel
+from .utils import extract_year_from_filename, file_sha256, load_cei_release_dates
+
+CEI_COLUMNS = ['employer', 'cei_score', 'year', 'cusip', 'release_date']
+MANIFEST = 'manifest.json'
+
+
+def _load_manifest(build_dir: str) -> Dict:
+    path = os.path.join(build_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {'years': {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_manifest(build_dir: str, manifest: Dict) -> None:
+    path = os.path.join(build_dir, MANIFEST)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def cei_partition(cei_path: str, year: int, release_date: Optional[pd.Timestamp]) -> pd.DataFrame:
+    """
+    One year of the combined CEI table from an extracted ``cei_<year>.csv``.
+
+    Args:
+        cei_path: Extraction output (Company, CEI_Score[, cusip])
+        year: Report year
+        release_date: Release date of the report, if known
+
+    Returns:
+        DataFrame with employer, cei_score, year, cusip and release_date.
+    """
+    df = pd.read_csv(cei_path, dtype={'cusip': str})
+    return pd.DataFrame({
+        'employer': df['Company'],
+        'cei_score': pd.to_numeric(df['CEI_Score'], errors='coerce'),
+        'year': year,
+        'cusip': df['cusip'] if 'cusip' in df.columns else None,
+        'release_date': release_date.strftime('%Y-%m-%d') if release_date is not None else None,
+    }, columns=CEI_COLUMNS)
+
+
+def _concat_partitions(paths: Sequence[str], output: str, append: bool = False) -> None:
+    """Concatenate CSV partitions with one header, copying bytes."""
+    tmp_path = output + '.tmp'
+    if append:
+        shutil.copyfile(output, tmp_path)
+    with open(tmp_path, 'ab' if append else 'wb') as out:
+        for i, path in enumerate(paths):
+            with open(path, 'rb') as f:
+                header = f.readline()
+                if i == 0 and not append:
+                    out.write(header)
+                shutil.copyfileobj(f, out)
+    os.replace(tmp_path, output)
+
+
+def build(
+    processed_dir: str,
+    build_dir: Optional[str] = None,
+    panel_dir: Optional[str] = None,
+    measures: Sequence[str] = ('RET', 'daily_return'),
+    force: bool = False,
+    output: Optional[str] = None,
+) -> Dict[str, List[int]]:
+    """
+    Bring the year partitions, combined CEI table and return cube up to date.
+
+    Args:
+        processed_dir: Directory with ``cei/cei_<year>.csv`` and ``dates.csv``
+        build_dir: Partition directory (default: ``<processed_dir>/build``)
+        panel_dir: Event-panel partitions from ``build_event_panel``
+            (default: ``<processed_dir>/event_panel`` if it exists)
+        measures: Return columns aggregated into the cube
+        force: Rebuild every year
+        output: Combined CEI table (default: ``<build_dir>/cei_with_dates.csv``)
+
+    Returns:
+        Dict with the years rebuilt ('cei', 'panel') and dropped ('removed').
+    """
+    build_dir = build_dir or os.path.join(processed_dir, 'build')
+    if panel_dir is None and os.path.isdir(os.path.join(processed_dir, 'event_panel')):
+        panel_dir = os.path.join(processed_dir, 'event_panel')
+    cei_dir, merged_dir = os.path.join(build_dir, 'cei'), os.path.join(build_dir, 'panel')
+    os.makedirs(cei_dir, exist_ok=True)
+    os.makedirs(merged_dir, exist_ok=True)
+
+    output = output or os.path.join(build_dir, 'cei_with_dates.csv')
+    manifest = {'years': {}} if force else _load_manifest(build_dir)
+    previous = manifest['years']
+    rebuild_cube = force or manifest.get('measures') != list(measures)
+    sources = {extract_year_from_filename(p): p for p in sorted(glob.glob(os.path.join(processed_dir, 'cei', 'cei_*.csv')))}
+    sources.pop(None, None)
+    dates_path = os.path.join(processed_dir, 'dates.csv')
+    dates = load_cei_release_dates(dates_path) if os.path.exists(dates_path) else pd.DataFrame(columns=['Year', 'Release Date'])
+    release = dict(zip(dates['Year'], dates['Release Date']))
+
+    changed = {'cei': [], 'panel': [], 'removed': []}
+    entries = {}
+    for year, path in sorted(sources.items()):
+        entry = dict(previous.get(str(year), {}))
+        cei_key = f"{file_sha256(path)}:{release.get(year)}"
+        partition = os.path.join(cei_dir, f'year={year}.csv')
+        if entry.get('cei') != cei_key or not os.path.exists(partition):
+            cei_partition(path, year, release.get(year)).to_csv(partition, index=False)
+            entry = {'cei': cei_key}
+            changed['cei'].append(year)
+
+        panel_path = os.path.join(panel_dir, f'year={year}.csv') if panel_dir else None
+        if panel_path and os.path.exists(panel_path):
+            panel_key = f"{cei_key}:{file_sha256(panel_path)}"
+            if entry.get('panel') != panel_key:
+                _build_panel_year(panel_path, partition, year, os.path.join(merged_dir, f'year={year}.csv'))
+                entry['panel'] = panel_key
+                changed['panel'].append(year)
+        entries[str(year)] = entry
+
+    changed['removed'] = sorted(int(y) for y in previous if y not in entries)
+    for year in changed['removed']:
+        for directory in (cei_dir, merged_dir):
+            path = os.path.join(directory, f'year={year}.csv')
+            if os.path.exists(path):
+                os.remove(path)
+
+    same_output = manifest.get('output') == os.path.abspath(output)
+    if changed['cei'] or changed['removed'] or not same_output or not os.path.exists(output):
+        kept = [int(y) for y in previous if y in entries]
+        appended = (
+            same_output and os.path.exists(output) and not changed['removed'] and kept
+            and changed['cei'] and min(changed['cei']) > max(kept)
+        )
+        years = changed['cei'] if appended else sorted(sources)
+        _concat_partitions([os.path.join(cei_dir, f'year={y}.csv') for y in years], output, append=bool(appended))
+        logging.info(f"{'Appended' if appended else 'Rebuilt'} {output} ({len(years)} year partitions)")
+
+    _update_cube(build_dir, merged_dir, changed['panel'], changed['removed'], measures, rebuild_cube)
+    manifest['years'] = entries
+    manifest['output'] = os.path.abspath(output)
+    manifest['measures'] = list(measures)
+    _save_manifest(build_dir, manifest)
+    logging.info(f"Rebuilt CEI years {changed['cei']}, panel years {changed['panel']}; removed {changed['removed']}")
+    return changed
+
+
+def _build_panel_year(panel_path: str, cei_path: str, year: int, output: str) -> None:
+    """Join one report year of the event panel to that year's CEI partition."""
+    panel = pd.read_csv(panel_path, dtype={'CUSIP': str})
+    if 'cei_year' not in panel.columns:
+        panel['cei_year'] = year  # partitions are named by report year
+    cei = pd.read_csv(cei_path, dtype={'cusip': str})
+    cusip_col = 'cusip6' if 'cusip6' in panel.columns else 'CUSIP'
+    merged = join_cei_to_panel(panel, cei, columns=('cei_score', 'employer'), panel_cusip_col=cusip_col)
+    merged.to_csv(output, index=False)
+
+
+def _update_cube(build_dir: str, merged_dir: str, years: List[int], removed: List[int],
+                 measures: Sequence[str], rebuild: bool) -> None:
+    """Replace the changed years' slices of the stored return cube, or rebuild it from every year."""
+    path = os.path.join(build_dir, 'return_cube.npz')
+    if not (years or removed or rebuild) and os.path.exists(path):
+        return
+    cube = None
+    if rebuild or not os.path.exists(path):
+        paths = sorted(glob.glob(os.path.join(merged_dir, 'year=*.csv')))
+    else:
+        cube = ReturnCube.load(path).drop_years(list(removed) + list(years))
+        paths = [os.path.join(merged_dir, f'year={year}.csv') for year in years]
+    updates = []
+    for panel_path in paths:
+        merged = pd.read_csv(panel_path)
+        if not merged.empty:
+            updates.append(ReturnCube.build(merged, measures=measures))
+    cube = ReturnCube.concat(([cube] if cube is not None else []) + updates)
+    cube.save(path)
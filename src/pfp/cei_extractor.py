@@ -8,7 +8,6 @@ import re
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
-import camelot
 import pandas as pd
 
 from .utils import extract_year_from_filename, find_pdfs_in_folder
@@ -8,19 +8,30 @@ import re
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
-import camelot
+import numpy as np
 import pandas as pd
 
+from .column_fingerprint import candidate_pairs
+from .merge import RowMerger
+from .profiling import span
+from .table_store import read_pdf_tables
 from .utils import extract_year_from_filename, find_pdfs_in_folder
 
 
-def extract_cei_data_improved(pdf_path: str, year: int) -> pd.DataFrame:
+def extract_cei_data_improved(pdf_path: str, year: int, tables_dir: Optional[str] = None,
+                              backend: Optional[str] = None,
+                              expected: Optional[np.ndarray] = None) -> pd.DataFrame:
     """
     Improved extraction that better identifies actual company names and CEI scores.
     
     Args:
         pdf_path: Path to the CEI PDF file
         year: Year of the report
+        tables_dir: Optional directory for storing/replaying raw table grids
+        backend: Table backend from ``table_backends.BACKENDS`` (default: camelot)
+        expected: Expected score histogram of the report year (see
+            ``column_fingerprint.neighbour_histogram``); None skips the
+            score-distribution check
         
     Returns:
         DataFrame with columns: Company, CEI_Score, Year
@@ -34,7 +45,8 @@ def extract_cei_data_improved(pdf_path: str, year: int) -> pd.DataFrame:
         ]
         
         for strategy in strategies:
-            result = strategy(pdf_path, year)
+            with span("strategy", strategy=strategy.__name__, year=year):
+                result = strategy(pdf_path, year, tables_dir, backend, expected)
             if not result.empty and len(result) > 10:  # Need substantial data
                 logging.info(f"Successfully extracted {len(result)} companies for {year}")
                 return result
@@ -47,40 +59,48 @@ def extract_cei_data_improved(pdf_path: str, year: int) -> pd.DataFrame:
         return pd.DataFrame()
 
 
-def _extract_strategy_appendix(pdf_path: str, year: int) -> pd.DataFrame:
+def _extract_strategy_appendix(pdf_path: str, year: int, tables_dir: Optional[str] = None,
+                               backend: Optional[str] = None, expected: Optional[np.ndarray] = None) -> pd.DataFrame:
     """Try extracting from appendix pages (common location for company lists)."""
     try:
         # Look for appendix pages - usually later in document
-        tables = camelot.read_pdf(pdf_path, pages="40-100", flavor="stream")
-        return _process_tables_for_companies(tables, year)
+        tables = read_pdf_tables(pdf_path, "40-100", "stream", tables_dir, backend)
+        return _process_tables_for_companies(tables, year, expected)
     except:
         return pd.DataFrame()
 
 
-def _extract_strategy_wide_pages(pdf_path: str, year: int) -> pd.DataFrame:
+def _extract_strategy_wide_pages(pdf_path: str, year: int, tables_dir: Optional[str] = None,
+                                 backend: Optional[str] = None, expected: Optional[np.ndarray] = None) -> pd.DataFrame:
     """Try extracting from a wider range of pages."""
     try:
-        tables = camelot.read_pdf(pdf_path, pages="20-80", flavor="stream")
-        return _process_tables_for_companies(tables, year)
+        tables = read_pdf_tables(pdf_path, "20-80", "stream", tables_dir, backend)
+        return _process_tables_for_companies(tables, year, expected)
     except:
         return pd.DataFrame()
 
 
-def _extract_strategy_all_pages(pdf_path: str, year: int) -> pd.DataFrame:
+def _extract_strategy_all_pages(pdf_path: str, year: int, tables_dir: Optional[str] = None,
+                                backend: Optional[str] = None, expected: Optional[np.ndarray] = None) -> pd.DataFrame:
     """Last resort - try all pages."""
     try:
-        tables = camelot.read_pdf(pdf_path, pages="all", flavor="stream")
-        return _process_tables_for_companies(tables, year)
+        tables = read_pdf_tables(pdf_path, "all", "stream", tables_dir, backend)
+        return _process_tables_for_companies(tables, year, expected)
     except:
         return pd.DataFrame()
 
 
-def _process_tables_for_companies(tables, year: int) -> pd.DataFrame:
-    """Process extracted tables to find company data."""
+def _process_tables_for_companies(tables, year: int, expected: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """
+    Process extracted tables to find company data.
+
+    Rows are merged on the normalized company name; conflicting scores are
+    resolved in favour of the table with more valid company rows.
+    """
     if not tables:
         return pd.DataFrame()
     
-    all_companies = []
+    merger = RowMerger()
     
     for table in tables:
         df = table.df
@@ -88,36 +108,30 @@ def _process_tables_for_companies(tables, year: int) -> pd.DataFrame:
             continue
             
         # Try to find company data in this table
-        company_data = _extract_companies_from_table(df, year)
+        with span("parse_table", year=year, page=getattr(table, 'page', None)):
+            company_data = _extract_companies_from_table(df, year, expected)
         if not company_data.empty:
-            all_companies.append(company_data)
-    
-    if all_companies:
-        result = pd.concat(all_companies, ignore_index=True)
-        result = result.drop_duplicates(subset=['Company'])
-        return result
+            merger.add_frame(company_data, confidence=len(company_data))
     
-    return pd.DataFrame()
+    return merger.to_frame()
 
 
-def _extract_companies_from_table(df: pd.DataFrame, year: int) -> pd.DataFrame:
+def _extract_companies_from_table(df: pd.DataFrame, year: int,
+                                  expected: Optional[np.ndarray] = None) -> pd.DataFrame:
     """Extract company names and scores from a single table."""
     if df.empty:
         return pd.DataFrame()
     
-    # Try different column combinations
+    # Try column combinations whose fingerprints fit (first 3 columns as company)
     best_result = pd.DataFrame()
     best_score = 0
     
-    for company_col_idx in range(min(3, df.shape[1])):  # Try first 3 columns as company
-        for score_col_idx in range(df.shape[1]):
-            if score_col_idx == company_col_idx:
-                continue
-                
-            result = _try_column_combination(df, company_col_idx, score_col_idx, year)
-            if len(result) > best_score:
-                best_result = result
-                best_score = len(result)
+    for company_col_idx, score_col_idx in candidate_pairs(df, max_company_col=3, expected=expected,
+                                                              reject_constant=True):
+        result = _try_column_combination(df, company_col_idx, score_col_idx, year)
+        if len(result) > best_score:
+            best_result = result
+            best_score = len(result)
     
     return best_result
 
@@ -221,7 +235,8 @@ def fix_cei_files_in_directory(fix_dir: str, output_dir: str) -> None:
         
         # Save corrected file
         output_file = os.path.join(output_dir, f"cei_{year}.csv")
-        cei_data.to_csv(output_file, index=False)
+        with span("write", year=year):
+            cei_data.to_csv(output_file, index=False)
         
         logging.info(f"Fixed {year}: saved {len(cei_data)} companies to {output_file}")
 
@@ -284,7 +299,8 @@ def process_missing_years(cei_folder: str, output_dir: str) -> None:
         
         # Save file
         output_file = os.path.join(output_dir, f"cei_{year}.csv")
-        cei_data.to_csv(output_file, index=False)
+        with span("write", year=year):
+            cei_data.to_csv(output_file, index=False)
         
         logging.info(f"Processed {year}: saved {len(cei_data)} companies to {output_file}")
 
@@ -0,0 +1,476 @@
+"""
+Command-line interface for the pfp pipeline.
+
+Usage:
+    pfp [--data-dir DIR] [--trace FILE] <command> [options]
+
+Commands:
+    index    List the CEI reports found and which years are already extracted
+    extract  Extract CEI tables from the text layer (camelot strategies)
+    ocr      Extract CEI tables with OCR
+    dates    Rebuild the release-date tables from the reports' front matter
+    match    Fuzzy-match CEI employers to a security master
+    events   Build the stock event-window panel around release dates
+    build    Incrementally rebuild the combined CEI table, panel and return cube
+    analyze  Summarize event-window returns by year, score bin and day
+    report   Render the analysis figures from the summary tables
+    serve    Long-running worker that runs queued jobs with warm imports
+
+Paths default to the repository layout under ``--data-dir`` (or the
+``PFP_DATA_DIR`` environment variable): ``raw/CEI`` for the PDFs and
+``processed/`` for outputs.
+
+Worker jobs are JSON files dropped into ``<queue-dir>/incoming``, each
+holding the argument list of one command, e.g.
+``{"argv": ["extract", "2019", "--strategy", "improved"]}``. The worker
+moves each job through ``running/`` to ``done/`` or ``failed/`` and writes
+a ``.result.json`` next to it.
+"""
+
+import argparse
+import functools
+import json
+import logging
+import os
+import sys
+import time
+import traceback
+from typing import Dict, List, Optional
+
+from .profiling import enable_profiling, write_trace
+from .utils import extract_year_from_filename, find_pdfs_in_folder
+
+COMMANDS = ("index", "extract", "ocr", "dates", "match", "events", "build", "analyze", "report", "serve")
+
+
+def _pdf_dir(args: argparse.Namespace) -> str:
+    return args.pdf_dir or os.path.join(args.data_dir, "raw", "CEI")
+
+
+def _output_dir(args: argparse.Namespace) -> str:
+    return args.output_dir or os.path.join(args.data_dir, "processed", "cei")
+
+
+def _processed(args: argparse.Namespace, name: str) -> str:
+    return os.path.join(args.data_dir, "processed", name)
+
+
+def _index_pdfs(pdf_dir: str) -> Dict[int, str]:
+    """Map report year to PDF path (first match per year)."""
+    index = {}
+    for pdf_path in sorted(find_pdfs_in_folder(pdf_dir)):
+        year = extract_year_from_filename(pdf_path)
+        index.setdefault(year, pdf_path)
+    return index
+
+
+# Identifier columns read as strings, so CUSIPs keep their leading zeros
+_ID_DTYPES = {"cusip": str, "CUSIP": str, "cusip6": str, "NCUSIP": str}
+
+
+@functools.lru_cache(maxsize=16)
+def _read_csv_cached(path: str, mtime: float):
+    import pandas as pd
+    return pd.read_csv(path, dtype=_ID_DTYPES)
+
+
+def read_reference_table(path: str):
+    """
+    Read a reference CSV, reusing the parsed frame while the file is unchanged.
+
+    In worker mode this keeps release dates, CEI tables and the security
+    master in memory across jobs. CUSIP columns are read as strings; each
+    caller gets its own copy of the cached frame.
+    """
+    return _read_csv_cached(os.path.abspath(path), os.path.getmtime(path)).copy()
+
+
+def _years_to_run(args: argparse.Namespace, index: Dict[int, str]) -> List[int]:
+    if args.years:
+        return args.years
+    existing = set()
+    output_dir = _output_dir(args)
+    if os.path.isdir(output_dir) and not args.overwrite:
+        existing = {extract_year_from_filename(f) for f in os.listdir(output_dir) if f.startswith("cei_")}
+    return sorted(year for year in index if year not in existing)
+
+
+def _save_year(df, args: argparse.Namespace, year: int) -> None:
+    from .profiling import span
+
+    output_dir = _output_dir(args)
+    os.makedirs(output_dir, exist_ok=True)
+    output_file = os.path.join(output_dir, f"cei_{year}.csv")
+    with span("write", year=year):
+        df.to_csv(output_file, index=False)
+    logging.info(f"✓ Saved {len(df)} companies for year {year} to {output_file}")
+
+
+def _cmd_index(args: argparse.Namespace) -> int:
+    index = _index_pdfs(_pdf_dir(args))
+    output_dir = _output_dir(args)
+    for year, pdf_path in sorted(index.items()):
+        done = os.path.exists(os.path.join(output_dir, f"cei_{year}.csv"))
+        print(f"{year}\t{'extracted' if done else 'missing'}\t{pdf_path}")
+    return 0
+
+
+def _cmd_extract(args: argparse.Namespace) -> int:
+    index = _index_pdfs(_pdf_dir(args))
+    failures = 0
+    for year in _years_to_run(args, index):
+        if year not in index:
+            logging.warning(f"No PDF found for year {year}")
+            failures += 1
+            continue
+        pdf_path = index[year]
+        if args.strategy == "comprehensive":
+            from .column_fingerprint import neighbour_histogram
+            from .comprehensive_cei_extractor import extract_cei_comprehensive
+            df = extract_cei_comprehensive(pdf_path, year, tables_dir=args.tables_dir,
+                                           profiles_dir=args.profiles_dir, backend=args.backend,
+                                           expected=neighbour_histogram(_output_dir(args), year))
+        elif args.strategy == "improved":
+            from .cei_improved_extractor import extract_cei_data_improved
+            from .column_fingerprint import neighbour_histogram
+            df = extract_cei_data_improved(pdf_path, year, tables_dir=args.tables_dir, backend=args.backend,
+                                           expected=neighbour_histogram(_output_dir(args), year))
+        else:
+            from .evaluation import load_cascade_config, run_cascade
+            df = run_cascade(pdf_path, year, load_cascade_config(args.cascade_config))
+        if df.empty:
+            logging.warning(f"No data extracted for year {year}")
+            failures += 1
+            continue
+        _save_year(df, args, year)
+    return 1 if failures else 0
+
+
+def _cmd_ocr(args: argparse.Namespace) -> int:
+    from .ocr_cei_extractor import ocr_extract_cei_data
+
+    index = _index_pdfs(_pdf_dir(args))
+    failures = 0
+    for year in _years_to_run(args, index):
+        if year not in index:
+            logging.warning(f"No PDF found for year {year}")
+            failures += 1
+            continue
+        df = ocr_extract_cei_data(index[year], year, profiles_dir=args.profiles_dir,
+                                  preprocess=args.preprocess)
+        if df.empty:
+            failures += 1
+            continue
+        _save_year(df, args, year)
+    return 1 if failures else 0
+
+
+def _cmd_dates(args: argparse.Namespace) -> int:
+    from .release_dates import build_release_dates
+
+    # Written next to the curated dates.csv/date_comparison.csv, never over them
+    dates_csv = args.output or _processed(args, os.path.join("build", "dates.csv"))
+    comparison_csv = args.comparison or _processed(args, os.path.join("build", "date_comparison.csv"))
+    for path in (dates_csv, comparison_csv):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    comparison = build_release_dates(
+        _index_pdfs(_pdf_dir(args)),
+        dates_csv=dates_csv,
+        comparison_csv=comparison_csv,
+        cache_dir=args.cache_dir or _processed(args, "release_dates_cache"),
+        years=args.years or None,
+        original_csv=_processed(args, "date_comparison.csv"),
+        ocr=args.ocr,
+    )
+    return 0 if comparison["Consolidated_Dates"].notna().all() else 1
+
+
+def _cmd_match(args: argparse.Namespace) -> int:
+    from .matching import match_cei_to_public, match_cei_to_public_parallel
+
+    cei_df = read_reference_table(args.cei or _processed(args, "cei_with_dates.csv"))
+    securities = read_reference_table(args.securities)
+    kwargs = dict(threshold=args.threshold, employer_col=args.employer_col, company_col=args.company_col)
+    if args.full_scan:
+        matched = match_cei_to_public(cei_df, securities, **kwargs)
+    else:
+        matched = match_cei_to_public_parallel(cei_df, securities, workers=args.workers, **kwargs)
+    output = args.output or _processed(args, "cei_matched.csv")
+    matched.to_csv(output, index=False)
+    logging.info(f"Wrote {len(matched)} rows to {output}")
+    return 0
+
+
+def _cmd_events(args: argparse.Namespace) -> int:
+    import pandas as pd
+
+    from .panel import build_event_panel
+
+    dates = read_reference_table(args.dates or _processed(args, "dates.csv"))
+    if args.years:
+        dates = dates[dates["Year"].astype(int).isin(args.years)]
+    universe = None
+    if args.cei:
+        universe = read_reference_table(args.cei)["cusip"].dropna().astype(str)
+
+    panel_dir = args.panel_dir or _processed(args, "event_panel")
+    paths = build_event_panel(
+        args.prices, dates, panel_dir, universe=universe,
+        before_days=args.before, after_days=args.after, date_col=args.date_col,
+    )
+
+    # Append the year partitions into one CSV without holding them all in memory
+    output = args.output or _processed(args, "stock_prices_event_window.csv")
+    n_rows = 0
+    for i, path in enumerate(paths):
+        rows = pd.read_csv(path, dtype={"CUSIP": str})
+        if "CUSIP" in rows.columns:
+            rows["cusip6"] = rows["CUSIP"].str[:6]
+        rows.to_csv(output, mode="a" if i else "w", header=not i, index=False)
+        n_rows += len(rows)
+    logging.info(f"Wrote {n_rows} rows to {output}")
+    return 0
+
+
+def _cmd_build(args: argparse.Namespace) -> int:
+    from .build import build
+
+    build(os.path.join(args.data_dir, "processed"), build_dir=args.build_dir,
+          panel_dir=args.panel_dir, force=args.force, output=args.output)
+    return 0
+
+
+def _cmd_analyze(args: argparse.Namespace) -> int:
+    import pandas as pd
+
+    from .analysis import add_score_bins, join_cei_to_panel, summarize_event_returns
+    from .compact import compact_frame
+
+    panel = read_reference_table(args.panel or _processed(args, "stock_prices_event_window.csv"))
+    if "cei_score" not in panel.columns:
+        cei = read_reference_table(args.cei or _processed(args, "cei_with_dates.csv"))
+        panel = join_cei_to_panel(panel, cei, columns=("cei_score",))
+    panel = compact_frame(add_score_bins(panel))
+    panel = panel.assign(**{args.value_col: pd.to_numeric(panel[args.value_col], errors="coerce")})
+
+    summary = summarize_event_returns(panel, by=args.by.split(","), value_col=args.value_col)
+    output = args.output or _processed(args, "event_return_summary.csv")
+    summary.to_csv(output, index=False)
+    logging.info(f"Wrote {len(summary)} groups to {output}")
+    return 0
+
+
+def _cmd_report(args: argparse.Namespace) -> int:
+    from .report import build_figures, render_report
+
+    summary = read_reference_table(args.summary or _processed(args, "event_return_summary.csv"))
+    cei_path = args.cei or _processed(args, "cei_with_dates.csv")
+    cei = read_reference_table(cei_path) if os.path.exists(cei_path) else None
+    event_returns = read_reference_table(args.event_returns) if args.event_returns else None
+    figures = build_figures(summary, cei=cei, event_returns=event_returns)
+    render_report(figures, args.output_dir or os.path.join("results", "figures"),
+                  formats=args.formats.split(","), workers=args.workers, force=args.force)
+    return 0
+
+
+def _warm_backends() -> None:
+    """Import the heavy backends once so queued jobs start immediately."""
+    for module in ("pandas", "camelot", "pytesseract", "pdf2image"):
+        try:
+            __import__(module)
+        except ImportError:
+            logging.debug(f"{module} not available; jobs needing it will fail")
+
+
+def _run_job(job_path: str, queue_dir: str, base_argv: List[str]) -> bool:
+    name = os.path.basename(job_path)
+    running = os.path.join(queue_dir, "running", name)
+    try:
+        os.replace(job_path, running)  # claim the job
+    except FileNotFoundError:
+        return False  # another worker took it
+
+    result = {"job": name, "started": time.time()}
+    try:
+        with open(running) as f:
+            job_argv = json.load(f)["argv"]
+        if job_argv and job_argv[0] == "serve":
+            raise ValueError("serve jobs cannot be queued")
+        result["argv"] = job_argv
+        result["returncode"] = run_command(parse_args(base_argv + job_argv))
+    except SystemExit as e:  # argparse errors
+        result["returncode"] = e.code if isinstance(e.code, int) else 2
+    except Exception as e:
+        result["returncode"] = 1
+        result["error"] = "".join(traceback.format_exception_only(type(e), e)).strip()
+        logging.error(f"Job {name} failed: {result['error']}")
+    result["seconds"] = time.time() - result["started"]
+
+    status = "done" if result["returncode"] == 0 else "failed"
+    final = os.path.join(queue_dir, status, name)
+    os.replace(running, final)
+    with open(final + ".result.json", "w") as f:
+        json.dump(result, f, indent=2)
+    logging.info(f"Job {name} {status} in {result['seconds']:.1f}s")
+    return True
+
+
+def _cmd_serve(args: argparse.Namespace) -> int:
+    queue_dir = args.queue_dir or os.path.join(args.data_dir, "queue")
+    for sub in ("incoming", "running", "done", "failed"):
+        os.makedirs(os.path.join(queue_dir, sub), exist_ok=True)
+    base_argv = ["--data-dir", args.data_dir, "--log-level", args.log_level]
+
+    if args.warm:
+        _warm_backends()
+    logging.info(f"Worker watching {os.path.join(queue_dir, 'incoming')}")
+
+    while True:
+        incoming = os.path.join(queue_dir, "incoming")
+        jobs = sorted(f for f in os.listdir(incoming) if f.endswith(".json"))
+        for job in jobs:
+            _run_job(os.path.join(incoming, job), queue_dir, base_argv)
+        if args.once:
+            return 0
+        if not jobs:
+            time.sleep(args.poll)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the ``pfp`` argument parser."""
+    parser = argparse.ArgumentParser(prog="pfp", description="Profiting from protests pipeline")
+    parser.add_argument("--data-dir", default=os.environ.get("PFP_DATA_DIR", "data"),
+                        help="Root data directory (default: $PFP_DATA_DIR or ./data)")
+    parser.add_argument("--log-level", default="INFO", help="Logging level")
+    parser.add_argument("--trace", help="Write a trace-event JSON profile of the run to this file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    index = commands.add_parser("index", help="List reports and extraction status")
+    extract = commands.add_parser("extract", help="Extract CEI tables with camelot strategies")
+    ocr = commands.add_parser("ocr", help="Extract CEI tables with OCR")
+    for sub in (index, extract, ocr):
+        sub.add_argument("--pdf-dir", help="Directory of CEI PDFs (default: <data-dir>/raw/CEI)")
+        sub.add_argument("--output-dir", help="Directory for cei_<year>.csv (default: <data-dir>/processed/cei)")
+    for sub in (extract, ocr):
+        sub.add_argument("years", nargs="*", type=int, help="Years to process (default: all not yet extracted)")
+        sub.add_argument("--overwrite", action="store_true", help="Re-extract years that already have a CSV")
+        sub.add_argument("--profiles-dir", help="Load/learn per-year layout profiles in this directory")
+    ocr.add_argument("--preprocess", action="store_true",
+                     help="Binarize, deskew and clean page images before tesseract")
+    extract.add_argument("--strategy", choices=["comprehensive", "improved", "cascade"], default="comprehensive")
+    extract.add_argument("--backend", choices=["camelot", "words", "auto"],
+                         help="Table backend (default: a layout profile's, else camelot); "
+                              "'words' builds grids from the PDF text layer, 'auto' uses it for stream pages")
+    extract.add_argument("--tables-dir", help="Store/replay raw table grids in this directory")
+    extract.add_argument("--cascade-config",
+                         help="Cascade JSON from pfp.evaluation (required by --strategy cascade)")
+
+    dates = commands.add_parser("dates", help="Rebuild release dates from report front matter")
+    dates.add_argument("years", nargs="*", type=int, help="Years to include (default: all reports)")
+    dates.add_argument("--pdf-dir", help="Directory of CEI PDFs (default: <data-dir>/raw/CEI)")
+    dates.add_argument("--output", help="Release dates CSV (default: <data-dir>/processed/build/dates.csv)")
+    dates.add_argument("--comparison",
+                       help="Per-source CSV (default: <data-dir>/processed/build/date_comparison.csv)")
+    dates.add_argument("--cache-dir", help="Per-PDF cache (default: <data-dir>/processed/release_dates_cache)")
+    dates.add_argument("--no-ocr", dest="ocr", action="store_false", help="Never OCR page 1")
+
+    match = commands.add_parser("match", help="Fuzzy-match CEI employers to a security master")
+    match.add_argument("--securities", required=True, help="CSV of public company names")
+    match.add_argument("--cei", help="CEI CSV (default: <data-dir>/processed/cei_with_dates.csv)")
+    match.add_argument("--employer-col", default="employer")
+    match.add_argument("--company-col", default="COMNAM")
+    match.add_argument("--threshold", type=int, default=90)
+    match.add_argument("--workers", type=int, help="Matching processes (default: CPU count)")
+    match.add_argument("--full-scan", action="store_true",
+                       help="Score every employer against every company instead of blocking")
+    match.add_argument("--output", help="Output CSV (default: <data-dir>/processed/cei_matched.csv)")
+
+    events = commands.add_parser("events", help="Build the event-window stock panel")
+    events.add_argument("years", nargs="*", type=int, help="Release years (default: all in the dates file)")
+    events.add_argument("--prices", required=True, help="Daily stock file (CRSP-style CSV)")
+    events.add_argument("--dates", help="Release dates CSV (default: <data-dir>/processed/dates.csv)")
+    events.add_argument("--cei", help="CEI CSV whose CUSIPs define the universe (default: all securities)")
+    events.add_argument("--panel-dir", help="Per-year panel partitions (default: <data-dir>/processed/event_panel)")
+    events.add_argument("--date-col", default="date")
+    events.add_argument("--before", type=int, default=10, help="Calendar days before release")
+    events.add_argument("--after", type=int, default=10, help="Calendar days after release")
+    events.add_argument("--output", help="Output CSV (default: <data-dir>/processed/stock_prices_event_window.csv)")
+
+    build = commands.add_parser("build", help="Rebuild changed year partitions and aggregates")
+    build.add_argument("--build-dir", help="Partition directory (default: <data-dir>/processed/build)")
+    build.add_argument("--panel-dir", help="Event panel partitions (default: <data-dir>/processed/event_panel)")
+    build.add_argument("--force", action="store_true", help="Rebuild every year")
+    build.add_argument("--output", help="Combined CEI table (default: <build-dir>/cei_with_dates.csv)")
+
+    analyze = commands.add_parser("analyze", help="Summarize event-window returns")
+    analyze.add_argument("--panel", help="Event-window panel CSV")
+    analyze.add_argument("--cei", help="CEI CSV with cusip, year, cei_score (if the panel lacks scores)")
+    analyze.add_argument("--value-col", default="RET")
+    analyze.add_argument("--by", default="year,score_bin,days_from_release", help="Comma-separated grouping columns")
+    analyze.add_argument("--output", help="Output CSV (default: <data-dir>/processed/event_return_summary.csv)")
+
+    report = commands.add_parser("report", help="Render analysis figures from summary tables")
+    report.add_argument("--summary", help="Summary by year, score_bin, days_from_release "
+                                          "(default: <data-dir>/processed/event_return_summary.csv)")
+    report.add_argument("--cei", help="CEI CSV for the score distribution (default: <data-dir>/processed/cei_with_dates.csv)")
+    report.add_argument("--event-returns", help="Per-firm event returns (score_bin, event_return) for box plots")
+    report.add_argument("--output-dir", help="Figure directory (default: results/figures)")
+    report.add_argument("--formats", default="png,svg,json", help="Comma-separated: png, svg, json (Plotly)")
+    report.add_argument("--workers", type=int, help="Render processes (default: CPU count)")
+    report.add_argument("--force", action="store_true", help="Re-render figures whose data did not change")
+
+    serve = commands.add_parser("serve", help="Run queued jobs in a warm worker process")
+    serve.add_argument("--queue-dir", help="Job queue directory (default: <data-dir>/queue)")
+    serve.add_argument("--poll", type=float, default=2.0, help="Seconds between queue scans")
+    serve.add_argument("--once", action="store_true", help="Process pending jobs and exit")
+    serve.add_argument("--no-warm", dest="warm", action="store_false", help="Skip pre-importing backends")
+    return parser
+
+
+_HANDLERS = {
+    "index": _cmd_index,
+    "extract": _cmd_extract,
+    "ocr": _cmd_ocr,
+    "dates": _cmd_dates,
+    "match": _cmd_match,
+    "events": _cmd_events,
+    "build": _cmd_build,
+    "analyze": _cmd_analyze,
+    "report": _cmd_report,
+    "serve": _cmd_serve,
+}
+
+
+def run_command(args: argparse.Namespace) -> int:
+    """Run one parsed command, writing a trace file if requested."""
+    if args.trace:
+        enable_profiling()
+    try:
+        return _HANDLERS[args.command](args)
+    finally:
+        if args.trace:
+            write_trace(args.trace)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse a command line, rejecting option combinations argparse cannot express."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "extract" and args.strategy == "cascade":
+        if not args.cascade_config:
+            parser.error("--strategy cascade needs --cascade-config (written by pfp.evaluation)")
+        if args.backend or args.tables_dir:
+            parser.error("--backend and --tables-dir do not apply to --strategy cascade; "
+                         "each cascade strategy picks its own backend")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point of the ``pfp`` console script."""
+    args = parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(), format='%(levelname)s: %(message)s')
+    return run_command(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
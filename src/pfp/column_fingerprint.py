@@ -0,0 +1,175 @@
+"""
+Cheap per-column fingerprints of extracted table grids.
+
+The extractors try every (company column, score column) pair of a table and
+only find out that a pair was wrong (page numbers, rubric points, row
+numbers) after cleaning and filtering it. A fingerprint summarizes each
+column once: how many cells are scores in 0-100, their histogram, the share
+of multiples of 5, how often consecutive values step by one (page or row
+numbers), and the distance of the histogram from the report year's expected
+CEI score distribution. ``candidate_pairs`` uses the fingerprints to drop
+implausible columns, and whole tables, before any string filtering runs.
+
+Score scales changed over the years (early reports rate on a 7-step scale
+from 14 to 100), so the expected histogram is per year, e.g. built by
+``neighbour_histogram`` from an adjacent year's extraction. Without one the
+distance check is skipped.
+"""
+
+import os
+import re
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .analysis import SCORE_BIN_EDGES, score_bin_codes
+
+# Rough share of ratings per score bin (0-9, ..., 90-99, 100) in recent
+# reports: most rated firms score high and a large share get 100. Only used
+# when passed explicitly; it does not fit the early reports.
+DEFAULT_SCORE_HISTOGRAM = np.array([0.04, 0.03, 0.04, 0.05, 0.05, 0.07, 0.08, 0.10, 0.13, 0.19, 0.22])
+
+# Fingerprint thresholds
+MIN_SCORES = 3
+MIN_SCORE_SHARE = 0.5
+MAX_STEP_ONE_SHARE = 0.6
+MAX_DISTANCE = 0.8
+MIN_VALUES_FOR_DISTANCE = 20
+MIN_ALPHA_SHARE = 0.3
+
+_NUMBER = re.compile(r'^\s*\d+(\.\d+)?\s*$')
+_ALPHA = re.compile(r'[A-Za-z]{2}')
+
+
+class ColumnFingerprint:
+    """Summary statistics of one table column."""
+
+    __slots__ = ('n_cells', 'n_scores', 'score_share', 'histogram', 'multiple_of_5_share',
+                 'step_one_share', 'n_distinct', 'alpha_share', 'distance')
+
+    def __init__(self, values: Sequence[str], expected: Optional[np.ndarray] = None):
+        cells = [str(v).strip() for v in values]
+        cells = [c for c in cells if c and c.lower() not in ('nan', 'none')]
+        numbers = np.array([float(c) for c in cells if _NUMBER.match(c)], dtype='float64')
+        scores = numbers[(numbers >= 0) & (numbers <= 100)]
+
+        self.n_cells = len(cells)
+        self.n_scores = len(scores)
+        self.score_share = self.n_scores / self.n_cells if self.n_cells else 0.0
+        counts = np.bincount(score_bin_codes(scores), minlength=len(SCORE_BIN_EDGES) + 1)
+        self.histogram = counts / counts.sum() if counts.sum() else counts.astype('float64')
+        self.multiple_of_5_share = float((scores % 5 == 0).mean()) if len(scores) else 0.0
+        self.step_one_share = float((np.diff(numbers) == 1).mean()) if len(numbers) > 1 else 0.0
+        self.n_distinct = len(np.unique(scores))
+        self.alpha_share = sum(bool(_ALPHA.search(c)) for c in cells) / self.n_cells if self.n_cells else 0.0
+        # Total variation distance between the score and expected histograms
+        # (None without an expected histogram)
+        if expected is None:
+            self.distance = None
+        else:
+            self.distance = float(np.abs(self.histogram - expected).sum() / 2) if self.n_scores else 1.0
+
+    def __repr__(self) -> str:
+        distance = "None" if self.distance is None else f"{self.distance:.2f}"
+        return (f"ColumnFingerprint(n_scores={self.n_scores}, score_share={self.score_share:.2f}, "
+                f"step_one_share={self.step_one_share:.2f}, distance={distance}, "
+                f"alpha_share={self.alpha_share:.2f})")
+
+    def is_score_column(self, reject_constant: bool = False) -> bool:
+        """
+        Whether the column can hold CEI scores.
+
+        Args:
+            reject_constant: Also reject a column with one repeated value,
+                e.g. "100" rubric totals. Off by default: a page of the
+                ratings list can have every company at 100.
+        """
+        if self.n_scores < MIN_SCORES or self.score_share < MIN_SCORE_SHARE:
+            return False
+        if self.step_one_share > MAX_STEP_ONE_SHARE:
+            return False  # page or row numbers
+        if reject_constant and self.n_distinct < 2 and self.n_scores > 5:
+            return False
+        if self.distance is None or self.n_scores < MIN_VALUES_FOR_DISTANCE:
+            return True
+        return self.distance <= MAX_DISTANCE
+
+    def is_company_column(self) -> bool:
+        """Whether the column can hold company names."""
+        return self.n_cells >= MIN_SCORES and self.alpha_share >= MIN_ALPHA_SHARE
+
+
+def expected_histogram(scores: Sequence[float]) -> np.ndarray:
+    """
+    Score-bin shares of known scores, e.g. a neighbouring year's extraction.
+
+    Args:
+        scores: CEI scores
+
+    Returns:
+        Histogram over the bins of ``SCORE_BIN_EDGES``, summing to 1.
+    """
+    codes = score_bin_codes(scores)
+    counts = np.bincount(codes[codes >= 0], minlength=len(SCORE_BIN_EDGES) + 1).astype('float64')
+    return counts / counts.sum() if counts.sum() else DEFAULT_SCORE_HISTOGRAM
+
+
+def neighbour_histogram(cei_dir: str, year: int) -> Optional[np.ndarray]:
+    """
+    Expected score histogram for a report year from the adjacent years.
+
+    Pools the ``CEI_Score`` column of ``cei_<year-1>.csv`` and
+    ``cei_<year+1>.csv`` in ``cei_dir``, whichever exist.
+
+    Args:
+        cei_dir: Directory of extracted ``cei_<year>.csv`` files
+        year: Report year
+
+    Returns:
+        Histogram (see ``expected_histogram``), or None when the adjacent
+        years have fewer than ``MIN_VALUES_FOR_DISTANCE`` scores between them.
+    """
+    scores = []
+    for other in (year - 1, year + 1):
+        path = os.path.join(cei_dir, f"cei_{other}.csv")
+        if os.path.exists(path):
+            df = pd.read_csv(path)
+            if "CEI_Score" in df.columns:
+                scores.append(pd.to_numeric(df["CEI_Score"], errors="coerce").dropna())
+    if not scores or sum(len(s) for s in scores) < MIN_VALUES_FOR_DISTANCE:
+        return None
+    return expected_histogram(pd.concat(scores).to_numpy())
+
+
+def fingerprint_table(df: pd.DataFrame, expected: Optional[np.ndarray] = None) -> List[ColumnFingerprint]:
+    """Fingerprint every column of a table grid."""
+    return [ColumnFingerprint(df.iloc[:, i].tolist(), expected) for i in range(df.shape[1])]
+
+
+def candidate_pairs(
+    df: pd.DataFrame,
+    max_company_col: int,
+    expected: Optional[np.ndarray] = None,
+    reject_constant: bool = False,
+) -> List[Tuple[int, int]]:
+    """
+    (company column, score column) pairs worth extracting from a table.
+
+    Args:
+        df: Table grid
+        max_company_col: Only the first this many columns can hold companies
+        expected: Expected score histogram of the report year; None skips
+            the distance check
+        reject_constant: Drop score columns with one repeated value (see
+            ``ColumnFingerprint.is_score_column``)
+
+    Returns:
+        Pairs in the extractors' loop order; empty when the table has no
+        plausible score or company column.
+    """
+    fingerprints = fingerprint_table(df, expected)
+    score_cols = [i for i, fp in enumerate(fingerprints) if fp.is_score_column(reject_constant)]
+    company_cols = [i for i, fp in enumerate(fingerprints[:max_company_col]) if fp.is_company_column()]
+    return [(c, s) for c in company_cols for s in score_cols if c != s]
+
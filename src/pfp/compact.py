@@ -0,0 +1,170 @@
+"""
+Memory-compact dtypes for CEI tables and firm-day event panels.
+
+Extraction results and event panels default to float64 scores and returns
+and to one Python string object per row for names and CUSIPs. The helpers
+here convert them to categoricals, small integers and float32, and report
+the memory saved.
+"""
+
+import logging
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+# Default target dtypes by column name, shared by CEI tables and event panels.
+# Returns and prices only need float32: CRSP reports them to 6 and 4-5
+# significant digits respectively.
+COMPACT_DTYPES: Dict[str, str] = {
+    'Company': 'category',
+    'Employer': 'category',
+    'employer': 'category',
+    'COMNAM': 'category',
+    'Matched_Public_Company': 'category',
+    'CUSIP': 'category',
+    'cusip': 'category',
+    'cusip6': 'category',
+    'TICKER': 'category',
+    'score_bin': 'category',
+    'CEI_Score': 'uint8',
+    'cei_score': 'uint8',
+    'CEI_Rating': 'uint8',
+    'Year': 'int16',
+    'year': 'int16',
+    'cei_year': 'int16',
+    'days_from_release': 'int16',
+    'PERMNO': 'int32',
+    'PRC': 'float32',
+    'RET': 'float32',
+    'RETX': 'float32',
+    'vwretd': 'float32',
+    'ewretd': 'float32',
+    'sprtrn': 'float32',
+    'daily_return': 'float32',
+    'excess_return': 'float32',
+    'Match_Score': 'float32',
+}
+
+_INTEGER_DTYPES = ('uint8', 'int16', 'int32')
+
+
+def _to_integer(values: pd.Series, dtype: str) -> pd.Series:
+    """Convert to a small integer dtype, keeping floats if values are fractional or out of range."""
+    numeric = pd.to_numeric(values, errors='coerce')
+    info = np.iinfo(dtype)
+    finite = numeric.dropna()
+    if not finite.empty and (
+        (finite != np.round(finite)).any() or finite.min() < info.min or finite.max() > info.max
+    ):
+        return numeric.astype('float32')
+    if numeric.isna().any():
+        # Nullable integer keeps missing scores/years as <NA>
+        return numeric.astype(dtype.capitalize().replace('Uint', 'UInt'))
+    return numeric.astype(dtype)
+
+
+def compact_frame(
+    df: pd.DataFrame,
+    dtypes: Optional[Dict[str, str]] = None,
+    categorize_threshold: float = 0.5,
+) -> pd.DataFrame:
+    """
+    Convert a frame to compact dtypes.
+
+    Columns named in ``dtypes`` (default ``COMPACT_DTYPES``) get that dtype;
+    integer targets fall back to float32 when values are fractional or out
+    of range, and to nullable integers when values are missing. Other string
+    columns become categoricals when fewer than ``categorize_threshold`` of
+    their values are distinct, and other int64/float64 columns are
+    downcast where lossless.
+
+    Args:
+        df: Input frame (not modified)
+        dtypes: Column -> dtype overrides, merged over ``COMPACT_DTYPES``
+        categorize_threshold: Maximum distinct/total ratio for automatic categoricals
+
+    Returns:
+        New frame with compact dtypes.
+    """
+    targets = {**COMPACT_DTYPES, **(dtypes or {})}
+    out = {}
+    for col in df.columns:
+        values = df[col]
+        target = targets.get(col)
+        if target in _INTEGER_DTYPES:
+            out[col] = _to_integer(values, target)
+        elif target == 'float32':
+            out[col] = pd.to_numeric(values, errors='coerce').astype('float32')
+        elif target is not None:
+            out[col] = values.astype(target)
+        elif values.dtype == object or pd.api.types.is_string_dtype(values.dtype):
+            n_unique = values.nunique(dropna=False)
+            out[col] = values.astype('category') if n_unique <= len(values) * categorize_threshold else values
+        elif pd.api.types.is_integer_dtype(values.dtype) and values.dtype.kind in 'iu':
+            out[col] = pd.to_numeric(values, downcast='integer')
+        else:
+            out[col] = values
+    return pd.DataFrame(out, index=df.index)
+
+
+def read_compact_csv(path: str, usecols: Optional[Iterable[str]] = None, **kwargs) -> pd.DataFrame:
+    """
+    Read a CSV straight into compact dtypes.
+
+    Name and CUSIP columns are parsed as categoricals by ``read_csv``, so
+    their per-row string objects are never built; the remaining columns are
+    converted by ``compact_frame``.
+
+    Args:
+        path: CSV file
+        usecols: Columns to load (default: all)
+        **kwargs: Passed to ``compact_frame`` (dtypes, categorize_threshold)
+
+    Returns:
+        Compact DataFrame.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    columns = [c for c in header if usecols is None or c in set(usecols)]
+    targets = {**COMPACT_DTYPES, **(kwargs.get('dtypes') or {})}
+    # CRSP return columns hold letter codes ("C", "B") for missing values,
+    # so only categoricals are parsed in read_csv; numbers go through compact_frame
+    read_dtypes = {c: 'category' for c in columns if targets.get(c) == 'category'}
+    df = pd.read_csv(path, usecols=columns, dtype=read_dtypes)
+    return compact_frame(df, **kwargs)
+
+
+def memory_report(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-column memory footprint.
+
+    Args:
+        df: Frame to measure
+
+    Returns:
+        DataFrame indexed by column with dtype and deep size in MB, plus a
+        'total' row.
+    """
+    sizes = df.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({'dtype': df.dtypes.astype(str), 'mb': sizes / 2**20})
+    report.loc['total'] = ['', report['mb'].sum()]
+    return report
+
+
+def log_memory_saving(before: pd.DataFrame, after: pd.DataFrame, label: str = 'frame') -> float:
+    """
+    Log and return the memory ratio of a compacted frame to its original.
+
+    Args:
+        before: Original frame
+        after: Compacted frame
+        label: Name used in the log message
+
+    Returns:
+        after/before memory ratio.
+    """
+    before_mb = before.memory_usage(deep=True).sum() / 2**20
+    after_mb = after.memory_usage(deep=True).sum() / 2**20
+    ratio = after_mb / before_mb if before_mb else 1.0
+    logging.info(f"{label}: {before_mb:.1f} MB -> {after_mb:.1f} MB ({ratio:.0%})")
+    return ratio
@@ -8,19 +8,60 @@ import re
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
-import camelot
+import numpy as np
 import pandas as pd
 
+from .column_fingerprint import candidate_pairs
+from .layout_profiles import format_pages, load_profile, update_profile
+from .merge import RowMerger
+from .page_flavor import classify_pages, expand_pages, pages_of_flavor
+from .profiling import count, span
+from .table_backends import DEFAULT_BACKEND
+from .table_store import read_pdf_tables
 from .utils import extract_year_from_filename, find_pdfs_in_folder
 
 
-def extract_cei_comprehensive(pdf_path: str, year: int) -> pd.DataFrame:
+def extract_cei_comprehensive(
+    pdf_path: str,
+    year: int,
+    tables_dir: Optional[str] = None,
+    profiles_dir: Optional[str] = None,
+    backend: Optional[str] = None,
+    expected: Optional[np.ndarray] = None,
+) -> pd.DataFrame:
     """
     Comprehensive extraction using multiple strategies and formats.
+
+    When ``tables_dir`` is given, the raw camelot grids of every strategy are
+    stored there and replayed on later runs instead of re-parsing the PDF.
+
+    Each lattice/stream strategy only runs its flavor on the pages
+    ``page_flavor`` classifies for it (ruled grid vs. column-aligned text).
+
+    When ``profiles_dir`` is given, a matching layout profile sends the
+    extraction straight to the recorded pages and table regions; otherwise
+    the strategies are tried in turn and the winning layout is saved.
+
+    ``backend`` picks the table backend (``table_backends.BACKENDS``) for
+    this run; by default a profile's recorded backend, else camelot.
+
+    ``expected`` is the report year's expected score histogram (see
+    ``column_fingerprint.neighbour_histogram``); without it score columns
+    are not pruned on their score distribution.
     """
     try:
         logging.info(f"Processing {os.path.basename(pdf_path)} for year {year}")
         
+        profile = load_profile(profiles_dir, pdf_path, year) if profiles_dir else None
+        if profile and "camelot" in profile:
+            with span("strategy", strategy="_strategy_profile", year=year):
+                result = _strategy_profile(pdf_path, year, profile["camelot"], tables_dir, backend, expected)
+            if len(result) > 0:
+                result['Year'] = year
+                logging.info(f"Layout profile found {len(result)} companies for year {year}")
+                return result
+            logging.info(f"Layout profile for {year} found nothing; trying all strategies")
+        
         # Try multiple extraction approaches
         strategies = [
             _strategy_lattice_all_pages,
@@ -33,13 +74,16 @@ def extract_cei_comprehensive(pdf_path: str, year: int) -> pd.DataFrame:
         
         best_result = pd.DataFrame()
         best_count = 0
+        best_strategy = None
         
         for i, strategy in enumerate(strategies):
             try:
-                result = strategy(pdf_path, year)
+                with span("strategy", strategy=strategy.__name__, year=year):
+                    result = strategy(pdf_path, year, tables_dir, backend, expected)
                 if len(result) > best_count:
                     best_result = result
                     best_count = len(result)
+                    best_strategy = strategy.__name__
                     logging.info(f"Strategy {i+1} found {len(result)} companies")
                     
                     # If we found a substantial amount, use it
@@ -51,6 +95,10 @@ def extract_cei_comprehensive(pdf_path: str, year: int) -> pd.DataFrame:
                 continue
         
         if len(best_result) > 0:
+            if profiles_dir and best_result.attrs.get("tables"):
+                update_profile(profiles_dir, pdf_path, year, "camelot",
+                               _camelot_layout(best_strategy, best_result.attrs["tables"],
+                                               best_result.attrs.get("backend", DEFAULT_BACKEND)))
             best_result['Year'] = year
             logging.info(f"Best result: {len(best_result)} companies for year {year}")
             return best_result
@@ -63,48 +111,152 @@ def extract_cei_comprehensive(pdf_path: str, year: int) -> pd.DataFrame:
         return pd.DataFrame()
 
 
-def _strategy_lattice_all_pages(pdf_path: str, year: int) -> pd.DataFrame:
+def _strategy_lattice_all_pages(pdf_path: str, year: int, tables_dir: Optional[str] = None,
+                                backend: Optional[str] = None, expected: Optional[np.ndarray] = None) -> pd.DataFrame:
     """Extract using lattice method on all pages."""
-    tables = camelot.read_pdf(pdf_path, pages="all", flavor="lattice")
-    return _process_tables_comprehensive(tables, year)
+    return _strategy_flavor(pdf_path, year, "all", "lattice", tables_dir, backend, expected)
 
 
-def _strategy_stream_all_pages(pdf_path: str, year: int) -> pd.DataFrame:
+def _strategy_stream_all_pages(pdf_path: str, year: int, tables_dir: Optional[str] = None,
+                               backend: Optional[str] = None, expected: Optional[np.ndarray] = None) -> pd.DataFrame:
     """Extract using stream method on all pages."""
-    tables = camelot.read_pdf(pdf_path, pages="all", flavor="stream")
-    return _process_tables_comprehensive(tables, year)
+    return _strategy_flavor(pdf_path, year, "all", "stream", tables_dir, backend, expected)
 
 
-def _strategy_lattice_appendix(pdf_path: str, year: int) -> pd.DataFrame:
+def _strategy_lattice_appendix(pdf_path: str, year: int, tables_dir: Optional[str] = None,
+                               backend: Optional[str] = None, expected: Optional[np.ndarray] = None) -> pd.DataFrame:
     """Extract using lattice method on appendix pages."""
-    tables = camelot.read_pdf(pdf_path, pages="30-100", flavor="lattice")
-    return _process_tables_comprehensive(tables, year)
+    return _strategy_flavor(pdf_path, year, "30-100", "lattice", tables_dir, backend, expected)
 
 
-def _strategy_stream_appendix(pdf_path: str, year: int) -> pd.DataFrame:
+def _strategy_stream_appendix(pdf_path: str, year: int, tables_dir: Optional[str] = None,
+                              backend: Optional[str] = None, expected: Optional[np.ndarray] = None) -> pd.DataFrame:
     """Extract using stream method on appendix pages."""
-    tables = camelot.read_pdf(pdf_path, pages="30-100", flavor="stream")
-    return _process_tables_comprehensive(tables, year)
+    return _strategy_flavor(pdf_path, year, "30-100", "stream", tables_dir, backend, expected)
 
 
-def _strategy_wide_range_lattice(pdf_path: str, year: int) -> pd.DataFrame:
+def _strategy_wide_range_lattice(pdf_path: str, year: int, tables_dir: Optional[str] = None,
+                                 backend: Optional[str] = None, expected: Optional[np.ndarray] = None) -> pd.DataFrame:
     """Extract using lattice method on wide page range."""
-    tables = camelot.read_pdf(pdf_path, pages="10-80", flavor="lattice")
-    return _process_tables_comprehensive(tables, year)
+    return _strategy_flavor(pdf_path, year, "10-80", "lattice", tables_dir, backend, expected)
 
 
-def _strategy_wide_range_stream(pdf_path: str, year: int) -> pd.DataFrame:
+def _strategy_wide_range_stream(pdf_path: str, year: int, tables_dir: Optional[str] = None,
+                                backend: Optional[str] = None, expected: Optional[np.ndarray] = None) -> pd.DataFrame:
     """Extract using stream method on wide page range."""
-    tables = camelot.read_pdf(pdf_path, pages="10-80", flavor="stream")
-    return _process_tables_comprehensive(tables, year)
+    return _strategy_flavor(pdf_path, year, "10-80", "stream", tables_dir, backend, expected)
+
+
+def _strategy_flavor(pdf_path: str, year: int, pages: str, flavor: str,
+                     tables_dir: Optional[str] = None, backend: Optional[str] = None,
+                     expected: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """
+    Run one camelot flavor over the pages of ``pages`` classified for it.
+
+    A classified page on which the flavor finds no companies is retried
+    with the other flavor when a neighbouring page yielded companies, so a
+    misclassified page of the ratings list is not lost. Empty pages away
+    from the list are not retried: reading them with the other flavor
+    would undo what the classification saves.
+    """
+    flavors = classify_pages(pdf_path)
+    flavor_spec = pages if flavors is None else pages_of_flavor(flavors, pages, flavor)
+    if not flavor_spec:
+        logging.debug(f"No {flavor} pages in {pages} of {os.path.basename(pdf_path)}")
+        return pd.DataFrame()
+    tables = list(read_pdf_tables(pdf_path, flavor_spec, flavor, tables_dir, backend))
+    result = _process_tables_comprehensive(tables, year, expected)
+
+    if flavors is not None:
+        found = {t["page"] for t in result.attrs.get("tables", [])}
+        missed = [p for p in expand_pages(flavor_spec, len(flavors))
+                  if p not in found and (p - 1 in found or p + 1 in found)]
+        if missed:
+            other = "stream" if flavor == "lattice" else "lattice"
+            logging.debug(f"No companies on {flavor} pages {format_pages(missed)}; retrying them as {other}")
+            count("flavor_fallback_pages", len(missed), flavor=other)
+            tables += read_pdf_tables(pdf_path, format_pages(missed), other, tables_dir, backend)
+            result = _process_tables_comprehensive(tables, year, expected)
+    if "tables" in result.attrs:
+        result.attrs["backend"] = backend or DEFAULT_BACKEND
+    return result
+
+
+def _strategy_profile(pdf_path: str, year: int, layout: Dict, tables_dir: Optional[str] = None,
+                      backend: Optional[str] = None, expected: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """
+    Extract only the pages and table regions recorded in a layout profile.
+
+    The table backend is ``backend`` when given, else the profile's own.
+    Each recorded table is read in its own flavor (the layout's flavor for
+    profiles that do not record one per table).
+    """
+    backend = backend or layout.get("backend")
+    by_flavor: Dict[str, List[int]] = {}
+    for known in layout["tables"]:
+        by_flavor.setdefault(known.get("flavor") or layout["flavor"], []).append(known["page"])
+    tables = []
+    for flavor, pages in by_flavor.items():
+        spec = layout["pages"] if len(by_flavor) == 1 else format_pages(pages)
+        tables += [table for table in read_pdf_tables(pdf_path, spec, flavor, tables_dir, backend)
+                   if _matches_layout(table, layout)]
+    return _process_tables_comprehensive(tables, year, expected)
 
 
-def _process_tables_comprehensive(tables, year: int) -> pd.DataFrame:
-    """Process extracted tables with comprehensive company detection."""
+def _matches_layout(table, layout: Dict) -> bool:
+    """Whether a table is one of the profile's tables (same page, overlapping bbox, same width)."""
+    if layout.get("columns") and table.df.shape[1] != layout["columns"]:
+        return False
+    for known in layout["tables"]:
+        if str(known["page"]) != str(table.page):
+            continue
+        if known.get("bbox") is None or getattr(table, "_bbox", None) is None:
+            return True
+        if _bbox_overlap(known["bbox"], table._bbox) > 0.5:
+            return True
+    return False
+
+
+def _bbox_overlap(a, b) -> float:
+    """Intersection over union of two (x1, y1, x2, y2) boxes."""
+    ix = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    iy = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def _camelot_layout(strategy: str, tables: List[Dict], backend: str = DEFAULT_BACKEND) -> Dict:
+    """Layout profile section for the tables behind a successful extraction."""
+    columns = pd.Series([t["columns"] for t in tables]).mode()
+    return {
+        "strategy": strategy,
+        "backend": backend,
+        "flavor": tables[0]["flavor"],
+        "pages": format_pages(t["page"] for t in tables),
+        "columns": int(columns.iloc[0]) if len(columns) == 1 else None,
+        "tables": [{"page": t["page"], "bbox": t["bbox"], "flavor": t["flavor"]} for t in tables],
+    }
+
+
+def _process_tables_comprehensive(tables, year: int, expected: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """
+    Process extracted tables with comprehensive company detection.
+
+    Rows of all tables are merged on the normalized company name; when a
+    company appears with different scores, the table with the higher
+    extraction quality wins.
+
+    The result's ``attrs["tables"]`` lists the page, bbox, flavor and width
+    of the tables that contributed companies, for layout profiles; tables
+    without a page number (e.g. replayed from an older store) still
+    contribute rows but are left out of it.
+    """
     if not tables:
         return pd.DataFrame()
     
-    all_companies = []
+    merger = RowMerger()
+    layout = []
     
     for table in tables:
         df = table.df
@@ -112,42 +264,52 @@ def _process_tables_comprehensive(tables, year: int) -> pd.DataFrame:
             continue
             
         # Try different approaches to find company data
-        companies = _extract_companies_comprehensive(df, year)
+        with span("parse_table", year=year, page=getattr(table, 'page', None)):
+            companies = _extract_companies_comprehensive(df, year, expected)
         if len(companies) > 0:
-            all_companies.append(companies)
+            merger.add_frame(companies, confidence=_score_extraction_quality(companies))
+            page = str(getattr(table, 'page', None) or '')
+            if not page.isdigit():
+                logging.debug("Table without a page number; leaving it out of the layout profile")
+                continue
+            bbox = getattr(table, '_bbox', None)
+            layout.append({
+                "page": int(page),
+                "bbox": None if bbox is None else [float(v) for v in bbox],
+                "flavor": getattr(table, 'flavor', None),
+                "columns": int(df.shape[1]),
+            })
     
-    if all_companies:
-        result = pd.concat(all_companies, ignore_index=True)
-        # Remove duplicates and clean
-        result = result.drop_duplicates(subset=['Company'])
-        result = result[result['CEI_Score'].between(0, 100)]
+    if len(merger):
+        result = merger.to_frame()
+        result.attrs["tables"] = layout
         return result
     
     return pd.DataFrame()
 
 
-def _extract_companies_comprehensive(df: pd.DataFrame, year: int) -> pd.DataFrame:
+def _extract_companies_comprehensive(df: pd.DataFrame, year: int,
+                                     expected: Optional[np.ndarray] = None) -> pd.DataFrame:
     """Extract companies using comprehensive approach."""
     if df.empty or df.shape[1] < 2:
         return pd.DataFrame()
     
-    # Try all possible column combinations
+    # Try the column combinations whose fingerprints look like company
+    # names and CEI scores
     best_result = pd.DataFrame()
     best_score = 0
     
-    for company_col in range(min(4, df.shape[1])):
-        for score_col in range(df.shape[1]):
-            if score_col == company_col:
-                continue
-                
-            result = _try_extraction(df, company_col, score_col, year)
-            
-            # Score the result based on quality indicators
-            score = _score_extraction_quality(result)
-            
-            if score > best_score:
-                best_result = result
-                best_score = score
+    pairs = candidate_pairs(df, max_company_col=4, expected=expected)
+    count("column_pairs_pruned", min(4, df.shape[1]) * (df.shape[1] - 1) - len(pairs), year=year)
+    for company_col, score_col in pairs:
+        result = _try_extraction(df, company_col, score_col, year)
+        
+        # Score the result based on quality indicators
+        score = _score_extraction_quality(result)
+        
+        if score > best_score:
+            best_result = result
+            best_score = score
     
     return best_result
 
@@ -311,7 +473,8 @@ def process_all_missing_years():
         
         # Save file
         output_file = os.path.join(output_folder, f"cei_{year}.csv")
-        cei_data.to_csv(output_file, index=False)
+        with span("write", year=year):
+            cei_data.to_csv(output_file, index=False)
         
         logging.info(f"✓ Saved {len(cei_data)} companies for year {year}")
         processed_count += 1
@@ -0,0 +1,277 @@
+"""
+Accuracy-vs-cost evaluation of the CEI extraction strategies.
+
+Every strategy of the comprehensive, improved and OCR extractors is run on a
+labelled corpus and scored by precision/recall of (company, score) pairs,
+together with its wall time and peak traced memory. Per year, the results
+are reduced to a Pareto table (no other strategy is both faster and more
+accurate) from which a cascade configuration is derived: the fastest
+strategy meeting an accuracy bar, followed by slower frontier fallbacks.
+
+Corpus layout: a directory of CEI PDFs, each with a ``<stem>.labels.csv``
+next to it holding the true ``Company`` and ``CEI_Score`` columns.
+"""
+
+import glob
+import json
+import logging
+import os
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .utils import extract_year_from_filename, normalize_company_name
+
+
+def _comprehensive(name: str, backend: Optional[str] = None) -> Callable[[str, int], pd.DataFrame]:
+    def run(pdf_path: str, year: int) -> pd.DataFrame:
+        from . import comprehensive_cei_extractor
+        return getattr(comprehensive_cei_extractor, name)(pdf_path, year, backend=backend)
+    return run
+
+
+def _improved(name: str, backend: Optional[str] = None) -> Callable[[str, int], pd.DataFrame]:
+    def run(pdf_path: str, year: int) -> pd.DataFrame:
+        from . import cei_improved_extractor
+        return getattr(cei_improved_extractor, name)(pdf_path, year, backend=backend)
+    return run
+
+
+def _ocr(pdf_path: str, year: int) -> pd.DataFrame:
+    from .ocr_cei_extractor import ocr_extract_cei_data
+    return ocr_extract_cei_data(pdf_path, year)
+
+
+# Every extraction strategy, keyed by "<extractor>.<strategy>"; stream
+# strategies also run on the text-layer ``words`` table backend.
+STRATEGIES: Dict[str, Callable[[str, int], pd.DataFrame]] = {
+    "comprehensive.lattice_all_pages": _comprehensive("_strategy_lattice_all_pages"),
+    "comprehensive.stream_all_pages": _comprehensive("_strategy_stream_all_pages"),
+    "comprehensive.lattice_appendix": _comprehensive("_strategy_lattice_appendix"),
+    "comprehensive.stream_appendix": _comprehensive("_strategy_stream_appendix"),
+    "comprehensive.wide_range_lattice": _comprehensive("_strategy_wide_range_lattice"),
+    "comprehensive.wide_range_stream": _comprehensive("_strategy_wide_range_stream"),
+    "improved.appendix": _improved("_extract_strategy_appendix"),
+    "improved.wide_pages": _improved("_extract_strategy_wide_pages"),
+    "improved.all_pages": _improved("_extract_strategy_all_pages"),
+    "comprehensive.stream_appendix.words": _comprehensive("_strategy_stream_appendix", "words"),
+    "comprehensive.wide_range_stream.words": _comprehensive("_strategy_wide_range_stream", "words"),
+    "improved.appendix.words": _improved("_extract_strategy_appendix", "words"),
+    "improved.all_pages.words": _improved("_extract_strategy_all_pages", "words"),
+    "ocr.tesseract": _ocr,
+}
+
+
+def load_corpus(corpus_dir: str) -> List[Tuple[int, str, pd.DataFrame]]:
+    """
+    Load a labelled fixture corpus.
+
+    Args:
+        corpus_dir: Directory with ``*.pdf`` files and ``<stem>.labels.csv`` labels
+
+    Returns:
+        List of (year, pdf_path, labels) sorted by year.
+    """
+    corpus = []
+    for pdf_path in sorted(glob.glob(os.path.join(corpus_dir, "*.pdf"))):
+        labels_path = os.path.splitext(pdf_path)[0] + ".labels.csv"
+        year = extract_year_from_filename(pdf_path)
+        if year is None or not os.path.exists(labels_path):
+            logging.warning(f"Skipping {pdf_path}: no year or labels file")
+            continue
+        corpus.append((year, pdf_path, pd.read_csv(labels_path)))
+    return sorted(corpus, key=lambda item: item[0])
+
+
+def _score_pairs(df: pd.DataFrame) -> set:
+    """Set of (normalized company, integer score) pairs of an extraction."""
+    if df is None or df.empty:
+        return set()
+    scores = pd.to_numeric(df["CEI_Score"], errors="coerce")
+    return {
+        (normalize_company_name(name), int(round(score)))
+        for name, score in zip(df["Company"], scores)
+        if pd.notna(score) and normalize_company_name(name)
+    }
+
+
+def score_extraction(result: pd.DataFrame, labels: pd.DataFrame) -> Dict[str, float]:
+    """
+    Precision/recall of extracted (company, score) pairs against labels.
+
+    Args:
+        result: Extraction with Company and CEI_Score columns
+        labels: Ground truth with Company and CEI_Score columns
+
+    Returns:
+        Dict with precision, recall, f1 and n_rows.
+    """
+    predicted = _score_pairs(result)
+    truth = _score_pairs(labels)
+    hits = len(predicted & truth)
+    precision = hits / len(predicted) if predicted else 0.0
+    recall = hits / len(truth) if truth else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if hits else 0.0
+    return {
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        "n_rows": 0 if result is None else len(result),
+    }
+
+
+def _run_measured(strategy: Callable, pdf_path: str, year: int, measure_memory: bool):
+    start = time.perf_counter()
+    try:
+        result = strategy(pdf_path, year)
+    except Exception as e:
+        logging.debug(f"Strategy failed on {pdf_path}: {e}")
+        result = pd.DataFrame()
+    wall = time.perf_counter() - start
+
+    peak_mb = float("nan")
+    if measure_memory:
+        # Separate pass so tracemalloc overhead does not distort the timing
+        tracemalloc.start()
+        try:
+            strategy(pdf_path, year)
+        except Exception:
+            pass
+        peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return result, wall, peak_mb
+
+
+def evaluate_strategies(
+    corpus: List[Tuple[int, str, pd.DataFrame]],
+    strategies: Optional[List[str]] = None,
+    measure_memory: bool = True,
+) -> pd.DataFrame:
+    """
+    Run strategies over a labelled corpus and record accuracy and cost.
+
+    Args:
+        corpus: Output of ``load_corpus``
+        strategies: Names from ``STRATEGIES`` (default: all)
+        measure_memory: Also record peak traced memory (runs each strategy twice)
+
+    Returns:
+        DataFrame with columns: year, strategy, precision, recall, f1,
+        n_rows, wall_s, peak_mb.
+    """
+    names = strategies or list(STRATEGIES)
+    rows = []
+    for year, pdf_path, labels in corpus:
+        for name in names:
+            result, wall, peak_mb = _run_measured(STRATEGIES[name], pdf_path, year, measure_memory)
+            scores = score_extraction(result, labels)
+            rows.append({"year": year, "strategy": name, **scores, "wall_s": wall, "peak_mb": peak_mb})
+            logging.info(
+                f"{year} {name}: P={scores['precision']:.2f} R={scores['recall']:.2f} in {wall:.1f}s"
+            )
+    return pd.DataFrame(rows)
+
+
+def pareto_table(results: pd.DataFrame, metric: str = "f1") -> pd.DataFrame:
+    """
+    Mark the accuracy/time Pareto frontier per year.
+
+    A strategy is on the frontier when every faster strategy for that year
+    has a strictly lower ``metric``.
+
+    Args:
+        results: Output of ``evaluate_strategies``
+        metric: Accuracy column to trade off against wall time
+
+    Returns:
+        Results sorted by year and wall time with a boolean ``pareto`` column.
+    """
+    table = results.sort_values(["year", "wall_s"]).reset_index(drop=True)
+    best_so_far = table.groupby("year")[metric].cummax().groupby(table["year"]).shift(1)
+    table["pareto"] = (table[metric] > best_so_far.fillna(-1.0)) & (table[metric] > 0)
+    return table
+
+
+def cascade_config(
+    pareto: pd.DataFrame,
+    min_precision: float = 0.9,
+    min_recall: float = 0.8,
+) -> Dict[int, List[str]]:
+    """
+    Derive the per-year strategy cascade from a Pareto table.
+
+    Args:
+        pareto: Output of ``pareto_table``
+        min_precision: Accuracy bar for the primary strategy
+        min_recall: Accuracy bar for the primary strategy
+
+    Returns:
+        {year: [primary, fallback, ...]} where the primary is the fastest
+        strategy meeting the bar (or the most accurate one if none does) and
+        fallbacks are the remaining frontier strategies ordered by time that
+        are slower than the primary or meet the bar. A frontier strategy
+        that is faster only because it is less accurate is never a fallback.
+    """
+    config = {}
+    for year, group in pareto.groupby("year"):
+        frontier = group[group["pareto"]].sort_values("wall_s")
+        passing = group[(group["precision"] >= min_precision) & (group["recall"] >= min_recall)]
+        if not passing.empty:
+            primary = passing.sort_values("wall_s")["strategy"].iloc[0]
+        elif not frontier.empty:
+            primary = frontier.sort_values("f1")["strategy"].iloc[-1]
+        else:
+            continue
+        primary_wall = group.loc[group["strategy"] == primary, "wall_s"].iloc[0]
+        passing_names = set(passing["strategy"])
+        fallbacks = [
+            s for s, wall in zip(frontier["strategy"], frontier["wall_s"])
+            if s != primary and (wall > primary_wall or s in passing_names)
+        ]
+        config[int(year)] = [primary] + fallbacks
+    return config
+
+
+def write_cascade_config(config: Dict[int, List[str]], path: str) -> str:
+    """Write a cascade configuration as JSON."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({str(year): names for year, names in sorted(config.items())}, f, indent=2)
+    return path
+
+
+def load_cascade_config(path: str) -> Dict[int, List[str]]:
+    """Read a cascade configuration written by ``write_cascade_config``."""
+    with open(path) as f:
+        return {int(year): names for year, names in json.load(f).items()}
+
+
+def run_cascade(pdf_path: str, year: int, config: Dict[int, List[str]], min_rows: int = 10) -> pd.DataFrame:
+    """
+    Extract one report by walking its configured strategy cascade.
+
+    Args:
+        pdf_path: Path to the CEI PDF file
+        year: Year of the report
+        config: Output of ``cascade_config`` / ``load_cascade_config``
+        min_rows: Rows a strategy must return to stop the cascade
+
+    Returns:
+        DataFrame with columns: Company, CEI_Score, Year (empty if every
+        strategy fails or the year is not configured).
+    """
+    for name in config.get(year, []):
+        try:
+            result = STRATEGIES[name](pdf_path, year)
+        except Exception as e:
+            logging.debug(f"Cascade strategy {name} failed: {e}")
+            continue
+        if len(result) >= min_rows:
+            result = result.copy()
+            result["Year"] = year
+            logging.info(f"Cascade strategy {name} extracted {len(result)} companies for {year}")
+            return result
+    logging.warning(f"No cascade strategy succeeded for {year}")
+    return pd.DataFrame()
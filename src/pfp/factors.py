@@ -0,0 +1,186 @@
+"""
+Factor-model alphas of calendar-time portfolios.
+
+All portfolio return series are stacked into one T x N matrix and regressed
+on a shared factor design. Series with the same missing-data pattern share
+one QR factorization, so hundreds of portfolio x window regressions cost a
+few factorizations plus matrix products. OLS and Newey-West standard errors
+are computed for every series at once.
+
+Factor files are read locally, in the Ken French daily CSV layout (YYYYMMDD
+dates, returns in percent).
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+MODELS: Dict[str, List[str]] = {
+    'capm': ['Mkt-RF'],
+    'ff3': ['Mkt-RF', 'SMB', 'HML'],
+    'carhart': ['Mkt-RF', 'SMB', 'HML', 'Mom'],
+    'ff5': ['Mkt-RF', 'SMB', 'HML', 'RMW', 'CMA'],
+}
+
+
+def load_factors(path: str, date_col: Optional[str] = None, percent: bool = True) -> pd.DataFrame:
+    """
+    Read a daily factor file.
+
+    Args:
+        path: CSV with a date column and one column per factor (and 'RF')
+        date_col: Date column (default: the first column)
+        percent: Whether returns are in percent, as in the Ken French files
+
+    Returns:
+        DataFrame indexed by date with factor returns as decimals.
+    """
+    df = pd.read_csv(path, skipinitialspace=True)
+    date_col = date_col or df.columns[0]
+    raw = df.pop(date_col).astype(str).str.strip()
+    dates = pd.to_datetime(raw, format='%Y%m%d', errors='coerce')
+    dates = dates.fillna(pd.to_datetime(raw[dates.isna()], errors='coerce'))
+    df.columns = [c.strip() for c in df.columns]
+    df = df.apply(pd.to_numeric, errors='coerce')
+    if percent:
+        df = df / 100
+    df.index = pd.DatetimeIndex(dates, name='date')
+    return df[df.index.notna()].sort_index()
+
+
+def newey_west_lags(n_obs: int) -> int:
+    """Newey-West (1994) rule-of-thumb lag length, floor(4 (T/100)^(2/9))."""
+    return int(np.floor(4 * (n_obs / 100) ** (2 / 9)))
+
+
+def batched_ols(Y: np.ndarray, X: np.ndarray, lags: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """
+    Regress every column of ``Y`` on ``X`` at once.
+
+    Args:
+        Y: T x N responses (NaN rows are dropped per column)
+        X: T x K regressors including the constant
+        lags: Newey-West lags (default: ``newey_west_lags`` of each
+            column's observation count)
+
+    Returns:
+        Dict of arrays: 'coef', 'se', 'se_nw' (K x N), 'n_obs' and 'r2' (N).
+        Columns with fewer observations than regressors are NaN.
+    """
+    T, N = Y.shape
+    K = X.shape[1]
+    out = {name: np.full((K, N), np.nan) for name in ('coef', 'se', 'se_nw')}
+    out['n_obs'] = np.zeros(N, dtype='int64')
+    out['r2'] = np.full(N, np.nan)
+
+    observed = np.isfinite(Y) & np.isfinite(X).all(axis=1)[:, None]
+    patterns, group = np.unique(np.packbits(observed, axis=0).T, axis=0, return_inverse=True)
+    for g in range(len(patterns)):
+        cols = np.flatnonzero(group.ravel() == g)
+        rows = observed[:, cols[0]]
+        n = int(rows.sum())
+        out['n_obs'][cols] = n
+        if n <= K:
+            continue
+        Xg, Yg = X[rows], Y[np.ix_(rows, cols)]
+        # One QR per missing-data pattern, shared by all its columns
+        Q, R = np.linalg.qr(Xg)
+        coef = np.linalg.solve(R, Q.T @ Yg)
+        resid = Yg - Xg @ coef
+        R_inv = np.linalg.inv(R)
+        xtx_inv = R_inv @ R_inv.T
+
+        sigma2 = (resid ** 2).sum(axis=0) / (n - K)
+        se = np.sqrt(np.outer(np.diag(xtx_inv), sigma2))
+
+        # Newey-West: S = G0 + sum_l w_l (G_l + G_l'), G_l = sum_t u_t u_{t-l}'
+        L = newey_west_lags(n) if lags is None else lags
+        U = Xg[:, :, None] * resid[:, None, :]  # t x k x series
+        S = np.einsum('tkn,tjn->nkj', U, U)
+        for lag in range(1, min(L, n - 1) + 1):
+            G = np.einsum('tkn,tjn->nkj', U[lag:], U[:-lag])
+            S += (1 - lag / (L + 1)) * (G + G.transpose(0, 2, 1))
+        cov_nw = xtx_inv @ S @ xtx_inv * n / (n - K)
+        se_nw = np.sqrt(np.clip(np.diagonal(cov_nw, axis1=1, axis2=2), 0, None)).T
+
+        centered = Yg - Yg.mean(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            r2 = 1 - (resid ** 2).sum(axis=0) / (centered ** 2).sum(axis=0)
+        out['coef'][:, cols], out['se'][:, cols], out['se_nw'][:, cols], out['r2'][cols] = coef, se, se_nw, r2
+    return out
+
+
+def factor_alphas(
+    portfolios: pd.DataFrame,
+    factors: pd.DataFrame,
+    model: str = 'ff3',
+    subtract_rf: bool = False,
+    lags: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Alphas and factor loadings of many portfolio return series in one call.
+
+    Args:
+        portfolios: Daily returns indexed by date, one column per portfolio
+        factors: Factor returns indexed by date (``load_factors``)
+        model: Key of ``MODELS`` or a comma-separated list of factor columns
+        subtract_rf: Subtract 'RF' from portfolio returns (for long-only
+            portfolios; long-short returns are already excess returns)
+        lags: Newey-West lags (default: rule of thumb per series)
+
+    Returns:
+        DataFrame indexed by portfolio with alpha, t_stat, se_nw, t_stat_nw,
+        n_obs, r2 and one beta_<factor> column per factor.
+    """
+    names = MODELS.get(model) or [name.strip() for name in model.split(',')]
+    missing = [name for name in names if name not in factors.columns]
+    if missing:
+        raise KeyError(f"Factor file lacks {missing}")
+
+    data = portfolios.join(factors, how='inner')
+    Y = data[portfolios.columns].to_numpy(dtype='float64')
+    if subtract_rf:
+        Y = Y - data[['RF']].to_numpy(dtype='float64')
+    X = np.column_stack([np.ones(len(data)), data[names].to_numpy(dtype='float64')])
+
+    fit = batched_ols(Y, X, lags=lags)
+    result = pd.DataFrame({
+        'alpha': fit['coef'][0],
+        't_stat': fit['coef'][0] / fit['se'][0],
+        'se_nw': fit['se_nw'][0],
+        't_stat_nw': fit['coef'][0] / fit['se_nw'][0],
+        'n_obs': fit['n_obs'],
+        'r2': fit['r2'],
+    }, index=portfolios.columns)
+    for k, name in enumerate(names, start=1):
+        result[f'beta_{name}'] = fit['coef'][k]
+    return result
+
+
+def calendar_time_returns(
+    daily: pd.DataFrame,
+    dates: pd.DatetimeIndex,
+    positions: Sequence[int],
+    columns: Sequence[str] = ('hml',),
+) -> pd.DataFrame:
+    """
+    Map event-time portfolio returns onto calendar dates.
+
+    Args:
+        daily: Output of ``backtest.hml_returns`` (indexed by release and
+            days_from_release)
+        dates: Trading dates of the return matrix (``FirmDayReturns.dates``)
+        positions: Trading-day index of each release
+        columns: Return columns to keep
+
+    Returns:
+        DataFrame indexed by date; days covered by several releases hold
+        the average of their portfolios.
+    """
+    release = daily.index.get_level_values('release').to_numpy()
+    day = daily.index.get_level_values('days_from_release').to_numpy()
+    col = np.asarray(positions)[release] + day
+    inside = (col >= 0) & (col < len(dates))
+    frame = daily.loc[inside, list(columns)].set_axis(pd.DatetimeIndex(dates[col[inside]], name='date'))
+    return frame.groupby(level='date').mean()
@@ -0,0 +1,145 @@
+"""
+Per-year layout profiles learned from successful extractions.
+
+A profile records where a report's company table was found (appendix pages,
+camelot flavor, table bounding boxes and column count) and which OCR line
+parsers produced rows, so the next run can go straight to those pages and
+regions instead of rediscovering the layout by trial. Profiles are JSON
+files, one per report year, with one section per extractor::
+
+    {
+      "year": 2019,
+      "fingerprint": {"sha256": "...", "page_count": 112},
+      "camelot": {"strategy": "_strategy_stream_appendix", "flavor": "stream",
+                  "pages": "41-77", "columns": 3,
+                  "tables": [{"page": 41, "bbox": [x1, y1, x2, y2]}, ...]},
+      "ocr": {"first_page": 40, "last_page": 77, "parsers": ["clean", "modern"]}
+    }
+
+A profile is only used while its fingerprint matches the PDF on disk; a
+replaced or re-downloaded report falls back to discovery and is re-learned.
+"""
+
+import json
+import logging
+import mmap
+import os
+import re
+from typing import Any, Dict, Iterable, Optional
+
+from .utils import file_sha256
+
+# Page objects in the raw PDF bytes ("/Type /Page", not "/Type /Pages")
+_PAGE_OBJECT = re.compile(rb"/Type\s*/Page\b")
+
+
+def pdf_fingerprint(pdf_path: str) -> Dict[str, Any]:
+    """
+    Identify a PDF by content hash and page count.
+
+    Args:
+        pdf_path: Path to the PDF file
+
+    Returns:
+        Dict with "sha256" and "page_count" (number of page objects found
+        in the file; 0 when they are hidden in compressed object streams).
+    """
+    with open(pdf_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            page_count = 0
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                page_count = len(_PAGE_OBJECT.findall(data))
+    return {"sha256": file_sha256(pdf_path), "page_count": page_count}
+
+
+def profile_path(profiles_dir: str, year: int) -> str:
+    """Path of the layout profile for a report year."""
+    return os.path.join(profiles_dir, f"layout_{year}.json")
+
+
+def format_pages(pages: Iterable[int]) -> str:
+    """
+    Format page numbers as a camelot page specification.
+
+    Args:
+        pages: Page numbers
+
+    Returns:
+        Comma-separated ranges, e.g. "3,41-43".
+    """
+    pages = sorted(set(int(p) for p in pages))
+    ranges = []
+    for page in pages:
+        if ranges and page == ranges[-1][1] + 1:
+            ranges[-1][1] = page
+        else:
+            ranges.append([page, page])
+    return ",".join(str(a) if a == b else f"{a}-{b}" for a, b in ranges)
+
+
+def _read(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable layout profile {path}: {e}")
+        return None
+
+
+def load_profile(profiles_dir: str, pdf_path: str, year: int) -> Optional[Dict[str, Any]]:
+    """
+    Load the layout profile of a report if it still matches the PDF.
+
+    Args:
+        profiles_dir: Directory holding layout profiles
+        pdf_path: Path to the CEI PDF file
+        year: Year of the report
+
+    Returns:
+        The profile dict, or None when there is no profile or its
+        fingerprint does not match ``pdf_path``.
+    """
+    path = profile_path(profiles_dir, year)
+    if not os.path.exists(path):
+        return None
+    profile = _read(path)
+    if profile is None:
+        return None
+    if profile.get("fingerprint") != pdf_fingerprint(pdf_path):
+        logging.info(f"Layout profile for {year} does not match {os.path.basename(pdf_path)}; rediscovering")
+        return None
+    return profile
+
+
+def update_profile(profiles_dir: str, pdf_path: str, year: int, section: str, layout: Dict[str, Any]) -> str:
+    """
+    Store one extractor's learned layout in the report's profile.
+
+    Other sections are kept when the existing profile has the same
+    fingerprint and dropped otherwise.
+
+    Args:
+        profiles_dir: Directory holding layout profiles
+        pdf_path: Path to the CEI PDF file
+        year: Year of the report
+        section: Extractor section, e.g. "camelot" or "ocr"
+        layout: JSON-serializable layout for that extractor
+
+    Returns:
+        The profile path written.
+    """
+    fingerprint = pdf_fingerprint(pdf_path)
+    path = profile_path(profiles_dir, year)
+    profile = _read(path) if os.path.exists(path) else None
+    if profile is None or profile.get("fingerprint") != fingerprint:
+        profile = {"year": year, "fingerprint": fingerprint}
+    profile[section] = layout
+
+    os.makedirs(profiles_dir, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(profile, f, indent=2)
+    os.replace(tmp_path, path)
+    logging.info(f"Saved {section} layout profile for {year} to {path}")
+    return path
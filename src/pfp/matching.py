@@ -0,0 +1,325 @@
+"""
+Fuzzy matching of CEI employers to public companies.
+
+``match_cei_to_public`` scores every employer against every public name.
+``match_names_blocked`` restricts candidates to names sharing a blocking key
+(first token or its Soundex code) and spreads the work over a process pool.
+The security-master index is written once to memory-mapped arrays that the
+workers open read-only, so it is never pickled per task.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .utils import normalize_company_name
+
+
+def match_cei_to_public(
+    cei_df: pd.DataFrame,
+    public_df: pd.DataFrame,
+    threshold: int = 90,
+    employer_col: str = 'Employer',
+    company_col: str = 'Company',
+) -> pd.DataFrame:
+    """
+    Match CEI employers to public companies using fuzzy matching.
+
+    Args:
+        cei_df: DataFrame with CEI employers
+        public_df: DataFrame with public company names
+        threshold: Minimum token-set similarity (0-100) to accept a match
+        employer_col: Employer name column in ``cei_df``
+        company_col: Company name column in ``public_df`` (e.g. 'COMNAM')
+
+    Returns:
+        ``cei_df`` with added 'Matched_Public_Company' (original public name)
+        and 'Match_Score' columns.
+    """
+    from rapidfuzz import fuzz, process
+
+    cei_df = cei_df.copy()
+    normalized_employers = cei_df[employer_col].astype(str).map(normalize_company_name)
+    public = public_df[[company_col]].dropna().drop_duplicates()
+    public['Normalized_Company'] = public[company_col].astype(str).map(normalize_company_name)
+    public = public.drop_duplicates(subset=['Normalized_Company'])
+
+    public_names = public['Normalized_Company'].tolist()
+    matched_names = []
+    match_scores = []
+
+    for name in normalized_employers:
+        match = process.extractOne(name, public_names, scorer=fuzz.token_set_ratio)
+        if match is not None and match[1] >= threshold:
+            matched_names.append(match[0])
+            match_scores.append(match[1])
+        else:
+            matched_names.append(None)
+            match_scores.append(None)
+
+    original_names = public.set_index('Normalized_Company')[company_col]
+    cei_df['Matched_Public_Company'] = pd.Series(matched_names, index=cei_df.index).map(original_names)
+    cei_df['Match_Score'] = match_scores
+
+    logging.info(f"Matched {cei_df['Matched_Public_Company'].notna().sum()}/{len(cei_df)} employers")
+    return cei_df
+
+
+_SOUNDEX_CODES = {c: str(d) for d, letters in enumerate(
+    ['aeiouyhw', 'bfpv', 'cgjkqsxz', 'dt', 'l', 'mn', 'r']) for c in letters}
+
+
+def soundex(word: str) -> str:
+    """American Soundex code of a word (e.g. 'robert' -> 'R163'); '' if it has no letters."""
+    letters = [c for c in word.lower() if c.isalpha()]
+    if not letters:
+        return ''
+    code = letters[0].upper()
+    previous = _SOUNDEX_CODES.get(letters[0], '')
+    for c in letters[1:]:
+        digit = _SOUNDEX_CODES.get(c, '')
+        if digit and digit != '0' and digit != previous:
+            code += digit
+        if c not in 'hw':
+            previous = digit
+    return (code + '000')[:4]
+
+
+def blocking_keys(name: str) -> List[str]:
+    """
+    Blocking keys of a normalized name: its first token and that token's Soundex code.
+
+    Names are only compared when they share a key, so spelling variants of
+    the first word ('Kelogg' / 'Kellogg') still meet.
+    """
+    tokens = name.split()
+    if not tokens:
+        return []
+    return ['t:' + tokens[0], 's:' + soundex(tokens[0])]
+
+
+def _key_hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'little', signed=True)
+
+
+def build_name_index(names: Sequence[str], index_dir: str) -> str:
+    """
+    Write a blocked name index as memory-mappable ``.npy`` files.
+
+    Files: ``names.npy`` (UTF-8 bytes of all names), ``offsets.npy`` (name
+    start offsets), a CSR block table ``block_hashes.npy`` (sorted key
+    hashes), ``block_offsets.npy`` and ``block_ids.npy`` (name ids per key),
+    and ``build_id.npy``, a random id written last that identifies this build.
+
+    Each file is written next to its target and renamed over it, so an
+    index that is still memory-mapped from an earlier build keeps its old
+    (unlinked) files instead of being truncated under the mapping.
+
+    Args:
+        names: Normalized security-master names
+        index_dir: Directory to write
+
+    Returns:
+        ``index_dir``.
+    """
+    os.makedirs(index_dir, exist_ok=True)
+    encoded = [name.encode('utf-8') for name in names]
+    offsets = np.zeros(len(encoded) + 1, dtype='int64')
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    _save(index_dir, 'names.npy', np.frombuffer(b''.join(encoded), dtype='uint8'))
+    _save(index_dir, 'offsets.npy', offsets)
+
+    pairs = [(_key_hash(key), i) for i, name in enumerate(names) for key in blocking_keys(name)]
+    hashes = np.array([h for h, _ in pairs], dtype='int64')
+    ids = np.array([i for _, i in pairs], dtype='int64')
+    order = np.lexsort((ids, hashes))
+    hashes, ids = hashes[order], ids[order]
+    block_hashes, starts = np.unique(hashes, return_index=True)
+    _save(index_dir, 'block_hashes.npy', block_hashes)
+    _save(index_dir, 'block_offsets.npy', np.append(starts, len(ids)).astype('int64'))
+    _save(index_dir, 'block_ids.npy', ids)
+    _save(index_dir, 'build_id.npy', np.frombuffer(os.urandom(8), dtype='uint64'))
+    return index_dir
+
+
+def _save(index_dir: str, name: str, array: np.ndarray) -> None:
+    path = os.path.join(index_dir, name)
+    with tempfile.NamedTemporaryFile(dir=index_dir, suffix='.npy', delete=False) as f:
+        np.save(f, array)
+    os.replace(f.name, path)
+
+
+def _build_id(index_dir: str) -> int:
+    return int(np.load(os.path.join(index_dir, 'build_id.npy'))[0])
+
+
+class _NameIndex:
+    """Read-only view of an index written by ``build_name_index``."""
+
+    def __init__(self, index_dir: str):
+        def load(name):
+            return np.load(os.path.join(index_dir, name), mmap_mode='r')
+        self.names = load('names.npy')
+        self.offsets = load('offsets.npy')
+        self.block_hashes = load('block_hashes.npy')
+        self.block_offsets = load('block_offsets.npy')
+        self.block_ids = load('block_ids.npy')
+
+    def candidates(self, name: str) -> np.ndarray:
+        """Ids of names sharing a blocking key with ``name``."""
+        found = []
+        for key in blocking_keys(name):
+            h = _key_hash(key)
+            pos = np.searchsorted(self.block_hashes, h)
+            if pos < len(self.block_hashes) and self.block_hashes[pos] == h:
+                found.append(self.block_ids[self.block_offsets[pos]:self.block_offsets[pos + 1]])
+        return np.unique(np.concatenate(found)) if found else np.array([], dtype='int64')
+
+    def name(self, i: int) -> str:
+        return bytes(self.names[self.offsets[i]:self.offsets[i + 1]]).decode('utf-8')
+
+
+# Open indexes per process, keyed by (index_dir, build id) so a rebuilt
+# index is reopened rather than served from a stale mapping
+_OPEN_INDEXES: Dict[Tuple[str, int], _NameIndex] = {}
+
+
+def _open_index(index_dir: str) -> _NameIndex:
+    key = (index_dir, _build_id(index_dir))
+    index = _OPEN_INDEXES.get(key)
+    if index is None:
+        for stale in [k for k in _OPEN_INDEXES if k[0] == index_dir]:
+            del _OPEN_INDEXES[stale]
+        index = _OPEN_INDEXES[key] = _NameIndex(index_dir)
+    return index
+
+
+def _match_shard(index_dir: str, queries: List[Tuple[int, str]], top_k: int, threshold: float):
+    """Top-k matches of a shard of queries; runs in a worker process."""
+    from rapidfuzz import fuzz, process
+
+    index = _open_index(index_dir)
+
+    results = []
+    for query_id, name in queries:
+        ids = index.candidates(name)
+        if not len(ids):
+            continue
+        choices = [index.name(i) for i in ids]
+        for rank, (_, score, pos) in enumerate(process.extract(
+            name, choices, scorer=fuzz.token_set_ratio, limit=top_k, score_cutoff=threshold
+        )):
+            results.append((query_id, rank, int(ids[pos]), score))
+    return results
+
+
+def _shards(queries: List[Tuple[int, str]], n_shards: int) -> List[List[Tuple[int, str]]]:
+    """Split queries into shards by first token, balancing shard sizes."""
+    blocks: Dict[str, List[Tuple[int, str]]] = {}
+    for query in queries:
+        keys = blocking_keys(query[1])
+        blocks.setdefault(keys[0] if keys else '', []).append(query)
+    shards = [[] for _ in range(max(1, n_shards))]
+    # Largest blocks first, each into the currently smallest shard
+    for block in sorted(blocks.values(), key=len, reverse=True):
+        min(shards, key=len).extend(block)
+    return [shard for shard in shards if shard]
+
+
+def match_names_blocked(
+    queries: Sequence[str],
+    names: Sequence[str],
+    threshold: float = 90,
+    top_k: int = 3,
+    workers: Optional[int] = None,
+    index_dir: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Top-k fuzzy matches of query names among candidate names sharing a blocking key.
+
+    Args:
+        queries: Normalized query names (duplicates are scored once)
+        names: Normalized security-master names
+        threshold: Minimum token-set similarity (0-100)
+        top_k: Matches kept per query
+        workers: Worker processes (default: CPU count; 1 runs in-process)
+        index_dir: Where to write the memory-mapped index (default: a
+            temporary directory removed afterwards)
+
+    Returns:
+        DataFrame with query, rank, name_id, name and score, one row per
+        match, sorted by query order and rank.
+    """
+    workers = workers or os.cpu_count() or 1
+    unique_queries = list(dict.fromkeys(queries))
+    tasks = list(enumerate(unique_queries))
+
+    with tempfile.TemporaryDirectory(prefix='pfp-names-') as tmp_dir:
+        index_dir = build_name_index(names, index_dir or tmp_dir)
+        # Several shards per worker keep the pool busy when blocks are uneven
+        shards = _shards(tasks, workers * 4)
+        if workers == 1:
+            parts = [_match_shard(index_dir, shard, top_k, threshold) for shard in shards]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parts = list(pool.map(_match_shard, [index_dir] * len(shards), shards,
+                                      [top_k] * len(shards), [threshold] * len(shards)))
+
+    rows = [row for part in parts for row in part]
+    result = pd.DataFrame(rows, columns=['query_id', 'rank', 'name_id', 'score'])
+    result = result.sort_values(['query_id', 'rank']).reset_index(drop=True)
+    result.insert(0, 'query', [unique_queries[i] for i in result['query_id']])
+    result['name'] = [names[i] for i in result['name_id']]
+    return result.drop(columns='query_id')
+
+
+def match_cei_to_public_parallel(
+    cei_df: pd.DataFrame,
+    public_df: pd.DataFrame,
+    threshold: int = 90,
+    employer_col: str = 'Employer',
+    company_col: str = 'Company',
+    workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Blocked, multi-process version of ``match_cei_to_public``.
+
+    Each distinct normalized employer is matched once, against public names
+    sharing its first token or that token's Soundex code.
+
+    Args:
+        cei_df: DataFrame with CEI employers (all years)
+        public_df: DataFrame with public company names
+        threshold: Minimum token-set similarity (0-100) to accept a match
+        employer_col: Employer name column in ``cei_df``
+        company_col: Company name column in ``public_df``
+        workers: Worker processes (default: CPU count)
+
+    Returns:
+        ``cei_df`` with added 'Matched_Public_Company' and 'Match_Score' columns.
+    """
+    cei_df = cei_df.copy()
+    normalized_employers = cei_df[employer_col].astype(str).map(normalize_company_name)
+    public = public_df[[company_col]].dropna().drop_duplicates()
+    public['Normalized_Company'] = public[company_col].astype(str).map(normalize_company_name)
+    public = public.drop_duplicates(subset=['Normalized_Company'])
+
+    matches = match_names_blocked(
+        normalized_employers.tolist(), public['Normalized_Company'].tolist(),
+        threshold=threshold, top_k=1, workers=workers,
+    )
+    best = matches.set_index('query')
+    original_names = public[company_col].to_numpy()
+    cei_df['Matched_Public_Company'] = normalized_employers.map(
+        pd.Series(original_names[best['name_id'].to_numpy()], index=best.index)
+    )
+    cei_df['Match_Score'] = normalized_employers.map(best['score'])
+
+    logging.info(f"Matched {cei_df['Matched_Public_Company'].notna().sum()}/{len(cei_df)} employers")
+    return cei_df
@@ -0,0 +1,105 @@
+"""
+Merging of extracted (company, score) rows across tables.
+
+Rows from every table of a strategy are streamed into a hash map keyed on
+the normalized company name, so "Kellogg Co." and "Kellogg Co" collapse to
+one entry. When the same company comes with a different score, the row with
+the higher confidence wins (ties keep the first row seen). The final frame
+is built once at the end instead of concatenating and de-duplicating
+per-table frames.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from .utils import normalize_company_name
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class RowMerger:
+    """
+    Hash-map merge of extracted rows keyed on the normalized company name.
+
+    Example:
+        merger = RowMerger()
+        for table_df, quality in results:
+            merger.add_frame(table_df, confidence=quality)
+        df = merger.to_frame(year=2019)
+    """
+
+    def __init__(self):
+        # key -> [company, score, confidence]; dicts keep first-seen order
+        self._rows: Dict[str, List] = {}
+        self.conflicts = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, company: str) -> bool:
+        return self._key(company) in self._rows
+
+    @staticmethod
+    def _key(company: str) -> str:
+        return normalize_company_name(company) or company.strip().lower()
+
+    def add(self, company: str, score: float, confidence: float = 0.0) -> bool:
+        """
+        Add one row.
+
+        Args:
+            company: Company name as extracted
+            score: CEI score
+            confidence: Rank of the source (table quality, strategy, parser);
+                replaces an earlier row for the same company only if higher
+
+        Returns:
+            True if the row was kept (new company or higher confidence).
+        """
+        key = self._key(company)
+        if not key:
+            return False
+        current = self._rows.get(key)
+        if current is None:
+            self._rows[key] = [company, score, confidence]
+            return True
+        if current[1] != score:
+            self.conflicts += 1
+        if confidence > current[2]:
+            self._rows[key] = [company, score, confidence]
+            return True
+        return False
+
+    def add_rows(self, rows: Iterable[Tuple[str, float]], confidence: float = 0.0) -> None:
+        """Add (company, score) pairs sharing one confidence."""
+        for company, score in rows:
+            self.add(company, score, confidence)
+
+    def add_frame(self, df: pd.DataFrame, confidence: float = 0.0) -> None:
+        """Add the Company and CEI_Score columns of a frame."""
+        if df is None or df.empty:
+            return
+        self.add_rows(zip(df['Company'].tolist(), df['CEI_Score'].tolist()), confidence)
+
+    def to_frame(self, year: Optional[int] = None) -> pd.DataFrame:
+        """
+        Materialize the merged rows.
+
+        Args:
+            year: If given, added as a 'Year' column
+
+        Returns:
+            DataFrame with columns Company, CEI_Score (and Year), in first-seen
+            order; empty if nothing was added.
+        """
+        import pandas as pd
+
+        if not self._rows:
+            return pd.DataFrame()
+        companies, scores, _ = zip(*self._rows.values())
+        df = pd.DataFrame({'Company': list(companies), 'CEI_Score': pd.Series(scores, dtype='float64')})
+        if year is not None:
+            df['Year'] = year
+        return df
@@ -0,0 +1,166 @@
+"""
+Point-in-time index of security names.
+
+Companies rename, merge and get new CUSIPs, so an employer name maps to
+different securities in different CEI years. ``NameHistory`` holds the
+(name, cusip, start, end) intervals of a names-history table such as CRSP
+``stocknames`` (COMNAM, NCUSIP, NAMEDT, NAMEENDT) as sorted int64 keys, and
+resolves a whole batch of (name, date) pairs with one ``searchsorted``
+instead of filtering the table per row.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .utils import normalize_company_name
+
+# Dates are stored as day numbers; 32 bits of day leave room for the name code.
+# Days are biased into the non-negative range before packing, so dates before
+# 1970 (CRSP names go back to 1925) keep their order within a name.
+_DAY_BITS = 32
+_DAY_BIAS = 1 << (_DAY_BITS - 1)
+_NO_END = np.datetime64('2262-01-01', 'D')
+
+
+def _days(dates) -> Tuple[np.ndarray, np.ndarray]:
+    """Day numbers since 1970 of a date array (0 where missing) and a mask of present dates."""
+    values = pd.to_datetime(pd.Series(dates, copy=False), errors='coerce')
+    present = values.notna().to_numpy()
+    days = values.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]').astype('int64')
+    return np.where(present, days, 0), present
+
+
+class NameHistory:
+    """
+    Interval index over security-name history.
+
+    Each normalized name gets an integer code; intervals are sorted by
+    ``(code << 32) | (start_day + 2**31)``. A query (name, date) starts at
+    the last interval of its name starting on or before the date and scans
+    back to the latest-starting one that still covers the date. A running
+    maximum of end days per name stops the scan as soon as no earlier
+    interval can reach the date, so nested intervals (another share class
+    or NCUSIP under the same name) take a few vectorized steps. When two
+    securities carried the same name at once, the one whose name started
+    later wins.
+
+    Example:
+        history = NameHistory.from_frame(stocknames)
+        cusips = history.lookup(cei['employer'], cei['cei_release_date'])
+    """
+
+    def __init__(self, names: pd.Index, keys: np.ndarray, ends: np.ndarray, cusips: np.ndarray):
+        self.names = names
+        self.keys = keys
+        self.ends = ends
+        self.cusips = cusips
+        # Latest end of any interval of the same name up to each position
+        codes = keys >> _DAY_BITS
+        self.reach = pd.Series(ends, dtype='int64').groupby(codes).cummax().to_numpy(dtype='int64')
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @classmethod
+    def from_frame(
+        cls,
+        history: pd.DataFrame,
+        name_col: str = 'COMNAM',
+        cusip_col: str = 'NCUSIP',
+        start_col: str = 'NAMEDT',
+        end_col: str = 'NAMEENDT',
+    ) -> 'NameHistory':
+        """
+        Build the index from a names-history table.
+
+        Args:
+            history: One row per (security, name) interval
+            name_col: Company name column
+            cusip_col: CUSIP in effect during the interval
+            start_col: First date of the interval
+            end_col: Last date of the interval (missing: still current)
+
+        Returns:
+            NameHistory over the rows with a name, CUSIP and start date.
+        """
+        normalized = history[name_col].astype(str).map(normalize_company_name).to_numpy()
+        starts, has_start = _days(history[start_col])
+        ends, has_end = _days(history[end_col])
+        ends = np.where(has_end, ends, _NO_END.astype('int64'))
+        cusips = history[cusip_col].astype('string').str.strip().to_numpy(dtype=object, na_value=None)
+        usable = (normalized != '') & has_start & pd.notna(cusips)
+
+        codes, names = pd.factorize(normalized[usable], sort=True)
+        keys = (codes.astype('int64') << _DAY_BITS) | (starts[usable] + _DAY_BIAS)
+        order = np.argsort(keys, kind='stable')
+        return cls(pd.Index(names), keys[order], ends[usable][order], cusips[usable][order])
+
+    def lookup(self, names, dates, normalized: bool = False) -> np.ndarray:
+        """
+        CUSIPs carried by each name on each date.
+
+        Args:
+            names: Array-like of company names
+            dates: Array-like of dates, aligned with ``names``
+            normalized: Whether ``names`` are already normalized
+
+        Returns:
+            Object array of CUSIPs; None where no security carried the name
+            on that date.
+        """
+        names = pd.Series(names, copy=False).astype(str)
+        if len(self.keys) == 0:
+            return np.full(len(names), None, dtype=object)
+        if not normalized:
+            names = names.map(normalize_company_name)
+        codes = self.names.get_indexer(names.to_numpy())
+        days, has_date = _days(dates)
+        valid = (codes >= 0) & has_date
+        query = (np.maximum(codes, 0).astype('int64') << _DAY_BITS) | (days + _DAY_BIAS)
+
+        pos = np.searchsorted(self.keys, query, side='right') - 1
+        result = np.full(len(names), None, dtype=object)
+        rows = np.flatnonzero(valid)
+        pos = pos[rows]
+        while len(rows):
+            safe = np.maximum(pos, 0)
+            reachable = (pos >= 0) & ((self.keys[safe] >> _DAY_BITS) == codes[rows]) & (days[rows] <= self.reach[safe])
+            rows, pos = rows[reachable], pos[reachable]
+            covers = days[rows] <= self.ends[pos]
+            result[rows[covers]] = self.cusips[pos[covers]]
+            rows, pos = rows[~covers], pos[~covers] - 1
+        return result
+
+
+def resolve_cusips(
+    cei_df: pd.DataFrame,
+    history: NameHistory,
+    name_col: str = 'employer',
+    date_col: str = 'cei_release_date',
+    cusip_col: str = 'cusip',
+    fallback: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Add the point-in-time CUSIP of each CEI row.
+
+    Args:
+        cei_df: CEI rows with an employer name and release date (see
+            ``attach_release_dates``)
+        history: Name-history index
+        name_col: Employer name column
+        date_col: Release date column
+        cusip_col: Output CUSIP column
+        fallback: Existing static CUSIP column used where the history has
+            no interval for the row
+
+    Returns:
+        Copy of ``cei_df`` with ``cusip_col``.
+    """
+    df = cei_df.copy()
+    resolved = pd.Series(history.lookup(df[name_col], df[date_col]), index=df.index, dtype=object)
+    if fallback is not None and fallback in df.columns:
+        resolved = resolved.where(resolved.notna(), df[fallback])
+    df[cusip_col] = resolved
+    return df
@@ -1,81 +1,401 @@
 """
 OCR-based CEI extraction for PDFs that don't work with table extraction.
+
+The OCR backends (pdf2image, pytesseract), asyncio and pandas are imported
+on first use, so the text parsers can be imported without them.
+
+Pages flow through an asyncio pipeline (rasterize -> OCR -> parse ->
+filter) with bounded queues between the stages; pdftoppm and tesseract run
+in a thread pool, so page N is parsed while later pages are still being
+rasterized and recognized. With ``processes=True`` they run in a process
+pool instead, and page images move between workers through shared-memory
+buffers (``page_buffers``). With ``preprocess=True`` every page is
+binarized, deskewed and cleaned (``image_preprocess``) before tesseract.
 """
 
+from __future__ import annotations
+
 import logging
 import os
 import re
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-
-import pandas as pd
-import pytesseract
-from pdf2image import convert_from_path
-from PIL import Image
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional, Tuple
 
+from .layout_profiles import load_profile, update_profile
+from .merge import RowMerger
+from .profiling import count, span
 from .utils import extract_year_from_filename, find_pdfs_in_folder
 
+if TYPE_CHECKING:
+    import asyncio
+
+    import pandas as pd
+
+
+def _convert_from_path(pdf_path: str, **kwargs) -> list:
+    """Rasterize PDF pages with pdf2image (pdftoppm)."""
+    from pdf2image import convert_from_path
+    return convert_from_path(pdf_path, **kwargs)
+
+
+def _image_to_string(image, config: str = '') -> str:
+    """Run tesseract on one page image."""
+    import pytesseract
+    return pytesseract.image_to_string(image, config=config)
+
+
+def _page_range(year: int) -> Tuple[int, int]:
+    """Likely appendix pages (first, last) for a report year."""
+    if year >= 2015:
+        # Modern reports - appendix usually around pages 40-80
+        return 40, 80
+    elif year >= 2010:
+        # Mid-era reports - try pages 20-60
+        return 20, 60
+    else:
+        # Older reports - try broader range
+        return 10, 50
+
+
+_END = object()  # end-of-stream marker passed between pipeline stages
+
+
+def _rasterize_page(pdf_path: str, page_no: int, year: int) -> Optional[object]:
+    """Rasterize one page, or return None past the end of the document."""
+    with span("rasterize", year=year, page=page_no):
+        images = _convert_from_path(pdf_path, first_page=page_no, last_page=page_no, dpi=300)
+    return images[0] if images else None
+
+
+def _ocr_page(image, page_no: int, year: int, preprocess: bool = False) -> str:
+    """OCR one page image, returning '' if tesseract fails on it."""
+    try:
+        if preprocess:
+            from .image_preprocess import preprocess_page
+
+            with span("preprocess", year=year, page=page_no):
+                image, angle = preprocess_page(image)
+            if angle:
+                logging.debug(f"Deskewed page {page_no} by {angle:.2f} degrees")
+        with span("ocr", year=year, page=page_no):
+            text = _image_to_string(image, config='--psm 6')
+    except Exception as e:
+        logging.debug(f"Error processing page {page_no}: {e}")
+        return ''
+    count("ocr_pages", year=year)
+    return text
+
+
+def _rasterize_to_buffer(pdf_path: str, page_no: int, year: int, buffer_name: str):
+    """
+    Rasterize one page into a shared page buffer (process mode); None past the end.
+
+    A page too large for the buffer is returned as the image itself, which
+    is then pickled back like in a plain process pool.
+    """
+    from .page_buffers import write_image
+
+    image = _rasterize_page(pdf_path, page_no, year)
+    if image is None:
+        return None
+    try:
+        return write_image(buffer_name, image)
+    except ValueError as e:
+        logging.debug(f"Page {page_no}: {e}; passing the image by value")
+        count("oversized_pages", year=year)
+        return image
+
+
+def _ocr_buffer(handle, page_no: int, year: int, preprocess: bool = False) -> str:
+    """OCR a page image held in a shared page buffer (process mode)."""
+    from .page_buffers import read_image
+
+    return _ocr_page(read_image(handle), page_no, year, preprocess)
+
+
+async def _rasterize_stage(pdf_path, pages, images: asyncio.Queue, rasterize) -> None:
+    for page_no in pages:
+        try:
+            image = await rasterize(page_no)
+        except Exception as e:
+            logging.warning(f"Rasterizing page {page_no} of {pdf_path} failed: {e}")
+            break
+        if image is None:
+            break  # past the last page
+        await images.put((page_no, image))  # blocks while OCR is behind
+    await images.put(_END)
+
+
+async def _ocr_stage(images: asyncio.Queue, texts: asyncio.Queue, recognize, progress: List[int]) -> None:
+    while True:
+        item = await images.get()
+        if item is _END:
+            await images.put(_END)  # let sibling OCR workers stop too
+            return
+        page_no, image = item
+        text = await recognize(page_no, image)
+        del image
+        await texts.put((page_no, text))
+        progress[0] += 1
+        if progress[0] % 10 == 0:
+            logging.info(f"Processed {progress[0]} pages")
+
+
+# Trailing lines of a page carried over to the next one at most
+_CARRY_LINES = 2
+
+
+def _trailing_unparsed(lines: List[str], year: int, parsers) -> List[str]:
+    """
+    Last non-empty lines of a page that yield nothing on their own.
+
+    A company name at the foot of a page whose score is the first line of
+    the next page only parses once the two are joined again.
+    """
+    carry: List[str] = []
+    for line in reversed(lines):
+        if not line.strip():
+            continue
+        if len(carry) == _CARRY_LINES or _parse_cei_lines([line], year, parsers):
+            break
+        carry.insert(0, line)
+    return carry
+
+
+async def _parse_stage(year, first_page: int, parsers, texts: asyncio.Queue, parsed: asyncio.Queue) -> None:
+    # OCR workers finish out of order; parse pages in page order so the
+    # first-seen entry for a duplicate company is deterministic, and so the
+    # unparsed tail of one page can be joined to the head of the next.
+    pending: Dict[int, str] = {}
+    next_page = first_page
+    carry: List[str] = []
+    while True:
+        item = await texts.get()
+        if item is _END:
+            break
+        page_no, text = item
+        pending[page_no] = text
+        while next_page in pending:
+            lines = carry + pending.pop(next_page).split('\n')
+            with span("parse", year=year, page=next_page):
+                candidates = _parse_cei_lines(lines, year, parsers)
+                carry = _trailing_unparsed(lines, year, parsers)
+            await parsed.put((next_page, candidates))
+            next_page += 1
+    await parsed.put(_END)
+
+
+async def iter_ocr_rows(
+    pdf_path: str,
+    year: int,
+    first_page: Optional[int] = None,
+    last_page: Optional[int] = None,
+    ocr_workers: Optional[int] = None,
+    queue_size: int = 4,
+    parsers: Optional[List[str]] = None,
+    processes: bool = False,
+    preprocess: bool = False,
+) -> AsyncIterator[Tuple[str, float, int, str]]:
+    """
+    Stream (company, score, page, parser) rows from an OCR pipeline.
+
+    Rasterization, OCR, line parsing and filtering run as concurrent stages
+    joined by bounded queues, so rows for early pages are yielded while later
+    pages are still being rasterized, and at most ``queue_size`` page images
+    wait in memory for OCR.
+
+    Args:
+        pdf_path: Path to the CEI PDF file
+        year: Year of the report
+        first_page: First page to OCR (default: by year)
+        last_page: Last page to OCR (default: by year)
+        ocr_workers: Concurrent tesseract processes (default: up to 4 CPUs)
+        queue_size: Capacity of each queue between stages
+        parsers: Line parsers to run, names from ``_PARSERS`` (default: by year)
+        processes: Rasterize and OCR in worker processes, handing page
+            images over through shared-memory buffers instead of pickling them.
+            Needs ``queue_size + ocr_workers + 1`` buffers of
+            ``DEFAULT_BUFFER_BYTES`` (32 MB) in /dev/shm; with less free,
+            the pipeline runs in threads instead
+        preprocess: Binarize, deskew, strip rule lines and despeckle each
+            page before OCR
+
+    Yields:
+        Cleaned, de-duplicated (company, score, page, parser) tuples in page order.
+    """
+    default_first, default_last = _page_range(year)
+    first_page = first_page or default_first
+    last_page = last_page or default_last
+    ocr_workers = ocr_workers or min(4, os.cpu_count() or 1)
+
+    import asyncio
+
+    images: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    texts: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    parsed: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    executor, buffers, rasterize, recognize = _page_backends(
+        pdf_path, year, ocr_workers, queue_size, processes, preprocess)
+    progress = [0]
+
+    async def ocr_workers_stage():
+        await asyncio.gather(*(
+            _ocr_stage(images, texts, recognize, progress) for _ in range(ocr_workers)
+        ))
+        await texts.put(_END)
+
+    tasks = [
+        asyncio.ensure_future(_rasterize_stage(pdf_path, range(first_page, last_page + 1), images, rasterize)),
+        asyncio.ensure_future(ocr_workers_stage()),
+        asyncio.ensure_future(_parse_stage(year, first_page, parsers, texts, parsed)),
+    ]
+    seen = set()
+    try:
+        while True:
+            item = await parsed.get()
+            if item is _END:
+                break
+            page_no, candidates = item
+            with span("filter", year=year, page=page_no):
+                rows = _filter_companies(candidates, seen)
+            for company, score, parser in rows:
+                yield company, score, page_no, parser
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        executor.shutdown(wait=buffers is not None)
+        if buffers is not None:
+            buffers.close()
+
 
-def ocr_extract_cei_data(pdf_path: str, year: int) -> pd.DataFrame:
+def _page_backends(pdf_path: str, year: int, ocr_workers: int, queue_size: int, processes: bool,
+                   preprocess: bool = False):
+    """
+    Executor and async rasterize/recognize callables for the pipeline stages.
+
+    Threads pass PIL images between stages directly. Processes pass
+    ``PageHandle``s to page images in a shared ``PageBufferPool``; a buffer
+    is taken before rasterizing and released once its page is recognized,
+    so every page waiting in a queue or being OCR'd holds one buffer. A page
+    that does not fit its buffer is passed by value instead, and the
+    pipeline falls back to threads when /dev/shm cannot hold the pool.
+    """
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    if not processes:
+        from concurrent.futures import ThreadPoolExecutor
+
+        executor = ThreadPoolExecutor(max_workers=ocr_workers + 1, thread_name_prefix="pfp-ocr")
+
+        async def rasterize(page_no):
+            return await loop.run_in_executor(executor, _rasterize_page, pdf_path, page_no, year)
+
+        async def recognize(page_no, image):
+            return await loop.run_in_executor(executor, _ocr_page, image, page_no, year, preprocess)
+
+        return executor, None, rasterize, recognize
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    from . import page_buffers
+    from .page_buffers import PageBufferPool, PageHandle
+
+    # queued pages + pages being OCR'd + the page being rasterized
+    n_buffers = queue_size + ocr_workers + 1
+    needed = n_buffers * page_buffers.DEFAULT_BUFFER_BYTES
+    available = page_buffers.shared_memory_available()
+    if available is not None and needed > available:
+        logging.warning(f"Process mode needs {needed >> 20} MB of shared memory but only "
+                        f"{available >> 20} MB is free; running OCR in threads")
+        return _page_backends(pdf_path, year, ocr_workers, queue_size, False, preprocess)
+
+    executor = ProcessPoolExecutor(max_workers=ocr_workers + 1)
+    buffers = PageBufferPool(n_buffers, page_buffers.DEFAULT_BUFFER_BYTES)
+
+    async def rasterize(page_no):
+        name = await buffers.acquire()
+        try:
+            handle = await loop.run_in_executor(executor, _rasterize_to_buffer, pdf_path, page_no, year, name)
+        except BaseException:
+            buffers.release(name)
+            raise
+        if not isinstance(handle, PageHandle):
+            buffers.release(name)  # past the end, or a page passed by value
+        return handle
+
+    async def recognize(page_no, handle):
+        if not isinstance(handle, PageHandle):
+            return await loop.run_in_executor(executor, _ocr_page, handle, page_no, year, preprocess)
+        try:
+            return await loop.run_in_executor(executor, _ocr_buffer, handle, page_no, year, preprocess)
+        finally:
+            buffers.release(handle.name)
+
+    return executor, buffers, rasterize, recognize
+
+
+def _run_coroutine(coro):
+    """Run a coroutine to completion, also from inside a running event loop."""
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # e.g. Jupyter: run the pipeline on its own loop in a helper thread
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+async def _collect_rows(pdf_path: str, year: int, **kwargs) -> List[Tuple[str, float, int, str]]:
+    return [row async for row in iter_ocr_rows(pdf_path, year, **kwargs)]
+
+
+def ocr_extract_cei_data(
+    pdf_path: str,
+    year: int,
+    profiles_dir: Optional[str] = None,
+    **pipeline_kwargs,
+) -> pd.DataFrame:
     """
     Extract CEI data using OCR on PDF pages.
     
     Args:
         pdf_path: Path to the CEI PDF file
         year: Year of the report
+        profiles_dir: Directory of layout profiles; a matching profile sets the
+            page span and parsers, and a discovery run records them
+        **pipeline_kwargs: Passed to ``iter_ocr_rows`` (page range, workers, queue size,
+            preprocess)
         
     Returns:
         DataFrame with columns: Company, CEI_Score, Year
     """
+    import pandas as pd
+
     try:
         logging.info(f"OCR processing {os.path.basename(pdf_path)} for year {year}")
+        profile = load_profile(profiles_dir, pdf_path, year) if profiles_dir else None
+        layout = profile.get("ocr") if profile else None
+        if layout:
+            for key in ("first_page", "last_page", "parsers"):
+                pipeline_kwargs.setdefault(key, layout[key])
+            logging.info(f"Using layout profile: pages {layout['first_page']}-{layout['last_page']}")
+        rows = _run_coroutine(_collect_rows(pdf_path, year, **pipeline_kwargs))
         
-        # Convert PDF to images (focus on likely appendix pages)
-        if year >= 2015:
-            # Modern reports - appendix usually around pages 40-80
-            pages = convert_from_path(pdf_path, first_page=40, last_page=80, dpi=300)
-        elif year >= 2010:
-            # Mid-era reports - try pages 20-60
-            pages = convert_from_path(pdf_path, first_page=20, last_page=60, dpi=300)
-        else:
-            # Older reports - try broader range
-            pages = convert_from_path(pdf_path, first_page=10, last_page=50, dpi=300)
-        
-        if not pages:
-            logging.warning(f"No pages extracted from {pdf_path}")
-            return pd.DataFrame()
-        
-        logging.info(f"Processing {len(pages)} pages with OCR")
-        
-        # Extract text from all pages
-        all_text = []
-        for i, page in enumerate(pages):
-            try:
-                # Use OCR to extract text
-                text = pytesseract.image_to_string(page, config='--psm 6')
-                all_text.append(text)
-                
-                # Progress logging
-                if (i + 1) % 10 == 0:
-                    logging.info(f"Processed {i + 1}/{len(pages)} pages")
-                    
-            except Exception as e:
-                logging.debug(f"Error processing page {i}: {e}")
-                continue
+        if rows and profiles_dir and not layout:
+            update_profile(profiles_dir, pdf_path, year, "ocr", _ocr_layout(rows))
         
-        if not all_text:
-            logging.warning(f"No text extracted from {pdf_path}")
-            return pd.DataFrame()
-        
-        # Combine all text
-        combined_text = '\n'.join(all_text)
-        
-        # Extract company data from text
-        companies_data = _parse_cei_text(combined_text, year)
-        
-        if companies_data:
-            df = pd.DataFrame(companies_data, columns=['Company', 'CEI_Score'])
-            df['Year'] = year
+        if rows:
+            # Collapse OCR variants of one name ("Kellogg Co." / "Kellogg Co");
+            # the strict company-list parser wins score conflicts
+            merger = RowMerger()
+            for company, score, _, parser in rows:
+                merger.add(company, score, confidence=_PARSER_CONFIDENCE.get(parser, 0))
+            df = merger.to_frame(year=year)
             logging.info(f"OCR extracted {len(df)} companies for year {year}")
             return df
         else:
@@ -87,37 +407,62 @@ def ocr_extract_cei_data(pdf_path: str, year: int) -> pd.DataFrame:
         return pd.DataFrame()
 
 
-def _parse_cei_text(text: str, year: int) -> List[Tuple[str, float]]:
-    """
-    Parse OCR text to extract company names and CEI scores.
-    """
-    companies = []
-    lines = text.split('\n')
-    
-    # Look for cleaner company list patterns first
-    companies.extend(_parse_clean_company_list(lines))
-    
-    # Different parsing strategies based on year
+def _ocr_layout(rows: List[Tuple[str, float, int, str]]) -> Dict:
+    """Layout profile section for a successful OCR run."""
+    pages = [row[2] for row in rows]
+    used = {row[3] for row in rows}
+    return {
+        "first_page": min(pages),
+        "last_page": max(pages),
+        "parsers": [name for name in _PARSERS if name in used],
+    }
+
+
+def _default_parsers(year: int) -> List[str]:
+    """Line parsers tried for a report year when there is no layout profile."""
+    # Look for cleaner company list patterns first, then the year's format
     if year >= 2015:
-        companies.extend(_parse_modern_format(lines))
+        return ["clean", "modern"]
     elif year >= 2010:
-        companies.extend(_parse_mid_format(lines))
+        return ["clean", "mid"]
     else:
-        companies.extend(_parse_legacy_format(lines))
-    
-    # Remove duplicates and clean
-    seen = set()
+        return ["clean", "legacy"]
+
+
+def _parse_cei_lines(
+    lines: List[str],
+    year: int,
+    parsers: Optional[List[str]] = None,
+) -> List[Tuple[str, float, str]]:
+    """Candidate (company, score, parser) triples from OCR lines, before filtering."""
+    companies = []
+    for name in parsers or _default_parsers(year):
+        companies.extend((company, score, name) for company, score in _PARSERS[name](lines))
+    return companies
+
+
+def _filter_companies(companies: List[Tuple[str, float, str]], seen: set) -> List[Tuple[str, float, str]]:
+    """Clean candidates and drop invalid entries and companies already in ``seen``."""
     cleaned_companies = []
-    
-    for company, score in companies:
+    for company, score, parser in companies:
         company = _clean_company_name(company)
         if company and company not in seen and _is_valid_company_score(company, score):
             seen.add(company)
-            cleaned_companies.append((company, score))
-    
+            cleaned_companies.append((company, score, parser))
     return cleaned_companies
 
 
+def _parse_cei_text(text: str, year: int, parsers: Optional[List[str]] = None) -> List[Tuple[str, float]]:
+    """
+    Parse OCR text to extract company names and CEI scores.
+    """
+    companies = _parse_cei_lines(text.split('\n'), year, parsers)
+    
+    # Remove duplicates and clean
+    with span("filter", year=year):
+        return [(company, score) for company, score, _ in _filter_companies(companies, set())]
+
+
 def _parse_clean_company_list(lines: List[str]) -> List[Tuple[str, float]]:
     """Parse clean company list format - typical in appendices."""
     companies = []
@@ -269,6 +614,18 @@ def _parse_generic_format(lines: List[str]) -> List[Tuple[str, float]]:
     return companies
 
 
+# Line parsers by name, in the order they are tried.
+_PARSERS = {
+    "clean": _parse_clean_company_list,
+    "modern": _parse_modern_format,
+    "mid": _parse_mid_format,
+    "legacy": _parse_legacy_format,
+}
+
+# Confidence of each parser's rows when OCR variants of a company disagree.
+_PARSER_CONFIDENCE = {"clean": 1}
+
+
 def _looks_like_company(text: str) -> bool:
     """Check if text looks like a company name."""
     if len(text) < 3:
@@ -441,7 +798,8 @@ def process_missing_years_ocr():
         # Save file
         os.makedirs(output_folder, exist_ok=True)
         output_file = os.path.join(output_folder, f"cei_{year}.csv")
-        cei_data.to_csv(output_file, index=False)
+        with span("write", year=year):
+            cei_data.to_csv(output_file, index=False)
         
         logging.info(f"✓ Saved {len(cei_data)} companies for year {year}")
         processed_count += 1
@@ -482,7 +840,8 @@ def fix_incorrect_extractions():
         
         # Save corrected file
         output_file = os.path.join(output_folder, f"cei_{year}.csv")
-        cei_data.to_csv(output_file, index=False)
+        with span("write", year=year):
+            cei_data.to_csv(output_file, index=False)
         
         logging.info(f"✓ Fixed {year}: saved {len(cei_data)} companies")
 
@@ -0,0 +1,183 @@
+"""
+Shared-memory page image buffers for multi-process OCR.
+
+When rasterization and OCR run in worker processes, returning a 300 DPI
+page image from one worker and passing it to the next pickles about 25 MB
+per page twice. A ``PageBufferPool`` instead preallocates a few
+``multiprocessing.shared_memory`` blocks: the rasterizer worker copies the
+rendered pixels into a free block and returns a small ``PageHandle``, and
+the OCR worker maps the same block as a NumPy array / PIL image without
+copying. Blocks go back on the pool's free-list once a page is recognized,
+so at most ``n_buffers`` pages are in flight.
+
+The blocks live in ``/dev/shm`` on Linux, which containers often cap at
+64 MB; a pool needs ``n_buffers * buffer_bytes`` of it (see
+``shared_memory_available``).
+"""
+
+import asyncio
+import logging
+import os
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# 8.5 x 14 in (legal) at 300 DPI, RGB
+DEFAULT_BUFFER_BYTES = 2550 * 4200 * 3
+
+_MODE_CHANNELS = {'L': 1, 'RGB': 3, 'RGBA': 4}
+
+
+def shared_memory_available(path: str = '/dev/shm') -> Optional[int]:
+    """Free bytes of the shared-memory filesystem, or None where it cannot be checked."""
+    try:
+        stat = os.statvfs(path)
+    except (AttributeError, OSError):  # no statvfs (Windows) or no /dev/shm (macOS)
+        return None
+    return stat.f_bavail * stat.f_frsize
+
+
+class PageHandle:
+    """Location and shape of one page image in a shared buffer (cheap to pickle)."""
+
+    __slots__ = ('name', 'height', 'width', 'mode')
+
+    def __init__(self, name: str, height: int, width: int, mode: str):
+        self.name = name
+        self.height = height
+        self.width = width
+        self.mode = mode
+
+    def __reduce__(self):
+        return PageHandle, (self.name, self.height, self.width, self.mode)
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        channels = _MODE_CHANNELS[self.mode]
+        return (self.height, self.width) if channels == 1 else (self.height, self.width, channels)
+
+    @property
+    def nbytes(self) -> int:
+        return int(np.prod(self.shape))
+
+
+class PageBufferPool:
+    """
+    Fixed set of shared-memory page buffers with an asyncio free-list.
+
+    Example (workers call ``write_image`` and ``read_image``):
+        with PageBufferPool(6) as pool:
+            name = await pool.acquire()
+            handle = await loop.run_in_executor(processes, rasterize_into, name, page_no)
+            text = await loop.run_in_executor(processes, ocr_from, handle)
+            pool.release(name)
+    """
+
+    def __init__(self, n_buffers: int, buffer_bytes: int = DEFAULT_BUFFER_BYTES):
+        self.buffer_bytes = buffer_bytes
+        self._blocks = [shared_memory.SharedMemory(create=True, size=buffer_bytes) for _ in range(n_buffers)]
+        self._free: asyncio.Queue = asyncio.Queue()
+        for block in self._blocks:
+            self._free.put_nowait(block.name)
+
+    @property
+    def names(self) -> List[str]:
+        return [block.name for block in self._blocks]
+
+    async def acquire(self) -> str:
+        """Name of a free buffer, waiting until one is released."""
+        return await self._free.get()
+
+    def release(self, name: str) -> None:
+        """Return a buffer to the free-list."""
+        self._free.put_nowait(name)
+
+    def close(self) -> None:
+        """Free the shared memory of all buffers."""
+        for block in self._blocks:
+            block.close()
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
+        self._blocks = []
+
+    def __enter__(self) -> 'PageBufferPool':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# Buffers attached in this (worker) process, by name
+_ATTACHED: Dict[str, shared_memory.SharedMemory] = {}
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    block = _ATTACHED.get(name)
+    if block is None:
+        try:
+            block = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:  # Python < 3.13 always registers with the resource tracker
+            block = shared_memory.SharedMemory(name=name)
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(block._name, 'shared_memory')
+        _ATTACHED[name] = block
+    return block
+
+
+def write_image(name: str, image) -> PageHandle:
+    """
+    Copy a PIL page image into a shared buffer.
+
+    Args:
+        name: Buffer name from ``PageBufferPool.acquire``
+        image: PIL image in L, RGB or RGBA mode (other modes are converted to RGB)
+
+    Returns:
+        Handle for ``read_image``.
+    """
+    if image.mode not in _MODE_CHANNELS:
+        image = image.convert('RGB')
+    handle = PageHandle(name, image.height, image.width, image.mode)
+    block = _attach(name)
+    if handle.nbytes > block.size:
+        raise ValueError(f"Page image of {handle.nbytes} bytes exceeds the {block.size}-byte page buffer")
+    np.ndarray(handle.shape, dtype=np.uint8, buffer=block.buf)[...] = np.asarray(image)
+    return handle
+
+
+def view_pixels(handle: PageHandle) -> np.ndarray:
+    """Pixels of a page as an array view on the shared buffer (no copy)."""
+    return np.ndarray(handle.shape, dtype=np.uint8, buffer=_attach(handle.name).buf)
+
+
+def read_image(handle: PageHandle, copy: bool = False):
+    """
+    Page image backed by the shared buffer.
+
+    Args:
+        handle: From ``write_image``
+        copy: Return an independent image instead of a view
+
+    Returns:
+        PIL image; unless ``copy``, it is only valid until the buffer is
+        released.
+    """
+    from PIL import Image
+
+    pixels = view_pixels(handle)
+    image = Image.frombuffer(handle.mode, (handle.width, handle.height), pixels, 'raw', handle.mode, 0, 1)
+    return image.copy() if copy else image
+
+
+def release_attached(names: Optional[List[str]] = None) -> None:
+    """Detach this process from shared buffers (all by default)."""
+    for name in list(_ATTACHED if names is None else names):
+        block = _ATTACHED.pop(name, None)
+        if block is not None:
+            try:
+                block.close()
+            except BufferError:
+                logging.debug(f"Page buffer {name} still has views; leaving it mapped")
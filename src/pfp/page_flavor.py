@@ -0,0 +1,183 @@
+"""
+Per-page choice of camelot flavor from the PDF's vector graphics and text.
+
+``extract_cei_comprehensive`` used to run both camelot flavors over the same
+page ranges, and lattice (which renders every page and runs OpenCV line
+detection) is by far the costlier one on pages without ruled tables. A page
+is classified in a few milliseconds with PyMuPDF instead:
+
+* ``lattice`` when its drawings contain rule lines (stroked lines, thin
+  rectangles or rectangle outlines) at 3+ distinct heights and 2+ distinct
+  horizontal positions, i.e. a ruled grid;
+* ``stream`` when it has no grid but its text is laid out in columns (3+
+  text rows with a wide gap between neighbouring words);
+* ``None`` when it has no text layer (scanned; camelot reads nothing
+  there) or only running text, so neither flavor is run on it.
+
+Without PyMuPDF, or for a PDF it cannot open, every page keeps both flavors.
+"""
+
+import logging
+import os
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .layout_profiles import format_pages
+from .profiling import count, span
+
+FLAVORS = ('lattice', 'stream')
+
+# Classification thresholds (PDF points)
+MIN_RULE_LENGTH = 10.0
+MAX_RULE_THICKNESS = 2.0
+MIN_HORIZONTAL_RULES = 3
+MIN_VERTICAL_RULES = 2
+MIN_COLUMN_GAP = 12.0
+MIN_GAPPED_ROWS = 3
+
+
+def rule_lines(drawings: Iterable[Dict]) -> Tuple[set, set]:
+    """Distinct (rounded) y of horizontal and x of vertical rule lines."""
+    horizontal, vertical = set(), set()
+
+    def add(x0, y0, x1, y1):
+        if abs(y1 - y0) <= MAX_RULE_THICKNESS and abs(x1 - x0) >= MIN_RULE_LENGTH:
+            horizontal.add(round((y0 + y1) / 2))
+        elif abs(x1 - x0) <= MAX_RULE_THICKNESS and abs(y1 - y0) >= MIN_RULE_LENGTH:
+            vertical.add(round((x0 + x1) / 2))
+
+    for path in drawings:
+        stroked = 's' in (path.get('type') or '')
+        for item in path.get('items', ()):
+            if item[0] == 'l':
+                add(item[1].x, item[1].y, item[2].x, item[2].y)
+            elif item[0] == 're':
+                r = item[1]
+                if min(r.width, r.height) <= MAX_RULE_THICKNESS:
+                    add(r.x0, r.y0, r.x1, r.y1)  # a rule drawn as a filled bar
+                elif stroked:
+                    for edge in ((r.x0, r.y0, r.x1, r.y0), (r.x0, r.y1, r.x1, r.y1),
+                                 (r.x0, r.y0, r.x0, r.y1), (r.x1, r.y0, r.x1, r.y1)):
+                        add(*edge)
+    return horizontal, vertical
+
+
+def _gapped_rows(words: List[Tuple]) -> int:
+    """Text rows with a column gap between two neighbouring words."""
+    rows: Dict[int, List[Tuple[float, float]]] = {}
+    for w in words:
+        rows.setdefault(round(w[3]), []).append((w[0], w[2]))
+    gapped = 0
+    for spans in rows.values():
+        spans.sort()
+        if any(nxt[0] - cur[1] >= MIN_COLUMN_GAP for cur, nxt in zip(spans, spans[1:])):
+            gapped += 1
+    return gapped
+
+
+def classify_page(page) -> Optional[str]:
+    """
+    Camelot flavor for one page.
+
+    Args:
+        page: PyMuPDF page
+
+    Returns:
+        'lattice', 'stream', or None when neither flavor can find a table.
+    """
+    words = page.get_text('words')
+    if not words:
+        return None
+    horizontal, vertical = rule_lines(page.get_drawings())
+    if len(horizontal) >= MIN_HORIZONTAL_RULES and len(vertical) >= MIN_VERTICAL_RULES:
+        return 'lattice'
+    if _gapped_rows(words) >= MIN_GAPPED_ROWS:
+        return 'stream'
+    return None
+
+
+@lru_cache(maxsize=32)
+def _classify_document(pdf_path: str, mtime: float, size: int) -> Optional[Tuple[Optional[str], ...]]:
+    try:
+        import fitz
+    except ImportError:
+        logging.debug("PyMuPDF not installed; running every camelot flavor on every page")
+        return None
+    try:
+        with span("classify_pages"), fitz.open(pdf_path) as doc:
+            flavors = tuple(classify_page(page) for page in doc)
+    except Exception as e:
+        logging.debug(f"Could not classify pages of {pdf_path}: {e}")
+        return None
+    for flavor in FLAVORS + (None,):
+        count("page_flavor", sum(f == flavor for f in flavors), flavor=str(flavor))
+    return flavors
+
+
+def classify_pages(pdf_path: str) -> Optional[Dict[int, Optional[str]]]:
+    """
+    Flavor of every page (1-based), cached per file version.
+
+    Returns:
+        Dict of page number to 'lattice', 'stream' or None; None when the
+        PDF cannot be classified.
+    """
+    try:
+        stat = os.stat(pdf_path)
+    except OSError:
+        return None
+    flavors = _classify_document(os.path.abspath(pdf_path), stat.st_mtime, stat.st_size)
+    return None if flavors is None else {i + 1: f for i, f in enumerate(flavors)}
+
+
+def expand_pages(pages: str, n_pages: int) -> List[int]:
+    """
+    Page numbers of a camelot page specification.
+
+    Args:
+        pages: 'all' or comma-separated pages and ranges ('3,41-43', '30-end')
+        n_pages: Pages in the document; ranges are clipped to it
+
+    Returns:
+        Sorted page numbers.
+    """
+    if pages == 'all':
+        return list(range(1, n_pages + 1))
+    result = set()
+    for part in pages.split(','):
+        first, _, last = part.strip().partition('-')
+        last = n_pages if last == 'end' else int(last or first)
+        result.update(range(int(first), min(last, n_pages) + 1))
+    return sorted(result)
+
+
+def flavor_pages(pdf_path: str, pages: str, flavor: str) -> str:
+    """
+    Restrict a camelot page specification to the pages of one flavor.
+
+    Args:
+        pdf_path: Path to the PDF file
+        pages: Camelot page specification
+        flavor: 'lattice' or 'stream'
+
+    Returns:
+        Page specification of the matching pages ('' if none), or ``pages``
+        unchanged when the PDF cannot be classified.
+    """
+    flavors = classify_pages(pdf_path)
+    return pages if flavors is None else pages_of_flavor(flavors, pages, flavor)
+
+
+def pages_of_flavor(flavors: Dict[int, Optional[str]], pages: str, flavor: str) -> str:
+    """
+    ``flavor_pages`` for a classification already at hand.
+
+    Args:
+        flavors: Output of ``classify_pages``
+        pages: Camelot page specification
+        flavor: 'lattice' or 'stream'
+
+    Returns:
+        Page specification of the matching pages ('' if none).
+    """
+    return format_pages(p for p in expand_pages(pages, len(flavors)) if flavors[p] == flavor)
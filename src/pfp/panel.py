@@ -0,0 +1,201 @@
+"""
+Out-of-core construction of the firm-day event panel.
+
+The CRSP daily file is streamed once in chunks. Each chunk is reduced to the
+securities of the CEI universe (hash-set membership on integer CUSIP6
+codes), daily returns are computed per CUSIP with the last price of every
+security carried across chunk boundaries, and rows inside a release window
+are appended to per-year part files on disk. Memory stays bounded by the
+chunk size plus one carried price per security.
+
+Every row carries its window's ``cei_release_date`` and ``cei_year``, the
+report year. The two differ in calendar year for reports released in the
+following year (the 2018 report came out in March 2019).
+
+Output layout::
+
+    out_dir/
+        year=2019/part-00000.csv, part-00001.csv, ...   (while streaming)
+        year=2019.csv                                    (after finalizing)
+"""
+
+import glob
+import logging
+import os
+import shutil
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .analysis import cusip6_codes
+from .profiling import count, span
+from .utils import add_days_from_release
+
+
+def _windows(release_dates: pd.DataFrame, before_days: int, after_days: int) -> pd.DataFrame:
+    """Sorted, non-overlapping (year, release, start, end) windows."""
+    windows = pd.DataFrame({
+        'year': release_dates['Year'].astype('int64'),
+        'release': pd.to_datetime(release_dates['Release Date']),
+    })
+    windows['start'] = windows['release'] - pd.Timedelta(days=before_days)
+    windows['end'] = windows['release'] + pd.Timedelta(days=after_days)
+    windows = windows.sort_values('start').reset_index(drop=True)
+    if (windows['start'].iloc[1:].to_numpy() <= windows['end'].iloc[:-1].to_numpy()).any():
+        raise ValueError("Release windows overlap; use a shorter event window")
+    return windows
+
+
+def _returns_with_carry(chunk: pd.DataFrame, carry: Dict[str, float], cusip_col: str, price_col: str) -> pd.Series:
+    """
+    Daily price returns per CUSIP, continuing from the last price of earlier chunks.
+
+    ``chunk`` must be sorted by CUSIP and date; ``carry`` is updated with the
+    last price of each security in the chunk.
+    """
+    cusips = chunk[cusip_col].to_numpy()
+    prices = pd.to_numeric(chunk[price_col], errors='coerce').abs().to_numpy(dtype='float64')
+
+    previous = np.empty_like(prices)
+    previous[1:] = prices[:-1]
+    first = np.ones(len(cusips), dtype=bool)
+    first[1:] = cusips[1:] != cusips[:-1]
+    previous[first] = [carry.get(c, np.nan) for c in cusips[first]]
+
+    last = np.ones(len(cusips), dtype=bool)
+    last[:-1] = first[1:]
+    carry.update(zip(cusips[last], prices[last]))
+    return pd.Series(prices / previous - 1, index=chunk.index)
+
+
+def build_event_panel(
+    prices_path: str,
+    release_dates: pd.DataFrame,
+    out_dir: str,
+    universe: Optional[Iterable[str]] = None,
+    before_days: int = 10,
+    after_days: int = 10,
+    chunksize: int = 250_000,
+    columns: Optional[Sequence[str]] = None,
+    cusip_col: str = 'CUSIP',
+    date_col: str = 'date',
+    price_col: str = 'PRC',
+) -> List[str]:
+    """
+    Stream a daily price file once into per-year event-window partitions.
+
+    Args:
+        prices_path: CRSP-style daily CSV (date, CUSIP, PRC, RET, ...), with
+            dates increasing within each security
+        release_dates: 'Year' and 'Release Date' columns (see
+            ``load_cei_release_dates``)
+        out_dir: Output directory (existing partitions are replaced)
+        universe: CUSIPs or CUSIP6 prefixes to keep (default: all securities)
+        before_days: Calendar days before each release date
+        after_days: Calendar days after each release date
+        chunksize: Rows per chunk read from ``prices_path``
+        columns: Columns to read (default: all); the CUSIP, date and price
+            columns are always read
+        cusip_col: Security identifier column
+        date_col: Date column
+        price_col: Price column used for 'daily_return'
+
+    Returns:
+        Paths of the per-year partition files (``year=YYYY.csv``), with
+        'daily_return', 'cei_release_date', 'cei_year' and
+        'days_from_release' added.
+    """
+    windows = _windows(release_dates, before_days, after_days)
+    starts = windows['start'].to_numpy()
+    ends = windows['end'].to_numpy()
+    last_end = ends.max()
+
+    keep_codes = None
+    if universe is not None:
+        keep_codes = pd.Index(np.unique(cusip6_codes(list(universe))))
+    usecols = None
+    if columns is not None:
+        usecols = list(dict.fromkeys([date_col, cusip_col, price_col, *columns]))
+
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    os.makedirs(out_dir)
+
+    carry: Dict[str, float] = {}
+    n_parts = 0
+    reader = pd.read_csv(prices_path, chunksize=chunksize, usecols=usecols,
+                         dtype={cusip_col: str}, parse_dates=[date_col])
+    for chunk in reader:
+        with span("panel.chunk", rows=len(chunk)):
+            if keep_codes is not None:
+                chunk = chunk[pd.Index(cusip6_codes(chunk[cusip_col])).isin(keep_codes)]
+            if chunk.empty:
+                continue
+            # Rows after the last window are never needed; rows between
+            # windows still feed the carried prices.
+            chunk = chunk[chunk[date_col] <= last_end]
+            chunk = chunk.sort_values([cusip_col, date_col], kind='stable')
+            chunk['daily_return'] = _returns_with_carry(chunk, carry, cusip_col, price_col)
+
+            dates = chunk[date_col].to_numpy()
+            window = np.searchsorted(starts, dates, side='right') - 1
+            inside = (window >= 0) & (dates <= ends[np.maximum(window, 0)])
+            chunk = chunk[inside]
+            window = window[inside]
+            for w in np.unique(window):
+                part_dir = os.path.join(out_dir, f"year={windows['year'].iloc[w]}")
+                os.makedirs(part_dir, exist_ok=True)
+                part = chunk[window == w].assign(cei_release_date=windows['release'].iloc[w],
+                                                 cei_year=windows['year'].iloc[w])
+                part.to_csv(os.path.join(part_dir, f"part-{n_parts:05d}.csv"), index=False)
+                n_parts += 1
+            count("panel_rows", len(chunk))
+
+    return _finalize_partitions(out_dir, date_col, cusip_col)
+
+
+def _finalize_partitions(out_dir: str, date_col: str, cusip_col: str) -> List[str]:
+    """Merge each year's part files and add trading days from release."""
+    paths = []
+    for part_dir in sorted(glob.glob(os.path.join(out_dir, "year=*"))):
+        parts = sorted(glob.glob(os.path.join(part_dir, "part-*.csv")))
+        # One release window of the universe: small enough to hold at once
+        df = pd.concat((pd.read_csv(p, parse_dates=[date_col, 'cei_release_date'], dtype={cusip_col: str})
+                        for p in parts), ignore_index=True)
+        df = add_days_from_release(df, df['cei_release_date'].iloc[0], date_col=date_col)
+        path = part_dir + ".csv"
+        df.to_csv(path, index=False)
+        shutil.rmtree(part_dir)
+        paths.append(path)
+        logging.info(f"{os.path.basename(part_dir)}: {len(df)} panel rows")
+    return paths
+
+
+def load_event_panel(out_dir: str, years: Optional[Iterable[int]] = None, date_col: str = 'date') -> pd.DataFrame:
+    """
+    Read event-panel partitions written by ``build_event_panel``.
+
+    Args:
+        out_dir: Partition directory
+        years: Report years to load (default: all)
+        date_col: Date column
+
+    Returns:
+        Concatenated panel in compact dtypes.
+    """
+    from .compact import read_compact_csv
+
+    paths = sorted(glob.glob(os.path.join(out_dir, "year=*.csv")))
+    if years is not None:
+        wanted = {f"year={year}.csv" for year in years}
+        paths = [p for p in paths if os.path.basename(p) in wanted]
+    if not paths:
+        return pd.DataFrame()
+    frames = []
+    for path in paths:
+        df = read_compact_csv(path)
+        for col in (date_col, 'cei_release_date'):
+            df[col] = pd.to_datetime(df[col])
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,222 @@
+"""
+Lightweight timing instrumentation for the extraction pipeline.
+
+Spans record wall time, CPU time and the change in resident memory (plus
+the process-lifetime peak RSS, which is not per span) and are written as a
+Chrome trace-event JSON file, which opens in chrome://tracing, Perfetto or
+speedscope as a flame chart. Profiling is off by default; while disabled,
+``span`` returns a shared no-op object and ``count`` returns immediately.
+
+Example:
+    enable_profiling()
+    with span("ocr", year=2010, page=41):
+        ...
+    write_trace("results/trace_2010.json")
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+
+class _NullSpan:
+    """No-op span returned while profiling is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+class _Tracer:
+    """Collects trace events for one run."""
+
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self.counters: Dict[str, float] = {}
+        self.origin_ns = time.perf_counter_ns()
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def timestamp_us(self, t_ns: int) -> float:
+        return (t_ns - self.origin_ns) / 1000.0
+
+    def add(self, event: Dict[str, Any]) -> None:
+        with self._lock:
+            self.events.append(event)
+
+
+class _Span:
+    """Context manager recording one complete ("X") trace event."""
+
+    __slots__ = ("_tracer", "name", "tags", "_wall", "_cpu", "_rss")
+
+    def __init__(self, tracer: _Tracer, name: str, tags: Dict[str, Any]):
+        self._tracer = tracer
+        self.name = name
+        self.tags = tags
+
+    def __enter__(self):
+        self._wall = time.perf_counter_ns()
+        self._cpu = time.thread_time_ns()
+        self._rss = _current_rss_mb()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall_end = time.perf_counter_ns()
+        cpu_ms = (time.thread_time_ns() - self._cpu) / 1e6
+        args = dict(self.tags)
+        args["cpu_ms"] = round(cpu_ms, 3)
+        rss = _current_rss_mb()
+        if rss is not None and self._rss is not None:
+            args["rss_delta_mb"] = round(rss - self._rss, 1)
+        peak = _process_peak_rss_mb()
+        if peak is not None:
+            args["process_peak_rss_mb"] = peak
+        if exc_type is not None:
+            args["error"] = exc_type.__name__
+        self._tracer.add({
+            "name": self.name,
+            "cat": "pfp",
+            "ph": "X",
+            "ts": self._tracer.timestamp_us(self._wall),
+            "dur": (wall_end - self._wall) / 1000.0,
+            "pid": self._tracer.pid,
+            "tid": threading.get_ident(),
+            "args": args,
+        })
+        return False
+
+
+_TRACER: Optional[_Tracer] = None
+
+
+def _current_rss_mb() -> Optional[float]:
+    """Current resident set size of this process in MB (Linux only)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return round(pages * _PAGE_SIZE / (1024 * 1024), 1)
+
+
+def _process_peak_rss_mb() -> Optional[float]:
+    """Peak resident set size over this process's lifetime in MB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def enable_profiling() -> None:
+    """Start collecting spans and counters, discarding any previous run."""
+    global _TRACER
+    _TRACER = _Tracer()
+
+
+def disable_profiling() -> None:
+    """Stop collecting and drop the collected events."""
+    global _TRACER
+    _TRACER = None
+
+
+def profiling_enabled() -> bool:
+    """Return True while spans are being recorded."""
+    return _TRACER is not None
+
+
+def span(name: str, **tags):
+    """
+    Time a block of code.
+
+    Args:
+        name: Span name, e.g. "camelot.read_pdf", "rasterize", "ocr"
+        **tags: Extra fields stored with the event (year, page, strategy, ...)
+
+    Returns:
+        A context manager; a shared no-op when profiling is disabled.
+    """
+    tracer = _TRACER
+    if tracer is None:
+        return _NULL_SPAN
+    return _Span(tracer, name, tags)
+
+
+def count(name: str, value: float = 1, **tags) -> None:
+    """
+    Increment a named counter and record its running total.
+
+    Args:
+        name: Counter name, e.g. "tables" or "ocr_pages"
+        value: Amount to add
+        **tags: Extra fields stored with the event
+    """
+    tracer = _TRACER
+    if tracer is None:
+        return
+    with tracer._lock:
+        total = tracer.counters.get(name, 0) + value
+        tracer.counters[name] = total
+    tracer.add({
+        "name": name,
+        "cat": "pfp",
+        "ph": "C",
+        "ts": tracer.timestamp_us(time.perf_counter_ns()),
+        "pid": tracer.pid,
+        "tid": threading.get_ident(),
+        "args": {name: total, **tags},
+    })
+
+
+def get_trace() -> Dict[str, Any]:
+    """
+    Return the collected events in Chrome trace-event format.
+
+    Returns:
+        Dict with "traceEvents" and run-level "otherData" (counter totals).
+    """
+    if _TRACER is None:
+        return {"traceEvents": [], "otherData": {}}
+    with _TRACER._lock:
+        events = list(_TRACER.events)
+        counters = dict(_TRACER.counters)
+    return {
+        "traceEvents": events,
+        "displayTimeUnit": "ms",
+        "otherData": {"counters": counters, "process_peak_rss_mb": _process_peak_rss_mb()},
+    }
+
+
+def write_trace(path: str) -> str:
+    """
+    Write the collected events to a trace-event JSON file.
+
+    Args:
+        path: Destination file
+
+    Returns:
+        The path written.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(get_trace(), f)
+    return path
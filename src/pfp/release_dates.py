@@ -0,0 +1,233 @@
+"""
+Release dates of CEI reports from their front matter.
+
+Each report is read cheaply: the PDF metadata and the text layer of the
+first few pages. Page 1 is OCR'd only if the text layer holds no plausible
+date. The candidates are reconciled like ``date_comparison.csv``, where a
+date printed in the text wins over one from the page image, which wins over
+the file metadata. Results are cached per PDF content hash and options, so
+rebuilding ``dates.csv`` for every year only re-reads new or replaced
+reports.
+
+PDFs are read with PyMuPDF (the ``pdf`` extra).
+"""
+
+import datetime
+import json
+import logging
+import os
+import re
+from typing import Dict, Iterable, List, Optional
+
+from .profiling import span
+from .utils import file_sha256
+
+_MONTHS = {
+    name: number
+    for number, names in enumerate([
+        ('january', 'jan'), ('february', 'feb'), ('march', 'mar'), ('april', 'apr'),
+        ('may',), ('june', 'jun'), ('july', 'jul'), ('august', 'aug'),
+        ('september', 'sept', 'sep'), ('october', 'oct'), ('november', 'nov'), ('december', 'dec'),
+    ], start=1)
+    for name in names
+}
+_MONTH = '|'.join(sorted(_MONTHS, key=len, reverse=True))
+
+# Full dates first: a month-only date ("November 2019") counts as the 1st
+# and is used only when no full date is found
+_FULL_DATE_PATTERNS = [
+    (re.compile(rf'\b({_MONTH})\.?\s+(\d{{1,2}}),?\s+(\d{{4}})\b', re.I), ('month', 'day', 'year')),
+    (re.compile(r'\b(\d{1,2})/(\d{1,2})/(\d{4})\b'), ('month', 'day', 'year')),
+    (re.compile(r'\b(\d{4})-(\d{2})-(\d{2})\b'), ('year', 'month', 'day')),
+]
+_MONTH_ONLY_PATTERN = re.compile(rf'\b({_MONTH})\.?\s+(\d{{4}})\b', re.I)
+_PDF_DATE = re.compile(r'D:(\d{4})(\d{2})(\d{2})')
+
+# Date sources, in priority order
+SOURCES = ('Text_Source', 'Image_Source', 'Metadata_Source')
+
+# Columns of the curated ``date_comparison.csv``. ``Original_CEI_Dates`` is
+# hand-collected and only carried over; ``Metadata_Source`` is not written.
+COMPARISON_COLUMNS = ['Year', 'Image_Source', 'Text_Source', 'Original_CEI_Dates', 'Consolidated_Dates']
+
+
+def _date(year: str, month: str, day: str) -> Optional[datetime.date]:
+    try:
+        month_number = _MONTHS.get(month.lower()) if not month.isdigit() else int(month)
+        return datetime.date(int(year), month_number, int(day))
+    except (TypeError, ValueError):
+        return None
+
+
+def find_dates(text: str, year: int) -> List[datetime.date]:
+    """
+    Plausible release dates of a report found in text, best candidate first.
+
+    A report for ``year`` is published between January of that year and the
+    end of the next year. Full dates come before month-only dates; within
+    each kind, dates keep their order in the text.
+
+    Args:
+        text: Front-matter text
+        year: Report year
+
+    Returns:
+        Distinct candidate dates.
+    """
+    def plausible(date):
+        return date is not None and year <= date.year <= year + 1
+
+    full = []
+    for pattern, fields in _FULL_DATE_PATTERNS:
+        for m in pattern.finditer(text):
+            parts = dict(zip(fields, m.groups()))
+            full.append((m.start(), _date(parts['year'], parts['month'], parts['day'])))
+    month_only = [(m.start(), _date(m.group(2), m.group(1), '1')) for m in _MONTH_ONLY_PATTERN.finditer(text)]
+
+    candidates = [d for _, d in sorted(full, key=lambda c: c[0]) if plausible(d)]
+    candidates += [d for _, d in sorted(month_only, key=lambda c: c[0]) if plausible(d)]
+    return list(dict.fromkeys(candidates))
+
+
+def _metadata_date(pdf_path: str, year: int) -> Optional[datetime.date]:
+    """Creation (or modification) date from the PDF metadata."""
+    import fitz
+
+    with fitz.open(pdf_path) as doc:
+        info = doc.metadata or {}
+    for key in ('creationDate', 'modDate'):
+        m = _PDF_DATE.match(str(info.get(key) or ''))
+        date = _date(*m.groups()) if m else None
+        if date is not None and year <= date.year <= year + 1:
+            return date
+    return None
+
+
+def _front_matter_text(pdf_path: str, max_pages: int) -> str:
+    import fitz
+
+    with fitz.open(pdf_path) as doc:
+        return '\n'.join(doc[i].get_text() for i in range(min(max_pages, doc.page_count)))
+
+
+def _first_page_ocr_text(pdf_path: str, year: int) -> str:
+    from .ocr_cei_extractor import _ocr_page, _rasterize_page
+
+    try:
+        image = _rasterize_page(pdf_path, 1, year)
+    except Exception as e:
+        logging.warning(f"Could not rasterize page 1 of {pdf_path}: {e}")
+        return ''
+    return _ocr_page(image, 1, year) if image is not None else ''
+
+
+def reconcile(candidates: Dict[str, Optional[str]]) -> Optional[str]:
+    """Consolidated release date: the first source in ``SOURCES`` order that has one."""
+    for source in SOURCES:
+        if candidates.get(source):
+            return candidates[source]
+    return None
+
+
+def extract_release_date(
+    pdf_path: str,
+    year: int,
+    cache_dir: Optional[str] = None,
+    max_pages: int = 3,
+    ocr: bool = True,
+) -> Dict[str, Optional[str]]:
+    """
+    Release-date candidates of one report and their consolidated date.
+
+    Args:
+        pdf_path: Path to the CEI PDF file
+        year: Report year
+        cache_dir: Directory for per-PDF results keyed by content hash,
+            ``max_pages`` and ``ocr``
+        max_pages: Front-matter pages whose text layer is searched
+        ocr: OCR page 1 when the text layer has no date
+
+    Returns:
+        Dict with 'Year', one ISO date (or None) per entry of ``SOURCES``
+        and 'Consolidated_Dates'.
+    """
+    sha256 = file_sha256(pdf_path)
+    cache_name = f"{sha256}__p{max_pages}{'__ocr' if ocr else ''}.json"
+    cache_path = os.path.join(cache_dir, cache_name) if cache_dir else None
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path) as f:
+            cached = json.load(f)
+        if cached.get('Year') == year:
+            return cached
+
+    def first(dates):
+        return dates[0].isoformat() if dates else None
+
+    with span('release_date', year=year):
+        row: Dict[str, Optional[str]] = {'Year': year}
+        row['Text_Source'] = first(find_dates(_front_matter_text(pdf_path, max_pages), year))
+        row['Image_Source'] = None
+        if ocr and row['Text_Source'] is None:
+            row['Image_Source'] = first(find_dates(_first_page_ocr_text(pdf_path, year), year))
+        metadata = _metadata_date(pdf_path, year)
+        row['Metadata_Source'] = metadata.isoformat() if metadata else None
+        row['Consolidated_Dates'] = reconcile(row)
+
+    if cache_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = cache_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(row, f)
+        os.replace(tmp_path, cache_path)
+    return row
+
+
+def build_release_dates(
+    pdfs: Dict[int, str],
+    dates_csv: Optional[str] = None,
+    comparison_csv: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+    years: Optional[Iterable[int]] = None,
+    original_csv: Optional[str] = None,
+    **kwargs,
+):
+    """
+    Extract release dates of many reports and write the date tables.
+
+    Args:
+        pdfs: Report year -> PDF path
+        dates_csv: Output with 'Year' and 'Release Date' (as read by
+            ``load_cei_release_dates``); years without a date are left out
+        comparison_csv: Output with ``COMPARISON_COLUMNS``, the schema of
+            ``date_comparison.csv``
+        cache_dir: Per-PDF result cache
+        years: Years to include (default: all in ``pdfs``)
+        original_csv: Existing comparison table whose ``Original_CEI_Dates``
+            are carried over (the column is empty without it)
+        **kwargs: Passed to ``extract_release_date`` (max_pages, ocr)
+
+    Returns:
+        The comparison DataFrame, with every entry of ``SOURCES`` and
+        ``Original_CEI_Dates``.
+    """
+    import pandas as pd
+
+    wanted = sorted(pdfs if years is None else set(years) & set(pdfs))
+    rows = [extract_release_date(pdfs[year], year, cache_dir=cache_dir, **kwargs) for year in wanted]
+    comparison = pd.DataFrame(rows, columns=['Year', *SOURCES, 'Consolidated_Dates'])
+    original = None
+    if original_csv and os.path.exists(original_csv):
+        original = pd.read_csv(original_csv, dtype=str).set_index('Year').get('Original_CEI_Dates')
+    comparison.insert(len(SOURCES) + 1, 'Original_CEI_Dates',
+                      comparison['Year'].astype(str).map(original) if original is not None else None)
+
+    found = comparison['Consolidated_Dates'].notna().sum()
+    logging.info(f"Found release dates for {found}/{len(comparison)} reports")
+    if comparison_csv:
+        comparison[COMPARISON_COLUMNS].to_csv(comparison_csv, index=False)
+    if dates_csv:
+        dates = comparison.dropna(subset=['Consolidated_Dates'])
+        dates[['Year', 'Consolidated_Dates']].rename(
+            columns={'Consolidated_Dates': 'Release Date'}
+        ).to_csv(dates_csv, index=False)
+    return comparison
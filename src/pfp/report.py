@@ -0,0 +1,293 @@
+"""
+Headless rendering of the analysis figures from aggregate tables.
+
+The figures of ``cei_stock_analysis.ipynb`` (score distribution, per-year
+2x3 return grids, all-year returns with confidence bands, cumulative
+returns, event-return box plots) are described as small JSON-able specs
+built from precomputed tables: the ``pfp analyze`` summary, the CEI table
+and optionally per-firm event returns. Specs are rendered in a process pool
+with matplotlib's Agg backend to PNG/SVG and written as Plotly figure JSON.
+A manifest keeps the hash of each spec, so only figures whose data changed
+are rendered again.
+
+Spec layout::
+
+    {"title": ..., "grid": [rows, cols],
+     "panels": [{"title": ..., "xlabel": ..., "ylabel": ..., "kind": "line" | "bar" | "box",
+                 "vline": 0, "series": [{"name": ..., "x": [...], "y": [...],
+                                         "low": [...], "high": [...]}]}]}
+
+Box series hold precomputed statistics (q1, med, q3, whislo, whishi)
+instead of x/y.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .analysis import SCORE_BINS
+
+Figure = Dict[str, Any]
+
+FORMATS = ('png', 'svg', 'json')
+MANIFEST = 'manifest.json'
+YEARS_PER_GRID = 6
+
+
+def _bin_order(values) -> List[str]:
+    present = set(map(str, values))
+    return [b for b in SCORE_BINS if b in present] + sorted(present - set(SCORE_BINS))
+
+
+def roll_up_years(summary: pd.DataFrame) -> pd.DataFrame:
+    """
+    Combine per-year summary rows into all-year rows per score bin and day.
+
+    Means, standard deviations and counts are pooled exactly from the
+    per-year statistics.
+    """
+    df = summary.assign(
+        total=summary['avg_return'] * summary['count'],
+        sumsq=summary['std_return'].fillna(0) ** 2 * (summary['count'] - 1)
+        + summary['avg_return'] ** 2 * summary['count'],
+    )
+    pooled = df.groupby(['score_bin', 'days_from_release'], observed=True)[['count', 'total', 'sumsq']].sum()
+    pooled['avg_return'] = pooled['total'] / pooled['count']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        var = (pooled['sumsq'] - pooled['total'] * pooled['avg_return']) / (pooled['count'] - 1)
+    pooled['std_return'] = np.sqrt(var.clip(lower=0))
+    pooled['std_error'] = pooled['std_return'] / np.sqrt(pooled['count'])
+    return pooled.drop(columns=['total', 'sumsq']).reset_index()
+
+
+def _line_series(df: pd.DataFrame, value: str, bands: bool = False) -> List[Dict[str, Any]]:
+    series = []
+    for score_bin in _bin_order(df['score_bin'].unique()):
+        rows = df[df['score_bin'].astype(str) == score_bin].sort_values('days_from_release')
+        item = {'name': f'CEI {score_bin}', 'x': rows['days_from_release'].tolist(),
+                'y': (rows[value] * 100).round(8).tolist()}
+        if bands:
+            item['low'] = ((rows['avg_return'] - 1.96 * rows['std_error']) * 100).round(8).tolist()
+            item['high'] = ((rows['avg_return'] + 1.96 * rows['std_error']) * 100).round(8).tolist()
+        series.append(item)
+    return series
+
+
+def build_figures(
+    summary: pd.DataFrame,
+    cei: Optional[pd.DataFrame] = None,
+    event_returns: Optional[pd.DataFrame] = None,
+    score_col: str = 'cei_score',
+) -> Dict[str, Figure]:
+    """
+    Figure specs of the analysis report.
+
+    Args:
+        summary: ``pfp analyze`` output by year, score_bin and
+            days_from_release (avg_return, std_return, count, std_error)
+        cei: CEI table for the score distribution figure
+        event_returns: Per-firm event returns (score_bin, event_return)
+            for the box plot
+        score_col: Score column of ``cei``
+
+    Returns:
+        Figure name -> spec.
+    """
+    figures: Dict[str, Figure] = {}
+
+    if cei is not None and score_col in cei.columns:
+        from .analysis import add_score_bins
+
+        counts = add_score_bins(cei, score_col=score_col)['score_bin'].value_counts()
+        order = _bin_order(counts.index)
+        figures['score_distribution'] = {
+            'title': 'Distribution of CEI Scores by Bin', 'grid': [1, 1],
+            'panels': [{'kind': 'bar', 'xlabel': 'CEI Score Bin', 'ylabel': 'Number of Company-Year Observations',
+                        'series': [{'name': 'count', 'x': order, 'y': [int(counts[b]) for b in order]}]}],
+        }
+
+    years = sorted(summary['year'].unique()) if 'year' in summary.columns else []
+    for start in range(0, len(years), YEARS_PER_GRID):
+        chunk = years[start:start + YEARS_PER_GRID]
+        figures[f'yearly_returns_{chunk[0]}_{chunk[-1]}'] = {
+            'title': 'Returns Around CEI Release by Year', 'grid': [2, 3],
+            'panels': [{'kind': 'line', 'title': f'Returns Around CEI Release - {year}', 'vline': 0,
+                        'xlabel': 'Days from Release', 'ylabel': 'Average Return (%)',
+                        'series': _line_series(summary[summary['year'] == year], 'avg_return')}
+                       for year in chunk],
+        }
+
+    overall = roll_up_years(summary) if 'year' in summary.columns else summary
+    figures['overall_returns'] = {
+        'title': 'Stock Returns Around CEI Release Dates by Score (All Years Combined)', 'grid': [1, 1],
+        'panels': [{'kind': 'line', 'vline': 0, 'xlabel': 'Days from CEI Release Date',
+                    'ylabel': 'Average Daily Return (%)', 'series': _line_series(overall, 'avg_return', bands=True)}],
+    }
+    cumulative = overall.sort_values('days_from_release').assign(
+        cumulative_return=lambda d: d.groupby('score_bin', observed=True)['avg_return'].transform(
+            lambda r: (1 + r).cumprod() - 1))
+    figures['cumulative_returns'] = {
+        'title': 'Cumulative Returns Around CEI Release Dates by Score', 'grid': [1, 1],
+        'panels': [{'kind': 'line', 'vline': 0, 'xlabel': 'Days from CEI Release Date',
+                    'ylabel': 'Cumulative Return (%)', 'series': _line_series(cumulative, 'cumulative_return')}],
+    }
+
+    if event_returns is not None and not event_returns.empty:
+        boxes = []
+        for score_bin in _bin_order(event_returns['score_bin'].dropna().unique()):
+            values = event_returns.loc[event_returns['score_bin'].astype(str) == score_bin, 'event_return'].dropna() * 100
+            q1, med, q3 = np.percentile(values, [25, 50, 75])
+            iqr = q3 - q1
+            inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+            boxes.append({'name': f'CEI {score_bin}', 'q1': q1, 'med': med, 'q3': q3,
+                          'whislo': inside.min(), 'whishi': inside.max()})
+        figures['event_return_boxplot'] = {
+            'title': 'Distribution of Event Window Returns by CEI Score', 'grid': [1, 1],
+            'panels': [{'kind': 'box', 'xlabel': 'CEI Score Bin', 'ylabel': 'Event Window Return (%)',
+                        'series': [{k: (round(float(v), 8) if k != 'name' else v) for k, v in box.items()}
+                                   for box in boxes]}],
+        }
+    return figures
+
+
+def figure_hash(figure: Figure) -> str:
+    """Content hash of a figure spec."""
+    return hashlib.sha256(json.dumps(figure, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _plotly_json(figure: Figure) -> Dict[str, Any]:
+    """Plotly figure dict (loadable with ``plotly.io.from_json``) for a spec."""
+    rows, cols = figure['grid']
+    data, layout = [], {'title': {'text': figure['title']}, 'template': 'plotly_white'}
+    for i, panel in enumerate(figure['panels']):
+        axis = '' if i == 0 else str(i + 1)
+        row, col = divmod(i, cols)
+        layout[f'xaxis{axis}'] = {'title': {'text': panel.get('xlabel', '')},
+                                  'domain': [col / cols + 0.04, (col + 1) / cols - 0.04], 'anchor': f'y{axis}'}
+        layout[f'yaxis{axis}'] = {'title': {'text': panel.get('ylabel', '')},
+                                  'domain': [1 - (row + 1) / rows + 0.06, 1 - row / rows - 0.06], 'anchor': f'x{axis}'}
+        refs = {'xaxis': f'x{axis}', 'yaxis': f'y{axis}'}
+        for series in panel['series']:
+            if panel['kind'] == 'box':
+                data.append({'type': 'box', 'name': series['name'], 'q1': [series['q1']], 'median': [series['med']],
+                             'q3': [series['q3']], 'lowerfence': [series['whislo']],
+                             'upperfence': [series['whishi']], **refs})
+            elif panel['kind'] == 'bar':
+                data.append({'type': 'bar', 'name': series['name'], 'x': series['x'], 'y': series['y'], **refs})
+            else:
+                group = {'legendgroup': series['name'], **refs}
+                data.append({'type': 'scatter', 'mode': 'lines+markers', 'name': series['name'],
+                             'x': series['x'], 'y': series['y'], 'showlegend': i == 0, **group})
+                if 'low' in series:
+                    data.append({'type': 'scatter', 'x': series['x'] + series['x'][::-1],
+                                 'y': series['high'] + series['low'][::-1], 'fill': 'toself', 'opacity': 0.2,
+                                 'line': {'width': 0}, 'hoverinfo': 'skip', 'showlegend': False, **group})
+    return {'data': data, 'layout': layout}
+
+
+def _render_matplotlib(figure: Figure, base_path: str, formats: Sequence[str]) -> None:
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    rows, cols = figure['grid']
+    fig, axes = plt.subplots(rows, cols, figsize=(6 * cols + 2, 5 * rows + 1), squeeze=False)
+    for ax, panel in zip(axes.ravel(), figure['panels']):
+        series = panel['series']
+        colors = plt.cm.RdYlGn(np.linspace(0.2, 0.8, max(len(series), 1)))
+        if panel['kind'] == 'bar':
+            ax.bar(series[0]['x'], series[0]['y'])
+            ax.tick_params(axis='x', rotation=45)
+        elif panel['kind'] == 'box':
+            ax.bxp([{**s, 'label': s['name'], 'fliers': []} for s in series], showfliers=False)
+            ax.tick_params(axis='x', rotation=45)
+        else:
+            for color, s in zip(colors, series):
+                ax.plot(s['x'], s['y'], marker='o', linewidth=2, markersize=4, color=color, label=s['name'])
+                if 'low' in s:
+                    ax.fill_between(s['x'], s['low'], s['high'], alpha=0.2, color=color)
+            ax.axhline(0, color='black', alpha=0.5)
+            ax.legend(bbox_to_anchor=(1.02, 1), loc='upper left', fontsize=8)
+        if 'vline' in panel:
+            ax.axvline(panel['vline'], color='red', linestyle='--', alpha=0.7)
+        ax.set_title(panel.get('title', ''))
+        ax.set_xlabel(panel.get('xlabel', ''))
+        ax.set_ylabel(panel.get('ylabel', ''))
+        ax.grid(True, alpha=0.3)
+    for ax in axes.ravel()[len(figure['panels']):]:
+        ax.set_visible(False)
+    fig.suptitle(figure['title'], fontsize=14, fontweight='bold')
+    fig.tight_layout()
+    for fmt in formats:
+        fig.savefig(f'{base_path}.{fmt}', dpi=150 if fmt == 'png' else 'figure')
+    plt.close(fig)
+
+
+def _render_one(name: str, figure: Figure, out_dir: str, formats: Sequence[str]) -> List[str]:
+    """Render one figure to every format; runs in a worker process."""
+    base_path = os.path.join(out_dir, name)
+    image_formats = [fmt for fmt in formats if fmt != 'json']
+    if image_formats:
+        _render_matplotlib(figure, base_path, image_formats)
+    if 'json' in formats:
+        with open(f'{base_path}.json', 'w') as f:
+            json.dump(_plotly_json(figure), f)
+    return [f'{base_path}.{fmt}' for fmt in formats]
+
+
+def render_report(
+    figures: Dict[str, Figure],
+    out_dir: str,
+    formats: Sequence[str] = FORMATS,
+    workers: Optional[int] = None,
+    force: bool = False,
+) -> List[str]:
+    """
+    Render figure specs whose content changed since the last run.
+
+    Args:
+        figures: Figure name -> spec (``build_figures``)
+        out_dir: Output directory (holds the manifest)
+        formats: Any of 'png', 'svg' and 'json' (Plotly)
+        workers: Render processes (default: CPU count; 1 renders in-process)
+        force: Render everything regardless of the manifest
+
+    Returns:
+        Names of the figures rendered.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    manifest = {}
+    if os.path.exists(manifest_path) and not force:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    hashes = {name: figure_hash({'figure': figure, 'formats': sorted(formats)}) for name, figure in figures.items()}
+    stale = [
+        name for name in figures
+        if force or manifest.get(name, {}).get('hash') != hashes[name]
+        or not all(os.path.exists(path) for path in manifest[name]['files'])
+    ]
+    logging.info(f"Rendering {len(stale)} of {len(figures)} figures")
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(stale) <= 1:
+        files = [_render_one(name, figures[name], out_dir, formats) for name in stale]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(stale))) as pool:
+            files = list(pool.map(_render_one, stale, [figures[n] for n in stale],
+                                  [out_dir] * len(stale), [formats] * len(stale)))
+
+    for name, paths in zip(stale, files):
+        manifest[name] = {'hash': hashes[name], 'files': paths}
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+    return stale
@@ -0,0 +1,356 @@
+"""
+Synthetic CEI-style fixtures for benchmarks and evaluation.
+
+Generates deterministic company/score lists, camelot-like wide tables, OCR
+text dumps, daily price files and small PDF reports that mimic the layout of
+the CEI appendix (company name followed by its score, one or two columns per
+page, with or without a text layer).
+"""
+
+import os
+import random
+import zlib
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+_NAME_WORDS = [
+    "Acme", "Allied", "American", "Atlantic", "Blue", "Bridge", "Capital",
+    "Central", "Citizens", "Coastal", "Delta", "Eagle", "Empire", "First",
+    "General", "Global", "Golden", "Great", "Harbor", "Heritage", "Liberty",
+    "Lincoln", "Metro", "National", "Northern", "Pacific", "Pioneer", "Prime",
+    "Republic", "River", "Summit", "Union", "United", "Western",
+]
+_NAME_NOUNS = [
+    "Bancorp", "Brands", "Chemical", "Communications", "Energy", "Financial",
+    "Foods", "Health", "Industries", "Insurance", "Media", "Motors",
+    "Partners", "Pharmaceuticals", "Retail", "Systems", "Technologies",
+]
+_SUFFIXES = ["Inc.", "Corp.", "Co.", "LLC", "Group", "Holdings", "Ltd.", "LLP"]
+_CITIES = [
+    ("New York", "NY"), ("Chicago", "IL"), ("Seattle", "WA"), ("Dallas", "TX"),
+    ("Atlanta", "GA"), ("Boston", "MA"), ("Denver", "CO"), ("Columbus", "OH"),
+]
+
+# Points of the CEI scale that show up most often in real reports.
+_SCORE_LEVELS = np.array([0, 15, 20, 30, 35, 40, 45, 55, 60, 70, 75, 80, 85, 90, 95, 100])
+
+
+def make_companies(n: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Generate unique company names with CEI scores.
+
+    Args:
+        n: Number of companies
+        seed: Random seed
+
+    Returns:
+        DataFrame with columns: Company, CEI_Score, City, State
+    """
+    rng = random.Random(seed)
+    names = set()
+    rows = []
+    while len(rows) < n:
+        name = f"{rng.choice(_NAME_WORDS)} {rng.choice(_NAME_NOUNS)} {rng.choice(_SUFFIXES)}"
+        if name in names:
+            name = f"{rng.choice(_NAME_WORDS)} {name}"
+            if name in names:
+                continue
+        names.add(name)
+        city, state = rng.choice(_CITIES)
+        # Skew towards high scores, as in recent reports
+        score = int(_SCORE_LEVELS[min(int(rng.betavariate(3, 1.5) * len(_SCORE_LEVELS)), len(_SCORE_LEVELS) - 1)])
+        rows.append((name, float(score), city, state))
+    return pd.DataFrame(rows, columns=["Company", "CEI_Score", "City", "State"])
+
+
+def make_score_table(n_rows: int, n_cols: int = 6, seed: int = 0) -> pd.DataFrame:
+    """
+    Build a camelot-like string table with one company and one score column.
+
+    Extra columns hold row numbers, page numbers, rubric points and blanks so
+    the column-pairing heuristics have wrong candidates to reject.
+
+    Args:
+        n_rows: Number of data rows
+        n_cols: Total number of columns (at least 2)
+        seed: Random seed
+
+    Returns:
+        DataFrame of strings with integer column labels, header in row 0.
+    """
+    rng = np.random.default_rng(seed)
+    companies = make_companies(n_rows, seed)
+    scores = [str(int(s)) for s in companies["CEI_Score"]]
+    if n_cols < 4:
+        header = ["Company", "CEI Score"]
+        columns = [companies["Company"].tolist(), scores]
+    else:
+        header = ["#", "Company", "Location", "CEI Score"]
+        columns = [
+            [str(i + 1) for i in range(n_rows)],
+            companies["Company"].tolist(),
+            [f"{c}, {s}" for c, s in zip(companies["City"], companies["State"])],
+            scores,
+        ]
+        for i in range(4, n_cols):
+            if i % 3 == 0:
+                # Rubric points
+                columns.append([str(v) for v in rng.choice([0, 5, 10, 15, 25], n_rows)])
+            elif i % 3 == 1:
+                columns.append([""] * n_rows)
+            else:
+                # Page numbers
+                columns.append([str(40 + r // 30) for r in range(n_rows)])
+            header.append(f"Col {i}")
+    grid = [header] + [list(row) for row in zip(*columns)]
+    return pd.DataFrame(grid)
+
+
+def make_ocr_text(n_companies: int, seed: int = 0, noise: float = 0.1) -> Tuple[str, pd.DataFrame]:
+    """
+    Generate an OCR text dump of an appendix listing.
+
+    Args:
+        n_companies: Number of company lines
+        seed: Random seed
+        noise: Share of company lines preceded by a header, page number or OCR junk line
+
+    Returns:
+        (text, labels) where labels has columns Company, CEI_Score.
+    """
+    rng = random.Random(seed)
+    companies = make_companies(n_companies, seed)
+    junk = [
+        "Appendix A: Corporate Equality Index Ratings", "Page 42", "eeeeee ~~ %%",
+        "Criteria points total score", "www.hrc.org/cei", "",
+    ]
+    lines = []
+    for row in companies.itertuples(index=False):
+        if rng.random() < noise:
+            lines.append(rng.choice(junk))
+        layout = rng.random()
+        if layout < 0.5:
+            lines.append(f"{row.Company} {row.City} {row.State} : {int(row.CEI_Score)}")
+        elif layout < 0.8:
+            lines.append(f"{row.Company} : {int(row.CEI_Score)}")
+        else:
+            lines.append(f"{row.Company} {int(row.CEI_Score)}")
+    return "\n".join(lines), companies[["Company", "CEI_Score"]]
+
+
+def make_price_csv(path: str, n_firms: int, n_days: int, start: str = "2015-01-02", seed: int = 0) -> str:
+    """
+    Write a CRSP-style daily stock file (date, CUSIP, TICKER, PRC, RET, vwretd).
+
+    Args:
+        path: Destination CSV
+        n_firms: Number of securities
+        n_days: Number of business days per security
+        start: First date
+        seed: Random seed
+
+    Returns:
+        The path written.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, periods=n_days)
+    cusips = [f"{i:06d}10" for i in range(100000, 100000 + n_firms)]
+    market = rng.normal(0.0003, 0.01, n_days)
+    returns = market[None, :] + rng.normal(0, 0.02, (n_firms, n_days))
+    prices = 50 * np.cumprod(1 + returns, axis=1)
+    df = pd.DataFrame({
+        "date": np.tile(dates.strftime("%Y-%m-%d"), n_firms),
+        "CUSIP": np.repeat(cusips, n_days),
+        "TICKER": np.repeat([f"T{i}" for i in range(n_firms)], n_days),
+        "PRC": prices.ravel().round(2),
+        "RET": returns.ravel().round(6),
+        "vwretd": np.tile(market.round(6), n_firms),
+    })
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    df.to_csv(path, index=False)
+    return path
+
+
+def write_cei_pdf(
+    path: str,
+    n_pages: int,
+    rows_per_column: int = 40,
+    columns: int = 1,
+    image_only: bool = False,
+    ruled: bool = False,
+    front_pages: int = 0,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Write a CEI-like appendix PDF.
+
+    Args:
+        path: Destination PDF
+        n_pages: Number of appendix pages
+        rows_per_column: Company rows per column per page
+        columns: Listing columns per page (1 or 2)
+        image_only: Render each page as a grayscale image with no text layer
+        ruled: Draw table rules (so camelot's lattice flavor finds cells)
+        front_pages: Number of leading prose pages before the appendix
+        seed: Random seed
+
+    Returns:
+        DataFrame of the companies written (Company, CEI_Score, page).
+    """
+    companies = make_companies(n_pages * rows_per_column * columns, seed)
+    pages = []
+    for _ in range(front_pages):
+        pages.append([("The Corporate Equality Index rates employers on policies and benefits.", "")])
+    per_page = rows_per_column * columns
+    page_numbers = []
+    for p in range(n_pages):
+        chunk = companies.iloc[p * per_page:(p + 1) * per_page]
+        pages.append([(name, str(int(score))) for name, score in zip(chunk["Company"], chunk["CEI_Score"])])
+        page_numbers.extend([front_pages + p + 1] * len(chunk))
+
+    writer = _PdfWriter()
+    for rows in pages:
+        if image_only:
+            writer.add_image_page(_render_page_image(rows, rows_per_column, columns))
+        else:
+            writer.add_page(_page_content(rows, rows_per_column, columns, ruled))
+    writer.write(path)
+
+    labels = companies[["Company", "CEI_Score"]].copy()
+    labels["page"] = page_numbers
+    return labels
+
+
+_PAGE_W, _PAGE_H = 612, 792
+_TOP, _ROW_H, _MARGIN = 740, 16, 40
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _column_origin(col: int, columns: int) -> Tuple[float, float, float]:
+    """Return (name x, score x, right edge) for one listing column."""
+    width = (_PAGE_W - 2 * _MARGIN) / columns
+    x0 = _MARGIN + col * width
+    return x0 + 4, x0 + width - 40, x0 + width
+
+
+def _page_content(rows: List[Tuple[str, str]], rows_per_column: int, columns: int, ruled: bool) -> bytes:
+    ops = []
+    for i, (name, score) in enumerate(rows):
+        col, row = divmod(i, rows_per_column)
+        name_x, score_x, _ = _column_origin(min(col, columns - 1), columns)
+        y = _TOP - row * _ROW_H
+        ops.append(f"BT /F1 9 Tf {name_x:.1f} {y} Td ({_pdf_escape(name)}) Tj ET")
+        if score:
+            ops.append(f"BT /F1 9 Tf {score_x:.1f} {y} Td ({score}) Tj ET")
+    if ruled and rows and rows[0][1]:
+        ops.append("0.5 w")
+        n_rows = min(len(rows), rows_per_column)
+        for col in range(columns):
+            name_x, score_x, right = _column_origin(col, columns)
+            left, mid = name_x - 4, score_x - 6
+            top, bottom = _TOP + _ROW_H - 4, _TOP - (n_rows - 1) * _ROW_H - 4
+            for r in range(n_rows + 1):
+                y = top - r * _ROW_H
+                ops.append(f"{left:.1f} {y} m {right - 4:.1f} {y} l S")
+            for x in (left, mid, right - 4):
+                ops.append(f"{x:.1f} {top} m {x:.1f} {bottom} l S")
+    return "\n".join(ops).encode("latin-1", "replace")
+
+
+def _render_page_image(rows: List[Tuple[str, str]], rows_per_column: int, columns: int, scale: float = 2.0):
+    from PIL import Image, ImageDraw
+
+    width, height = int(_PAGE_W * scale), int(_PAGE_H * scale)
+    image = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    for i, (name, score) in enumerate(rows):
+        col, row = divmod(i, rows_per_column)
+        name_x, score_x, _ = _column_origin(min(col, columns - 1), columns)
+        y = height - (_TOP - row * _ROW_H) * scale - 10 * scale
+        draw.text((name_x * scale, y), name, fill=0)
+        if score:
+            draw.text((score_x * scale, y), score, fill=0)
+    return image
+
+
+class _PdfWriter:
+    """Minimal PDF 1.4 writer: Helvetica text pages and grayscale image pages."""
+
+    def __init__(self):
+        self._objects: List[Optional[bytes]] = [None, None]  # 1: catalog, 2: pages
+        self._page_ids: List[int] = []
+        self._font_id = self._add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    def _add(self, body: bytes) -> int:
+        self._objects.append(body)
+        return len(self._objects)
+
+    def _stream(self, data: bytes, extra: str = "") -> int:
+        data = zlib.compress(data)
+        head = f"<< /Length {len(data)} /Filter /FlateDecode {extra}>>\nstream\n".encode()
+        return self._add(head + data + b"\nendstream")
+
+    def add_page(self, content: bytes, resources: str = "") -> None:
+        content_id = self._stream(content)
+        res = f"<< /Font << /F1 {self._font_id} 0 R >> {resources}>>"
+        self._page_ids.append(self._add(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {_PAGE_W} {_PAGE_H}] "
+            f"/Resources {res} /Contents {content_id} 0 R >>".encode()
+        ))
+
+    def add_image_page(self, image) -> None:
+        width, height = image.size
+        image_id = self._stream(
+            image.tobytes(),
+            f"/Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace /DeviceGray /BitsPerComponent 8 ",
+        )
+        content = f"q {_PAGE_W} 0 0 {_PAGE_H} 0 0 cm /Im0 Do Q".encode()
+        self.add_page(content, f"/XObject << /Im0 {image_id} 0 R >> ")
+
+    def write(self, path: str) -> None:
+        kids = " ".join(f"{i} 0 R" for i in self._page_ids)
+        self._objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+        self._objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>".encode()
+
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for i, body in enumerate(self._objects, start=1):
+            offsets.append(len(out))
+            out += f"{i} 0 obj\n".encode() + body + b"\nendobj\n"
+        xref = len(out)
+        out += f"xref\n0 {len(self._objects) + 1}\n0000000000 65535 f \n".encode()
+        for offset in offsets:
+            out += f"{offset:010d} 00000 n \n".encode()
+        out += f"trailer\n<< /Size {len(self._objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(out)
+
+
+def write_labelled_corpus(corpus_dir: str, years: List[int], n_pages: int = 10, **pdf_kwargs) -> List[str]:
+    """
+    Write a labelled corpus of synthetic reports for ``pfp.evaluation``.
+
+    Args:
+        corpus_dir: Destination directory
+        years: Report years; one ``CEI-<year>.pdf`` with labels per year
+        n_pages: Appendix pages per report
+        **pdf_kwargs: Extra arguments for ``write_cei_pdf``
+
+    Returns:
+        Paths of the PDFs written.
+    """
+    paths = []
+    for year in years:
+        pdf_path = os.path.join(corpus_dir, f"CEI-{year}.pdf")
+        labels = write_cei_pdf(pdf_path, n_pages, seed=year, **pdf_kwargs)
+        labels[["Company", "CEI_Score"]].to_csv(os.path.join(corpus_dir, f"CEI-{year}.labels.csv"), index=False)
+        paths.append(pdf_path)
+    return paths
@@ -0,0 +1,178 @@
+"""
+Table-extraction backends behind ``read_pdf_tables``.
+
+Every extractor asks for the tables on a set of pages in a camelot flavor;
+a backend answers with table objects carrying the attributes the extractors
+use (``df``, ``page``, ``order``, ``flavor``, ``_bbox``, ``shape``):
+
+* ``camelot``: ``camelot.read_pdf``. Stream mode re-runs pdfminer layout
+  analysis per page, which is slow and memory-hungry.
+* ``words``: words with coordinates from PyMuPDF's text layer, grouped into
+  rows by baseline and into columns by the page's vertical whitespace
+  gutters (or, for lattice, its vertical rule lines). One grid per page.
+* ``auto``: ``words`` for stream and ``camelot`` for lattice, so text-layer
+  pages take the fast path and ruled (hard) pages still get camelot's line
+  detection.
+
+The backend is chosen per run (``pfp extract --backend``) or per layout
+(the ``backend`` recorded in a layout profile).
+"""
+
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .page_flavor import MIN_COLUMN_GAP, expand_pages, rule_lines
+from .profiling import count, span
+
+DEFAULT_BACKEND = 'camelot'
+
+# Words whose baselines are this close (points) share a row
+ROW_TOLERANCE = 3.0
+
+
+class GridTable:
+    """Table grid built by the ``words`` backend (camelot ``Table`` look-alike)."""
+
+    def __init__(self, df: pd.DataFrame, page: int, order: int, flavor: str, bbox: Tuple[float, ...]):
+        self.df = df
+        self.page = str(page)
+        self.order = order
+        self.flavor = flavor
+        self._bbox = bbox
+        self.shape = df.shape
+
+    def __repr__(self) -> str:
+        return f"<GridTable page={self.page} flavor={self.flavor} shape={self.shape}>"
+
+
+def _read_camelot(pdf_path: str, pages: str, flavor: str) -> list:
+    import camelot
+
+    with span("camelot.read_pdf", pages=pages, flavor=flavor):
+        tables = camelot.read_pdf(pdf_path, pages=pages, flavor=flavor)
+    count("tables", len(tables), flavor=flavor)
+    return tables
+
+
+def _rows(words: List[Tuple]) -> List[List[Tuple]]:
+    """Words grouped into rows by baseline, top to bottom, each sorted by x."""
+    rows: List[List[Tuple]] = []
+    for word in sorted(words, key=lambda w: w[3]):
+        if rows and word[3] - rows[-1][-1][3] <= ROW_TOLERANCE:
+            rows[-1].append(word)
+        else:
+            rows.append([word])
+    return [sorted(row, key=lambda w: w[0]) for row in rows]
+
+
+def _is_gapped(row: List[Tuple]) -> bool:
+    return any(nxt[0] - cur[2] >= MIN_COLUMN_GAP for cur, nxt in zip(row, row[1:]))
+
+
+def column_edges(rows: List[List[Tuple]], width: float) -> np.ndarray:
+    """
+    Left edges of the text columns from whitespace gutters.
+
+    Only rows that are themselves split by a column gap count, so titles
+    and running text spanning the gutters do not close them.
+
+    Args:
+        rows: Word rows from ``_rows``
+        width: Page width in points
+
+    Returns:
+        Sorted column start positions; the first is 0.
+    """
+    covered = np.zeros(int(np.ceil(width)) + 1, dtype=bool)
+    for row in rows:
+        if _is_gapped(row):
+            for w in row:
+                covered[max(int(w[0]), 0):int(np.ceil(w[2]))] = True
+    starts = [0.0]
+    xs = np.flatnonzero(covered)
+    if len(xs):
+        gaps = np.flatnonzero(np.diff(xs) >= MIN_COLUMN_GAP)
+        starts += [float(xs[i + 1]) for i in gaps]
+    return np.array(starts)
+
+
+def words_to_grid(words: List[Tuple], width: float, edges: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """
+    Cell grid of one page's words.
+
+    Args:
+        words: PyMuPDF words (x0, y0, x1, y1, text, ...)
+        width: Page width in points
+        edges: Column start positions (default: from whitespace gutters)
+
+    Returns:
+        DataFrame of cell strings; words sharing a cell are joined by spaces.
+    """
+    rows = _rows(words)
+    edges = column_edges(rows, width) if edges is None else edges
+    grid = []
+    for row in rows:
+        cells = [[] for _ in edges]
+        cols = np.searchsorted(edges, [w[0] + 0.5 for w in row], side='right') - 1
+        for col, w in zip(cols, row):
+            cells[max(col, 0)].append(w[4])
+        grid.append([' '.join(cell) for cell in cells])
+    return pd.DataFrame(grid, dtype=object)
+
+
+def _read_words(pdf_path: str, pages: str, flavor: str) -> List[GridTable]:
+    import fitz
+
+    tables = []
+    with span("words.read_pdf", pages=pages, flavor=flavor), fitz.open(pdf_path) as doc:
+        for page_no in expand_pages(pages, doc.page_count):
+            page = doc[page_no - 1]
+            words = page.get_text('words')
+            if not words:
+                continue
+            edges = None
+            if flavor == 'lattice':
+                vertical = sorted(rule_lines(page.get_drawings())[1])
+                edges = np.array(vertical[:-1], dtype=float) if len(vertical) >= 2 else None
+            df = words_to_grid(words, page.rect.width, edges)
+            x0, y0 = min(w[0] for w in words), min(w[1] for w in words)
+            x1, y1 = max(w[2] for w in words), max(w[3] for w in words)
+            height = page.rect.height
+            # PDF user space (origin bottom-left), as in camelot's table bbox
+            tables.append(GridTable(df, page_no, 1, flavor, (x0, height - y1, x1, height - y0)))
+    count("tables", len(tables), flavor=flavor)
+    return tables
+
+
+def _read_auto(pdf_path: str, pages: str, flavor: str) -> list:
+    return (_read_words if flavor == 'stream' else _read_camelot)(pdf_path, pages, flavor)
+
+
+BACKENDS: Dict[str, Callable[[str, str, str], list]] = {
+    'camelot': _read_camelot,
+    'words': _read_words,
+    'auto': _read_auto,
+}
+
+
+def read_tables(pdf_path: str, pages: str, flavor: str, backend: Optional[str] = None) -> list:
+    """
+    Read the tables on some pages of a PDF.
+
+    Args:
+        pdf_path: Path to the PDF file
+        pages: Camelot page specification
+        flavor: 'lattice' or 'stream'
+        backend: Name from ``BACKENDS`` (default ``DEFAULT_BACKEND``)
+
+    Returns:
+        Camelot ``TableList`` or list of ``GridTable``.
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown table backend {backend!r}; choose from {sorted(BACKENDS)}")
+    logging.debug(f"Reading {flavor} tables on pages {pages} with the {backend} backend")
+    return BACKENDS[backend](pdf_path, pages, flavor)
@@ -0,0 +1,191 @@
+"""
+Compact on-disk storage for raw table grids.
+
+Each report's detected tables are written to a single ``.npz`` file holding
+one array per table attribute (page, order, flavor, bbox, shape) plus a UTF-8
+blob with the cell text of every table. Loading the file gives back
+lightweight table objects whose ``df`` is only built when first accessed, so
+the column-pairing heuristics can be replayed without re-parsing the PDF.
+"""
+
+import logging
+import os
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .profiling import span
+from .utils import file_sha256
+
+# Cell separator inside the text blob (ASCII unit separator).
+_CELL_SEP = "\x1f"
+
+
+class StoredTable:
+    """
+    Table loaded from a table store.
+
+    Mirrors the attributes of ``camelot.core.Table`` that the extractors use
+    (``df``, ``page``, ``order``, ``flavor``, ``_bbox``, ``shape``) so stored
+    tables can be passed anywhere a camelot ``TableList`` is expected.
+    """
+
+    def __init__(self, page: str, order: int, flavor: str, bbox, shape, text: bytes):
+        self.page = page
+        self.order = order
+        self.flavor = flavor
+        self._bbox = bbox
+        self.shape = shape
+        self._text = text
+        self._df = None
+
+    @property
+    def df(self) -> pd.DataFrame:
+        if self._df is None:
+            n_rows, n_cols = self.shape
+            cells = self._text.decode("utf-8").split(_CELL_SEP) if n_rows * n_cols else []
+            grid = np.array(cells, dtype=object).reshape(n_rows, n_cols)
+            self._df = pd.DataFrame(grid)
+        return self._df
+
+    def __repr__(self) -> str:
+        return f"<StoredTable page={self.page} order={self.order} flavor={self.flavor} shape={self.shape}>"
+
+
+def table_store_path(tables_dir: str, pdf_path: str, pages: str, flavor: str, backend: str = "camelot") -> str:
+    """
+    Build the store file name for one table read.
+
+    The name includes a prefix of the PDF's content hash, so a replaced or
+    re-downloaded report with the same file name is parsed afresh instead
+    of replaying the old report's grids.
+
+    Args:
+        tables_dir: Directory holding table stores
+        pdf_path: Path of the source PDF
+        pages: Camelot page specification (e.g. "30-100" or "all")
+        flavor: Camelot flavor ("lattice" or "stream")
+        backend: Table backend (see ``table_backends``)
+
+    Returns:
+        Path of the ``.npz`` file for this (pdf, pages, flavor, backend) combination.
+    """
+    stem = os.path.splitext(os.path.basename(pdf_path))[0]
+    pages_key = pages.replace(",", "_")
+    flavor_key = flavor if backend == "camelot" else f"{backend}-{flavor}"
+    content_key = file_sha256(pdf_path)[:16]
+    return os.path.join(tables_dir, f"{stem}__{content_key}__{flavor_key}__{pages_key}.npz")
+
+
+def save_tables(tables: Iterable, path: str) -> str:
+    """
+    Persist the raw cell grids of camelot tables.
+
+    Args:
+        tables: Camelot ``TableList`` (or any iterable of table-like objects)
+        path: Destination ``.npz`` file
+
+    Returns:
+        The path written.
+    """
+    pages, orders, flavors, bboxes, shapes = [], [], [], [], []
+    chunks = []
+    offsets = [0]
+
+    for table in tables:
+        df = table.df
+        cells = [str(cell).replace(_CELL_SEP, " ") for cell in df.to_numpy().ravel()]
+        text = _CELL_SEP.join(cells).encode("utf-8")
+
+        pages.append(str(getattr(table, "page", "") or ""))
+        orders.append(getattr(table, "order", None) or 0)
+        flavors.append(str(getattr(table, "flavor", "") or ""))
+        bbox = getattr(table, "_bbox", None)
+        bboxes.append(bbox if bbox is not None else (np.nan,) * 4)
+        shapes.append(df.shape)
+        chunks.append(text)
+        offsets.append(offsets[-1] + len(text))
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    np.savez_compressed(
+        path,
+        page=np.array(pages, dtype=str),
+        order=np.array(orders, dtype=np.int32),
+        flavor=np.array(flavors, dtype=str),
+        bbox=np.array(bboxes, dtype=np.float64).reshape(-1, 4),
+        shape=np.array(shapes, dtype=np.int32).reshape(-1, 2),
+        offsets=np.array(offsets, dtype=np.int64),
+        text=np.frombuffer(b"".join(chunks), dtype=np.uint8),
+    )
+    logging.debug(f"Stored {len(shapes)} tables in {path}")
+    return path
+
+
+def load_tables(path: str) -> List[StoredTable]:
+    """
+    Load tables written by ``save_tables``.
+
+    DataFrames are rebuilt lazily, one table at a time, on first access to
+    ``table.df``.
+
+    Args:
+        path: ``.npz`` file produced by ``save_tables``
+
+    Returns:
+        List of StoredTable objects in their original order.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        pages = data["page"]
+        orders = data["order"]
+        flavors = data["flavor"]
+        bboxes = data["bbox"]
+        shapes = data["shape"]
+        offsets = data["offsets"]
+        blob = data["text"].tobytes()
+
+    tables = []
+    for i in range(len(shapes)):
+        bbox = None if np.isnan(bboxes[i]).all() else tuple(float(v) for v in bboxes[i])
+        tables.append(StoredTable(
+            page=str(pages[i]),
+            order=int(orders[i]),
+            flavor=str(flavors[i]),
+            bbox=bbox,
+            shape=(int(shapes[i][0]), int(shapes[i][1])),
+            text=blob[offsets[i]:offsets[i + 1]],
+        ))
+    return tables
+
+
+def read_pdf_tables(pdf_path: str, pages: str, flavor: str, tables_dir: Optional[str] = None,
+                    backend: Optional[str] = None):
+    """
+    Read tables with a table backend, replaying a stored copy when one exists.
+
+    Args:
+        pdf_path: Path to the PDF file
+        pages: Camelot page specification
+        flavor: Camelot flavor
+        tables_dir: Optional table store directory. When given, stored grids
+            are returned instead of re-parsing, and fresh parses are saved.
+        backend: Name from ``table_backends.BACKENDS`` (default: camelot)
+
+    Returns:
+        Camelot ``TableList``, or list of GridTable or StoredTable objects.
+    """
+    from .table_backends import DEFAULT_BACKEND, read_tables
+
+    backend = backend or DEFAULT_BACKEND
+    path = None
+    if tables_dir is not None:
+        path = table_store_path(tables_dir, pdf_path, pages, flavor, backend)
+        if os.path.exists(path):
+            logging.debug(f"Replaying stored tables from {path}")
+            with span("table_store.load", pages=pages, flavor=flavor):
+                return load_tables(path)
+
+    tables = read_tables(pdf_path, pages, flavor, backend)
+    if path is not None:
+        save_tables(tables, path)
+    return tables
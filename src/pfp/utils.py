@@ -1,18 +1,27 @@
 """
 Utility functions for the pfp project.
+
+camelot and pandas are imported inside the functions that use them, so
+lightweight helpers such as ``extract_year_from_filename`` can be imported
+without paying their start-up cost.
 """
 
+from __future__ import annotations
+
+import hashlib
 import logging
 import os
 import re
 from datetime import timedelta
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
 
-import camelot
-import pandas as pd
+if TYPE_CHECKING:
+    import pandas as pd
 
-def pdf_to_df(pdf_path: str) -> pd.DataFrame:
+def pdf_to_df(pdf_path: str, backend: Optional[str] = None) -> pd.DataFrame:
     """
     Example Python script to extract tables from the CEI PDF (specifically from Appendix A)
     and produce a cleaned DataFrame with the following columns:
@@ -24,12 +33,17 @@ def pdf_to_df(pdf_path: str) -> pd.DataFrame:
     - public_flag (set to 1 if the company appears to be publicly traded)
     
     Notes:
-    - This example uses Camelot (with the “stream” flavor) to extract tables.
+    - This example reads "stream" tables with a table backend (``backend``,
+      see ``table_backends``; Camelot by default).
     - Adjust the page range (pages="45-50") as needed to target the pages containing Appendix A.
     - The heuristic for “public_flag” is basic and may need adjustment.
     """
+    import pandas as pd
+
+    from .table_backends import read_tables
+
     # Extract all tables from a specific range of pages (adjust pages as necessary)
-    tables = camelot.read_pdf(pdf_path, pages="45-50", flavor="stream")
+    tables = read_tables(pdf_path, "45-50", "stream", backend)
     year = extract_year_from_filename(pdf_path) 
     # Combine tables from the specified pages into one DataFrame
     if tables:
@@ -82,16 +96,70 @@ def is_public_heuristic(company_name: str) -> int:
     else:
         return -1  # Default assumption is private if uncertain
     
+_CORPORATE_SUFFIXES = re.compile(
+    r'\b(incorporated|inc|corporation|corp|company|co|ltd|limited|llc|llp|lp|plc|the)\b'
+)
+# Trailing ", City, ST" location of CEI employer strings
+_LOCATION = re.compile(r',\s*[^,]+,\s*[a-z]{2}\.?\s*$')
+
+
+def normalize_company_name(name: str) -> str:
+    """
+    Normalize a company name for comparison and deduplication.
+
+    Lowercases, drops a trailing ", City, ST" location, removes punctuation
+    and common corporate suffixes, and collapses whitespace, so that
+    "Kellogg Co." and "Kellogg Co" map to the same key, and
+    "Coca-Cola Co., The, Atlanta, GA" to the CRSP-style "COCA COLA CO"'s key.
+    This is the one normalizer used for extraction, evaluation, matching and
+    name history lookups.
+
+    Args:
+        name: Raw company name
+
+    Returns:
+        Normalized name ("" for missing values).
+    """
+    if not isinstance(name, str):
+        return ""
+    name = _LOCATION.sub('', name.lower())
+    name = name.replace('&', ' and ')
+    name = re.sub(r'[^a-z0-9 ]', ' ', name)
+    name = _CORPORATE_SUFFIXES.sub(' ', name)
+    return re.sub(r'\s+', ' ', name).strip()
+
+
+@lru_cache(maxsize=64)
+def _sha256(path: str, mtime_ns: int, size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_sha256(path: str) -> str:
+    """
+    SHA-256 of a file's bytes, streamed in 1 MiB blocks.
+
+    The digest is cached per file version (absolute path, mtime, size), so
+    the content-keyed caches (table stores, layout profiles, release dates,
+    the build manifest) hash each input at most once per process.
+    """
+    stat = os.stat(path)
+    return _sha256(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
 def extract_year_from_filename(filename: str) -> Optional[int]:
     match = re.search(r'(\d{4})', os.path.basename(filename))
     return int(match.group(1)) if match else None
 
 
-def process_cei_df_list(pdf_file_list: List[str]) -> List[pd.DataFrame]:
+def process_cei_df_list(pdf_file_list: List[str], backend: Optional[str] = None) -> List[pd.DataFrame]:
     cei_df_list = []
     for pdf in pdf_file_list:
         try:
-            df = pdf_to_df(pdf)
+            df = pdf_to_df(pdf, backend)
             year = extract_year_from_filename(pdf)
             df['Year'] = year
             cei_df_list.append(df)
@@ -107,6 +175,8 @@ def load_date_range_rows(
     end_date: str,
     date_col: str = 'date'
 ) -> pd.DataFrame:
+    import pandas as pd
+
     chunksize = 10**5
     filtered_chunks = []
 
@@ -134,6 +204,8 @@ def load_cei_release_dates(csv_path: str) -> pd.DataFrame:
     Returns:
         pd.DataFrame: DataFrame with 'Year' as int and 'Release Date' as datetime.
     """
+    import pandas as pd
+
     df = pd.read_csv(csv_path)
     df['Year'] = df['Year'].astype(int)
     df['Release Date'] = pd.to_datetime(df['Release Date'], format='%Y-%m-%d')
@@ -163,3 +235,34 @@ def get_cei_date_range(
     start_date = release_date - timedelta(days=before_days)
     end_date = release_date + timedelta(days=after_days)
     return start_date, end_date
+
+
+def add_days_from_release(
+    df: pd.DataFrame,
+    release_date: pd.Timestamp,
+    date_col: str = 'date'
+) -> pd.DataFrame:
+    """
+    Add a 'days_from_release' column counting trading days from the release.
+
+    Day 0 is the release date, or the first trading date after it when the
+    release falls on a non-trading day. Trading days are the distinct dates
+    present in ``df``.
+
+    Parameters:
+        df (pd.DataFrame): Rows with a datetime ``date_col``.
+        release_date (pd.Timestamp): CEI release date.
+        date_col (str): Name of the date column.
+
+    Returns:
+        pd.DataFrame: Copy of ``df`` with 'cei_release_date' and 'days_from_release'.
+    """
+    import numpy as np
+    import pandas as pd
+
+    df = df.copy()
+    dates = np.sort(df[date_col].unique())
+    release_idx = np.searchsorted(dates, pd.Timestamp(release_date).to_datetime64())
+    df['cei_release_date'] = pd.Timestamp(release_date)
+    df['days_from_release'] = np.searchsorted(dates, df[date_col].values) - release_idx
+    return df
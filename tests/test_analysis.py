@@ -0,0 +1,128 @@
+"""
+Test cases for score binning and the return aggregation cube.
+"""
+import numpy as np
+import pandas as pd
+
+from pfp.analysis import (
+    ReturnCube,
+    add_score_bins,
+    attach_release_dates,
+    cusip6_codes,
+    cusip6_from_codes,
+    join_cei_to_panel,
+    score_bin_codes,
+    summarize_event_returns,
+)
+
+
+def _panel(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    panel = pd.DataFrame({
+        "year": rng.choice([2018, 2019, 2020], n),
+        "cei_score": rng.choice([0, 15, 55, 90, 99, 100], n),
+        "days_from_release": rng.integers(-5, 6, n),
+        "RET": rng.normal(0.001, 0.02, n),
+    })
+    panel.loc[::17, "RET"] = np.nan
+    panel["excess_return"] = panel["RET"] - 0.0003
+    return panel
+
+
+def test_score_bin_codes_has_100_only_bin():
+    codes = score_bin_codes([0, 9.5, 10, 99, 100, np.nan, 101, -1])
+
+    assert codes.tolist() == [0, 0, 1, 9, 10, -1, -1, -1]
+
+
+def test_cube_summary_matches_groupby():
+    panel = _panel()
+    cube = ReturnCube.build(panel)
+
+    from_cube = cube.summary("RET")
+    expected = summarize_event_returns(add_score_bins(panel).dropna(subset=["RET"]))
+
+    assert len(from_cube) == len(expected)
+    np.testing.assert_allclose(from_cube["avg_return"], expected["avg_return"])
+    np.testing.assert_allclose(from_cube["std_return"], expected["std_return"])
+    np.testing.assert_array_equal(from_cube["count"], expected["count"])
+
+
+def test_cube_bins_fractional_scores_like_add_score_bins():
+    panel = _panel()
+    panel["cei_score"] = panel["cei_score"].replace({15: 9.6, 55: 49.5, 99: 99.7})
+    cube = ReturnCube.build(panel)
+
+    from_cube = cube.summary("RET", edges=[10, 50, 100])
+    expected = summarize_event_returns(
+        add_score_bins(panel).assign(score_bin=lambda d: pd.Categorical.from_codes(
+            score_bin_codes(d["cei_score"], [10, 50, 100]), categories=["0-9", "10-49", "50-99", "100-100"], ordered=True,
+        )).dropna(subset=["RET"])
+    )
+
+    np.testing.assert_array_equal(from_cube["count"], expected["count"])
+    np.testing.assert_allclose(from_cube["avg_return"], expected["avg_return"])
+
+
+def test_cube_rollup_rebin_and_persistence(tmp_path):
+    panel = _panel()
+    cube = ReturnCube.load(ReturnCube.build(panel).save(str(tmp_path / "cube.npz")))
+
+    overall = cube.summary("excess_return", edges=[50, 100], by_year=False, cumulative=True)
+
+    assert "year" not in overall.columns
+    assert set(overall["score_bin"]) == {"0-49", "50-99", "100-100"}
+    low = panel[(panel["cei_score"] < 50) & (panel["days_from_release"] == -5)]["excess_return"]
+    row = overall[(overall["score_bin"] == "0-49") & (overall["days_from_release"] == -5)].iloc[0]
+    assert row["count"] == low.count()
+    assert np.isclose(row["avg_return"], low.mean())
+    assert np.isclose(row["cumulative_return"], row["avg_return"])  # first day of the window
+
+
+def test_cusip6_codes_round_trip():
+    codes = cusip6_codes(["12345610", "00206R102", None, "abc", 594918104.0])
+
+    assert codes[2] == codes[3] == -1
+    assert cusip6_from_codes(codes).tolist() == ["123456", "00206R", None, None, "594918"]
+    assert codes[1] < codes[0]  # codes sort like the strings
+
+
+def test_join_cei_to_panel_matches_string_merge():
+    dates = pd.DataFrame({"Year": [2019, 2018], "Release Date": ["2019-11-20", "2018-11-09"]})
+    cei = pd.DataFrame({
+        "cusip": ["12345610", "12345610", "98765432", None],
+        "year": [2018, 2019, 2019, 2019],
+        "cei_score": [80, 100, 55, 90],
+        "employer": ["Acme", "Acme", "Beta", "Gamma"],
+    })
+    panel = pd.DataFrame({
+        "cusip6": ["123456", "123456", "987654", "555555"],
+        "cei_release_date": pd.to_datetime(["2018-11-09", "2019-11-20", "2017-11-09", "2019-11-20"]),
+        "cei_year": [2018, 2019, 2017, 2019],
+        "RET": [0.01, 0.02, 0.03, 0.04],
+    })
+
+    joined = join_cei_to_panel(panel, cei, columns=("cei_score", "employer"))
+    with_dates = attach_release_dates(cei, dates)
+
+    expected = panel.rename(columns={"cei_year": "year"}).merge(
+        cei.assign(cusip6=cei["cusip"].str[:6]).drop(columns="cusip"), on=["cusip6", "year"]
+    )
+    assert joined["RET"].tolist() == expected["RET"].tolist()
+    assert joined["cei_score"].tolist() == expected["cei_score"].tolist() == [80, 100]
+    assert with_dates["cei_release_date"].tolist()[:2] == list(pd.to_datetime(["2018-11-09", "2019-11-20"]))
+
+
+def test_join_uses_report_year_when_release_falls_in_the_next_year():
+    # The 2018 and 2019 reports were released on 2019-03-28 and 2020-01-21
+    cei = pd.DataFrame({"cusip": ["12345610", "12345610"], "year": [2018, 2019], "cei_score": [40, 100]})
+    panel = pd.DataFrame({
+        "cusip6": ["123456", "123456"],
+        "cei_release_date": pd.to_datetime(["2019-03-28", "2020-01-21"]),
+        "cei_year": [2018, 2019],
+    })
+
+    joined = join_cei_to_panel(panel, cei, columns=("cei_score",))
+
+    assert joined["year"].tolist() == [2018, 2019]
+    assert joined["cei_score"].tolist() == [40, 100]
@@ -0,0 +1,91 @@
+"""
+Test cases for the vectorized long-short backtester.
+"""
+import numpy as np
+import pandas as pd
+
+from pfp.backtest import FirmDayReturns, hml_returns, sweep
+
+DATES = pd.bdate_range("2019-01-01", periods=30)
+
+
+def _panel():
+    rng = np.random.default_rng(0)
+    rows = []
+    for firm in ["AAA111", "BBB222", "CCC333", "DDD444"]:
+        for date in DATES:
+            rows.append((firm, date, rng.normal(0, 0.01), rng.uniform(1, 10)))
+    panel = pd.DataFrame(rows, columns=["cusip6", "date", "RET", "cap"])
+    return panel.drop(index=5)  # one missing firm-day
+
+
+CEI = pd.DataFrame({
+    "cusip": ["AAA11110", "BBB22210", "CCC33310", "DDD44410", "AAA11110", "BBB22210", "CCC33310"],
+    "year": [2019, 2019, 2019, 2019, 2020, 2020, 2020],
+    "cei_score": [100, 90, 20, 0, 100, 15, 100],
+})
+
+
+def _setup():
+    data = FirmDayReturns.from_panel(_panel(), cap_col="cap")
+    scores = data.release_scores(CEI, [2019, 2020])
+    positions = data.release_positions([DATES[5], DATES[18]])
+    return data, scores, positions
+
+
+def test_hml_matches_per_release_loop():
+    data, scores, positions = _setup()
+    panel = _panel()
+
+    daily = hml_returns(data, scores, positions, low=20, high=90, days=(-1, 3))
+
+    long_firms, short_firms = ["AAA111", "BBB222"], ["CCC333", "DDD444"]
+    day = DATES[5 + 2]
+    on_day = panel[panel["date"] == day].set_index("cusip6")["RET"]
+    expected = on_day[long_firms].mean() - on_day[short_firms].mean()
+    assert np.isclose(daily.loc[(0, 2), "hml"], expected)
+    # Release 2020: long AAA and CCC, short BBB
+    day = DATES[18 - 1]
+    on_day = panel[panel["date"] == day].set_index("cusip6")["RET"]
+    assert np.isclose(daily.loc[(1, -1), "short"], on_day["BBB222"])
+
+
+def test_value_weights_use_pre_release_caps():
+    data, scores, positions = _setup()
+    panel = _panel().set_index(["cusip6", "date"])
+
+    daily = hml_returns(data, scores, positions, low=20, high=90, days=(0, 0), weighting="value")
+
+    caps = panel.loc[(["AAA111", "BBB222"], DATES[4]), "cap"].to_numpy()
+    rets = panel.loc[(["AAA111", "BBB222"], DATES[5]), "RET"].to_numpy()
+    assert np.isclose(daily.loc[(0, 0), "long"], (caps * rets).sum() / caps.sum())
+
+
+def test_sweep_matches_single_backtests():
+    data, scores, positions = _setup()
+
+    result = sweep(data, scores, positions, thresholds=[(20, 90), (0, 100)], windows=[(0, 2), (-1, 4)])
+
+    assert len(result) == 4
+    daily = hml_returns(data, scores, positions, low=20, high=90, days=(-1, 4))
+    compounded = (1 + daily["hml"]).groupby(level="release").prod() - 1
+    row = result[(result["low"] == 20) & (result["start"] == -1)].iloc[0]
+    assert np.isclose(row["mean_return"], compounded.mean())
+    assert row["n_releases"] == 2
+    # No firm scores 0 in 2020, so that release has no short leg, and the 2019
+    # long leg (AAA only) has no return on its release day
+    assert result[result["low"] == 0]["n_releases"].tolist() == [0, 0]
+
+
+def test_sweep_skips_releases_with_a_missing_leg_in_the_window():
+    panel = _panel()
+    gap = panel["cusip6"].isin(["CCC333", "DDD444"]) & (panel["date"] == DATES[5 + 1])
+    data = FirmDayReturns.from_panel(panel[~gap])
+    scores = data.release_scores(CEI, [2019, 2020])
+    positions = data.release_positions([DATES[5], DATES[18]])
+
+    result = sweep(data, scores, positions, thresholds=[(20, 90)], windows=[(0, 2), (3, 4)])
+
+    assert result["n_releases"].tolist() == [1, 2]
+    daily = hml_returns(data, scores, positions, low=20, high=90, days=(0, 2))
+    assert np.isclose(result["mean_return"].iloc[0], (1 + daily.loc[1, "hml"]).prod() - 1)
@@ -0,0 +1,99 @@
+"""
+Test cases for the incremental year-partitioned build.
+"""
+import numpy as np
+import pandas as pd
+
+from pfp.analysis import ReturnCube
+from pfp.build import build
+
+
+def _write_cei(processed, year, scores):
+    pd.DataFrame({
+        "Company": [f"Firm {i} Inc." for i in range(len(scores))],
+        "CEI_Score": scores,
+        "Year": year,
+        "cusip": [f"AAA{i:03d}10" for i in range(len(scores))],
+    }).to_csv(processed / "cei" / f"cei_{year}.csv", index=False)
+
+
+def _write_panel(processed, year, ret):
+    release = pd.Timestamp(f"{year}-11-15")
+    pd.DataFrame({
+        "date": [release, release + pd.Timedelta(days=1)] * 2,
+        "CUSIP": ["AAA00010", "AAA00010", "AAA00110", "AAA00110"],
+        "RET": [ret, ret, -ret, -ret],
+        "daily_return": [ret, ret, -ret, -ret],
+        "cei_release_date": release,
+        "days_from_release": [0, 1, 0, 1],
+    }).to_csv(processed / "event_panel" / f"year={year}.csv", index=False)
+
+
+def _setup(tmp_path):
+    processed = tmp_path / "processed"
+    (processed / "cei").mkdir(parents=True)
+    (processed / "event_panel").mkdir()
+    pd.DataFrame({"Year": [2018, 2019, 2020],
+                  "Release Date": ["2018-11-15", "2019-11-15", "2020-11-15"]}).to_csv(processed / "dates.csv", index=False)
+    _write_cei(processed, 2018, [100, 40])
+    _write_cei(processed, 2019, [90, 20])
+    _write_panel(processed, 2018, 0.01)
+    _write_panel(processed, 2019, 0.02)
+    return processed
+
+
+def test_only_changed_years_are_rebuilt(tmp_path):
+    processed = _setup(tmp_path)
+
+    first = build(str(processed))
+    assert first == {"cei": [2018, 2019], "panel": [2018, 2019], "removed": []}
+    assert build(str(processed)) == {"cei": [], "panel": [], "removed": []}
+
+    # A new later year is appended; a re-extracted year rewrites only its partition
+    _write_cei(processed, 2020, [100])
+    assert build(str(processed))["cei"] == [2020]
+    combined = pd.read_csv(processed / "build" / "cei_with_dates.csv")
+    assert combined["year"].tolist() == [2018, 2018, 2019, 2019, 2020]
+    assert combined["release_date"].iloc[-1] == "2020-11-15"
+
+    _write_cei(processed, 2018, [100, 45])
+    _write_panel(processed, 2018, 0.03)
+    assert build(str(processed)) == {"cei": [2018], "panel": [2018], "removed": []}
+    assert pd.read_csv(processed / "build" / "cei_with_dates.csv")["cei_score"].tolist() == [100, 45, 90, 20, 100]
+
+    (processed / "cei" / "cei_2019.csv").unlink()
+    assert build(str(processed))["removed"] == [2019]
+
+
+def test_cube_delta_matches_full_rebuild(tmp_path):
+    processed = _setup(tmp_path)
+    build(str(processed))
+    _write_panel(processed, 2019, 0.05)
+    build(str(processed))
+    incremental = ReturnCube.load(str(processed / "build" / "return_cube.npz"))
+
+    build(str(processed), force=True)
+    full = ReturnCube.load(str(processed / "build" / "return_cube.npz"))
+
+    assert incremental.years.tolist() == [2018, 2019]
+    np.testing.assert_allclose(incremental.stats, full.stats)
+    summary = incremental.summary("RET", by_year=True)
+    top = summary[(summary["year"] == 2019) & (summary["score_bin"] == "90-99")]
+    assert np.allclose(top["avg_return"], 0.05)
+
+
+def test_curated_table_is_kept_and_measures_rebuild_the_cube(tmp_path):
+    processed = _setup(tmp_path)
+    (processed / "cei_with_dates.csv").write_text("curated\n")
+    build(str(processed), measures=("RET",))
+    assert ReturnCube.load(str(processed / "build" / "return_cube.npz")).measures == ["RET"]
+
+    assert build(str(processed), measures=("RET", "daily_return")) == {"cei": [], "panel": [], "removed": []}
+    cube = ReturnCube.load(str(processed / "build" / "return_cube.npz"))
+    assert cube.measures == ["RET", "daily_return"]
+    assert cube.years.tolist() == [2018, 2019]
+
+    output = tmp_path / "combined.csv"
+    build(str(processed), output=str(output))
+    assert pd.read_csv(output)["year"].tolist() == [2018, 2018, 2019, 2019]
+    assert (processed / "cei_with_dates.csv").read_text() == "curated\n"
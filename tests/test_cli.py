@@ -0,0 +1,105 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from pfp.cli import main, read_reference_table
+
+
+def _write_panel(tmp_path):
+    panel = pd.DataFrame({
+        "year": [2019] * 4,
+        "cei_score": [100, 100, 85, 85],
+        "days_from_release": [0, 0, 0, 1],
+        "RET": [0.01, 0.03, -0.02, 0.0],
+    })
+    path = tmp_path / "panel.csv"
+    panel.to_csv(path, index=False)
+    return path
+
+
+def test_index_lists_reports(tmp_path, capsys):
+    pdf_dir = tmp_path / "raw" / "CEI"
+    pdf_dir.mkdir(parents=True)
+    (pdf_dir / "CEI-2019.pdf").write_bytes(b"%PDF-1.4")
+
+    assert main(["--data-dir", str(tmp_path), "index"]) == 0
+
+    out = capsys.readouterr().out
+    assert out.startswith("2019\tmissing\t")
+
+
+def test_analyze_writes_summary(tmp_path):
+    panel = _write_panel(tmp_path)
+    output = tmp_path / "summary.csv"
+
+    assert main(["analyze", "--panel", str(panel), "--output", str(output)]) == 0
+
+    summary = pd.read_csv(output)
+    top = summary[(summary["score_bin"] == "100-100") & (summary["days_from_release"] == 0)]
+    assert top["count"].iloc[0] == 2
+    assert abs(top["avg_return"].iloc[0] - 0.02) < 1e-12
+
+
+def test_serve_once_runs_queued_jobs(tmp_path):
+    panel = _write_panel(tmp_path)
+    queue = tmp_path / "queue"
+    (queue / "incoming").mkdir(parents=True)
+    job = {"argv": ["analyze", "--panel", str(panel), "--output", str(tmp_path / "out.csv")]}
+    (queue / "incoming" / "001.json").write_text(json.dumps(job))
+    (queue / "incoming" / "002.json").write_text(json.dumps({"argv": ["serve"]}))
+
+    assert main(["serve", "--queue-dir", str(queue), "--once", "--no-warm"]) == 0
+
+    assert os.path.exists(tmp_path / "out.csv")
+    assert os.listdir(queue / "incoming") == []
+    assert json.loads((queue / "done" / "001.json.result.json").read_text())["returncode"] == 0
+    assert json.loads((queue / "failed" / "002.json.result.json").read_text())["returncode"] == 1
+
+
+def test_reference_tables_keep_cusip_zeros_and_are_copied(tmp_path):
+    path = tmp_path / "cei_with_dates.csv"
+    path.write_text("employer,cusip\nAdvanced Digital Information Corp.,007525108\n")
+
+    first = read_reference_table(str(path))
+    first.loc[0, "employer"] = "changed"
+
+    again = read_reference_table(str(path))
+    assert again.loc[0, "cusip"] == "007525108"
+    assert again.loc[0, "employer"] == "Advanced Digital Information Corp."
+
+
+def test_dates_leaves_curated_tables_alone(tmp_path):
+    fitz = pytest.importorskip("fitz")
+    pdf_dir = tmp_path / "raw" / "CEI"
+    pdf_dir.mkdir(parents=True)
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "Released January 21, 2020")
+    doc.save(str(pdf_dir / "CEI-2019.pdf"))
+    processed = tmp_path / "processed"
+    processed.mkdir()
+    (processed / "dates.csv").write_text("Year,Release Date\n2019,2019-01-01\n")
+    (processed / "date_comparison.csv").write_text(
+        "Year,Image_Source,Text_Source,Original_CEI_Dates,Consolidated_Dates\n2019,,,2018-11-15,\n"
+    )
+
+    assert main(["--data-dir", str(tmp_path), "dates", "--no-ocr"]) == 0
+
+    assert (processed / "dates.csv").read_text() == "Year,Release Date\n2019,2019-01-01\n"
+    built = pd.read_csv(processed / "build" / "date_comparison.csv", dtype=str)
+    assert built.loc[0, "Original_CEI_Dates"] == "2018-11-15"
+    assert built.loc[0, "Consolidated_Dates"] == "2020-01-21"
+
+
+@pytest.mark.parametrize("extra, message", [
+    ([], "needs --cascade-config"),
+    (["--cascade-config", "cascade.json", "--backend", "words"], "do not apply"),
+    (["--cascade-config", "cascade.json", "--tables-dir", "tables"], "do not apply"),
+])
+def test_cascade_option_combinations_are_rejected(capsys, extra, message):
+    with pytest.raises(SystemExit) as exc:
+        main(["extract", "2019", "--strategy", "cascade", *extra])
+
+    assert exc.value.code == 2
+    assert message in capsys.readouterr().err
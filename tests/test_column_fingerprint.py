@@ -0,0 +1,82 @@
+"""
+Test cases for column fingerprints and candidate pair pruning.
+"""
+import numpy as np
+import pandas as pd
+
+from pfp.column_fingerprint import (
+    DEFAULT_SCORE_HISTOGRAM,
+    ColumnFingerprint,
+    candidate_pairs,
+    expected_histogram,
+    neighbour_histogram,
+)
+from pfp.comprehensive_cei_extractor import _extract_companies_comprehensive
+
+
+def test_fingerprint_flags_page_numbers_and_rubric_totals():
+    page_numbers = ColumnFingerprint([str(p) for p in range(41, 71)])
+    rubric = ColumnFingerprint(["Points"] + ["100"] * 10)
+    scores = ColumnFingerprint(["CEI Score"] + [str(s) for s in [100, 100, 95, 90, 85, 100, 80, 60, 100, 90] * 3])
+
+    assert page_numbers.step_one_share == 1.0 and not page_numbers.is_score_column()
+    assert not rubric.is_score_column(reject_constant=True)
+    assert scores.is_score_column()
+    assert scores.multiple_of_5_share == 1.0
+    assert not scores.is_company_column()
+
+
+def test_distance_rejects_small_point_values():
+    points = ColumnFingerprint([str(p) for p in [5, 10, 15, 0, 5, 10, 0, 5] * 4], DEFAULT_SCORE_HISTOGRAM)
+
+    assert points.distance > 0.8
+    assert not points.is_score_column()
+    expected = expected_histogram([5, 10, 15, 0])
+    assert ColumnFingerprint([str(p) for p in [5, 10, 15, 0] * 6], expected).is_score_column()
+    assert np.isclose(expected.sum(), 1)
+
+
+def test_candidate_pairs_prune_columns_and_tables():
+    table = pd.DataFrame({
+        "company": ["Employer"] + [f"Example Holdings {i} Inc." for i in range(8)],
+        "row": ["#"] + [str(i) for i in range(1, 9)],
+        "score": ["CEI"] + ["100", "90", "85", "100", "60", "95", "100", "80"],
+        "note": [""] * 9,
+    })
+    criteria = pd.DataFrame({"criterion": ["Benefits", "Training", "Policies"], "text": ["a", "b", "c"]})
+
+    assert candidate_pairs(table, max_company_col=4) == [(0, 2)]
+    assert candidate_pairs(criteria, max_company_col=4) == []
+
+
+def test_page_with_every_company_at_100_still_extracts():
+    table = pd.DataFrame({
+        "company": ["Employer"] + [f"Example Holdings {i} Inc." for i in range(7)],
+        "score": ["CEI Score"] + ["100"] * 7,
+    })
+
+    assert candidate_pairs(table, max_company_col=4) == [(0, 1)]
+    assert candidate_pairs(table, max_company_col=4, reject_constant=True) == []
+    assert len(_extract_companies_comprehensive(table, 2019)) == 7
+
+
+def test_early_year_score_columns_are_kept(tmp_path):
+    # Pages of the 2002 ratings list: 7-step scale, sorted by score
+    pages = [[29] * 12 + [43] * 18, [43] * 6 + [57] * 24, [86] * 22 + [100] * 8]
+    tables = [pd.DataFrame({
+        "company": ["Employer"] + [f"Example Holdings {i} Inc." for i in range(len(page))],
+        "score": ["Rating"] + [str(s) for s in page],
+    }) for page in pages]
+    pd.DataFrame({"CEI_Score": [14, 29, 29, 43, 43, 57, 57, 71, 71, 86, 86, 86, 100] * 3}).to_csv(
+        tmp_path / "cei_2003.csv", index=False)
+    expected = neighbour_histogram(str(tmp_path), 2002)
+
+    # The modern prior rejects the low-scoring pages ...
+    assert [ColumnFingerprint(page, DEFAULT_SCORE_HISTOGRAM).is_score_column() for page in pages] == [
+        False, False, True]
+    # ... the adjacent year's histogram, or none at all, keeps them
+    assert neighbour_histogram(str(tmp_path), 2010) is None
+    for table in tables:
+        assert candidate_pairs(table, max_company_col=4, expected=expected) == [(0, 1)]
+        assert candidate_pairs(table, max_company_col=4) == [(0, 1)]
+    assert sum(len(_extract_companies_comprehensive(t, 2002, expected)) for t in tables) == 90
@@ -0,0 +1,58 @@
+"""
+Test cases for compact dtypes.
+"""
+import numpy as np
+import pandas as pd
+
+from pfp.compact import compact_frame, memory_report, read_compact_csv
+
+
+def _panel(n_firms=50, n_days=40):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "cusip6": np.repeat([f"{i:06d}" for i in range(n_firms)], n_days),
+        "employer": np.repeat([f"Company {i} Inc." for i in range(n_firms)], n_days),
+        "cei_score": np.repeat(rng.integers(0, 101, n_firms).astype(float), n_days),
+        "year": 2019,
+        "days_from_release": np.tile(np.arange(-20, 20), n_firms),
+        "RET": rng.normal(0, 0.02, n_firms * n_days),
+    })
+
+
+def test_compact_frame_dtypes_and_values():
+    panel = _panel()
+
+    compact = compact_frame(panel)
+
+    assert compact["cusip6"].dtype == "category"
+    assert compact["employer"].dtype == "category"
+    assert compact["cei_score"].dtype == np.uint8
+    assert compact["year"].dtype == np.int16
+    assert compact["days_from_release"].dtype == np.int16
+    assert compact["RET"].dtype == np.float32
+    assert (compact["cei_score"] == panel["cei_score"]).all()
+    np.testing.assert_allclose(compact["RET"], panel["RET"], rtol=1e-6)
+    report = memory_report(compact)
+    assert report.loc["total", "mb"] < memory_report(panel).loc["total", "mb"] / 3
+
+
+def test_integer_targets_fall_back_when_lossy():
+    df = pd.DataFrame({"cei_score": [85.0, None, 100.0], "CEI_Score": [12.5, 90.0, 100.0]})
+
+    compact = compact_frame(df)
+
+    assert str(compact["cei_score"].dtype) == "UInt8"
+    assert compact["cei_score"].isna().sum() == 1
+    assert compact["CEI_Score"].dtype == np.float32
+
+
+def test_read_compact_csv_handles_crsp_letter_codes(tmp_path):
+    path = tmp_path / "prices.csv"
+    pd.DataFrame({"CUSIP": ["12345610", "12345610"], "RET": ["0.01", "C"], "PRC": [10.5, -11.25]}).to_csv(path, index=False)
+
+    df = read_compact_csv(str(path), usecols=["CUSIP", "RET"])
+
+    assert list(df.columns) == ["CUSIP", "RET"]
+    assert df["CUSIP"].dtype == "category"
+    assert df["RET"].dtype == np.float32
+    assert df["RET"].isna().tolist() == [False, True]
@@ -0,0 +1,71 @@
+"""
+Test cases for the extraction strategy evaluation harness.
+"""
+import pandas as pd
+
+from pfp import evaluation
+from pfp.synthetic import write_labelled_corpus
+from pfp.utils import normalize_company_name
+
+
+def _labels():
+    return pd.DataFrame({"Company": ["Kellogg Co.", "Acme Corp.", "Delta Foods Inc."], "CEI_Score": [100, 85, 40]})
+
+
+def test_normalizer_drops_location_but_keeps_inner_commas():
+    assert normalize_company_name("Archer Daniels Midland Co., Chicago, IL") == "archer daniels midland"
+    assert normalize_company_name("Coca-Cola Co., The, Atlanta, GA") == normalize_company_name("COCA COLA CO")
+    assert normalize_company_name("Mondelez International Inc., East Hanover, nj") == "mondelez international"
+    assert normalize_company_name("Morgan, Lewis & Bockius LLP") == "morgan lewis and bockius"
+    assert normalize_company_name(None) == ""
+
+
+def test_score_extraction_matches_normalized_pairs():
+    result = pd.DataFrame({
+        "Company": ["Kellogg Co", "ACME Corporation", "Delta Foods Inc.", "Page 42"],
+        "CEI_Score": [100.0, 85.0, 45.0, 42.0],
+    })
+
+    scores = evaluation.score_extraction(result, _labels())
+
+    assert scores["precision"] == 0.5
+    assert round(scores["recall"], 3) == 0.667
+
+
+def test_pareto_and_cascade_pick_fastest_accurate_strategy():
+    results = pd.DataFrame({
+        "year": [2019] * 4,
+        "strategy": ["fast_junk", "fast_good", "slow_better", "slow_worse"],
+        "precision": [0.3, 0.95, 0.99, 0.9],
+        "recall": [0.9, 0.85, 0.95, 0.8],
+        "f1": [0.45, 0.9, 0.97, 0.85],
+        "wall_s": [1.0, 2.0, 10.0, 20.0],
+    })
+
+    pareto = evaluation.pareto_table(results)
+    config = evaluation.cascade_config(pareto, min_precision=0.9, min_recall=0.8)
+
+    assert pareto.set_index("strategy")["pareto"].to_dict() == {
+        "fast_junk": True, "fast_good": True, "slow_better": True, "slow_worse": False,
+    }
+    # fast_junk is on the frontier but faster only by failing the bar
+    assert config == {2019: ["fast_good", "slow_better"]}
+
+
+def test_evaluate_strategies_on_labelled_corpus(tmp_path, monkeypatch):
+    write_labelled_corpus(str(tmp_path), [2018, 2019], n_pages=1, rows_per_column=5)
+    corpus = evaluation.load_corpus(str(tmp_path))
+
+    def perfect(pdf_path, year):
+        return dict((y, labels) for y, _, labels in corpus)[year]
+
+    monkeypatch.setitem(evaluation.STRATEGIES, "stub.perfect", perfect)
+    monkeypatch.setitem(evaluation.STRATEGIES, "stub.empty", lambda pdf_path, year: pd.DataFrame())
+
+    results = evaluation.evaluate_strategies(corpus, ["stub.perfect", "stub.empty"])
+    config = evaluation.cascade_config(evaluation.pareto_table(results))
+
+    assert [year for year, _, _ in corpus] == [2018, 2019]
+    assert results.set_index(["year", "strategy"])["f1"].to_dict()[(2019, "stub.perfect")] == 1.0
+    assert config == {2018: ["stub.perfect"], 2019: ["stub.perfect"]}
+    assert len(evaluation.run_cascade(corpus[0][1], 2018, config, min_rows=1)) == 5
@@ -0,0 +1,71 @@
+"""
+Test cases for batched factor regressions.
+"""
+import numpy as np
+import pandas as pd
+
+from pfp.factors import batched_ols, calendar_time_returns, factor_alphas, load_factors
+
+
+def _newey_west_se(y, X, lags):
+    """Reference Newey-West standard errors for one series."""
+    coef = np.linalg.lstsq(X, y, rcond=None)[0]
+    u = X * (y - X @ coef)[:, None]
+    S = u.T @ u
+    for lag in range(1, lags + 1):
+        G = u[lag:].T @ u[:-lag]
+        S += (1 - lag / (lags + 1)) * (G + G.T)
+    xtx_inv = np.linalg.inv(X.T @ X)
+    n, k = X.shape
+    return np.sqrt(np.diag(xtx_inv @ S @ xtx_inv) * n / (n - k))
+
+
+def test_batched_ols_matches_per_series_fits():
+    rng = np.random.default_rng(1)
+    T = 250
+    X = np.column_stack([np.ones(T), rng.normal(size=(T, 2))])
+    Y = X @ rng.normal(size=(3, 5)) + rng.normal(scale=0.5, size=(T, 5))
+    Y[:10, 2] = np.nan  # a second missing-data pattern
+
+    fit = batched_ols(Y, X, lags=4)
+
+    for n in range(5):
+        rows = np.isfinite(Y[:, n])
+        coef = np.linalg.lstsq(X[rows], Y[rows, n], rcond=None)[0]
+        assert np.allclose(fit["coef"][:, n], coef)
+        assert np.allclose(fit["se_nw"][:, n], _newey_west_se(Y[rows, n], X[rows], 4))
+    assert fit["n_obs"].tolist() == [250, 250, 240, 250, 250]
+
+
+def test_factor_alphas_recovers_alpha(tmp_path):
+    rng = np.random.default_rng(2)
+    dates = pd.bdate_range("2019-01-01", periods=500)
+    factors = pd.DataFrame(rng.normal(0, 1, size=(500, 3)), columns=["Mkt-RF", "SMB", "HML"])
+    factors["RF"] = 0.01
+    factors.insert(0, "date", dates.strftime("%Y%m%d"))
+    factors.to_csv(tmp_path / "ff3.csv", index=False)
+    loaded = load_factors(str(tmp_path / "ff3.csv"))
+
+    portfolios = pd.DataFrame({
+        "p1": 0.001 + 1.2 * loaded["Mkt-RF"] + rng.normal(0, 1e-4, 500),
+        "p2": -0.002 + 0.5 * loaded["SMB"] + rng.normal(0, 1e-4, 500),
+    }, index=loaded.index)
+
+    result = factor_alphas(portfolios, loaded, model="ff3")
+
+    assert np.allclose(result["alpha"], [0.001, -0.002], atol=1e-5)
+    assert np.allclose(result["beta_Mkt-RF"], [1.2, 0.0], atol=1e-3)
+    assert (result["t_stat_nw"].abs() > 10).all()
+
+
+def test_calendar_time_returns():
+    daily = pd.DataFrame(
+        {"hml": [0.1, 0.2, 0.3, 0.4]},
+        index=pd.MultiIndex.from_product([[0, 1], [0, 1]], names=["release", "days_from_release"]),
+    )
+    dates = pd.bdate_range("2019-01-01", periods=5)
+
+    out = calendar_time_returns(daily, dates, positions=[1, 2])
+
+    assert out["hml"].tolist() == [0.1, 0.25, 0.4]
+    assert out.index[0] == dates[1]
@@ -0,0 +1,64 @@
+"""
+Test cases for page image clean-up before OCR.
+"""
+import cv2
+import numpy as np
+from PIL import Image
+
+from pfp import ocr_cei_extractor
+from pfp.image_preprocess import binarize, despeckle, estimate_skew, preprocess_page, remove_rules
+
+
+def _page(skew=0.0, seed=0):
+    """White page with rows of glyph-sized blocks, a table rule and speckles."""
+    page = np.full((600, 800), 235, dtype=np.uint8)
+    for y in range(60, 560, 30):
+        for x in range(50, 750, 14):
+            page[y:y + 8, x:x + 9] = 20
+    page[300:303, 20:780] = 20
+    rng = np.random.default_rng(seed)
+    ys, xs = rng.integers(5, 595, 200), rng.integers(5, 795, 200)
+    page[ys, xs] = 0
+    matrix = cv2.getRotationMatrix2D((400, 300), skew, 1.0)
+    return cv2.warpAffine(page, matrix, (800, 600), borderValue=235)
+
+
+def test_skew_is_estimated_from_projection_profile():
+    assert abs(estimate_skew(binarize(_page(skew=1.5))) + 1.5) <= 0.1
+    assert abs(estimate_skew(binarize(_page(skew=-2.0))) - 2.0) <= 0.1
+    assert estimate_skew(binarize(_page())) == 0
+
+
+def test_rules_and_speckles_are_removed():
+    ink = binarize(_page())
+    cleaned = despeckle(remove_rules(ink))
+
+    assert ink[301, 30] and not cleaned[301, 30]  # rule outside the text blocks
+    assert cleaned[63, 53]  # glyph kept
+    n_before = cv2.connectedComponents(ink)[0]
+    n_after = cv2.connectedComponents(cleaned)[0]
+    assert n_after < n_before - 100
+
+
+def test_preprocess_page_returns_level_bilevel_image():
+    rgb = Image.fromarray(_page(skew=2.0)).convert("RGB")
+
+    image, angle = preprocess_page(rgb)
+
+    assert image.mode == "1" and image.size == rgb.size
+    assert abs(angle + 2.0) <= 0.1
+    # Text rows are level again: rows between text lines are blank
+    pixels = np.asarray(image.convert("L"))
+    assert (pixels[192:206, 100:700] == 255).all()
+    gray, _ = preprocess_page(rgb, mode="L")
+    assert gray.mode == "L" and set(np.unique(np.asarray(gray))) <= {0, 255}
+
+
+def test_ocr_page_preprocesses_before_tesseract(monkeypatch):
+    seen = []
+    monkeypatch.setattr(ocr_cei_extractor, "_image_to_string",
+                        lambda image, config="": seen.append(image.mode) or "Acme Corp 100")
+
+    assert ocr_cei_extractor._ocr_page(Image.fromarray(_page()), 1, 2019, preprocess=True) == "Acme Corp 100"
+    ocr_cei_extractor._ocr_page(Image.fromarray(_page()), 1, 2019)
+    assert seen == ["1", "L"]
@@ -0,0 +1,44 @@
+"""
+Import-cost checks for the lightweight pfp modules.
+
+Wall-clock import budgets are flaky on shared CI machines, so these tests
+check what an import loads instead of how long it takes.
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import pfp
+
+# Heavy backends that must only load on the code paths that use them.
+HEAVY_MODULES = {"camelot", "cv2", "pandas", "numpy", "pytesseract", "pdf2image", "PIL", "fitz"}
+
+
+def _loaded_modules(statement):
+    """Top-level names of the modules in ``sys.modules`` after running ``statement`` in a fresh interpreter."""
+    env = dict(os.environ)
+    src_dir = os.path.dirname(os.path.dirname(pfp.__file__))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [src_dir, env.get("PYTHONPATH")]))
+    script = f"{statement}\nimport json, sys\nprint(json.dumps(sorted(sys.modules)))"
+    proc = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, env=env, check=True)
+    return {name.split(".")[0] for name in json.loads(proc.stdout.splitlines()[-1])}
+
+
+@pytest.mark.parametrize("module", ["pfp.utils", "pfp.profiling", "pfp.ocr_cei_extractor"])
+def test_lightweight_module_skips_heavy_backends(module):
+    loaded = _loaded_modules(f"import {module}")
+
+    assert not loaded & HEAVY_MODULES
+
+
+def test_ocr_extractor_defers_asyncio():
+    assert "asyncio" not in _loaded_modules("import pfp.ocr_cei_extractor")
+
+
+def test_extractors_do_not_import_camelot():
+    loaded = _loaded_modules("import pfp.comprehensive_cei_extractor, pfp.cei_improved_extractor")
+
+    assert "camelot" not in loaded
@@ -0,0 +1,55 @@
+"""
+Test cases for per-year layout profiles.
+"""
+import hashlib
+import json
+
+from pfp.layout_profiles import format_pages, load_profile, pdf_fingerprint, profile_path, update_profile
+
+
+def _write_pdf(path, n_pages):
+    pages = b"".join(b"%d 0 obj << /Type /Page >> endobj\n" % i for i in range(n_pages))
+    path.write_bytes(b"%PDF-1.4\n1 0 obj << /Type /Pages >> endobj\n" + pages)
+    return str(path)
+
+
+def test_fingerprint_counts_page_objects(tmp_path):
+    fingerprint = pdf_fingerprint(_write_pdf(tmp_path / "CEI-2019.pdf", 3))
+
+    assert fingerprint["page_count"] == 3
+    assert len(fingerprint["sha256"]) == 64
+
+
+def test_fingerprint_shares_the_cached_file_hash(tmp_path, monkeypatch):
+    import pfp.utils
+
+    pdf_path = _write_pdf(tmp_path / "CEI-2019.pdf", 3)
+    expected = hashlib.sha256((tmp_path / "CEI-2019.pdf").read_bytes()).hexdigest()
+    assert pfp.utils.file_sha256(pdf_path) == expected
+
+    # A second hash of the same file version is served from the cache
+    monkeypatch.setattr(pfp.utils, "open", lambda *a, **k: 1 / 0, raising=False)
+    assert pdf_fingerprint(pdf_path)["sha256"] == expected
+
+
+def test_format_pages_collapses_ranges():
+    assert format_pages([43, 41, 42, 3, 41]) == "3,41-43"
+
+
+def test_profile_round_trip_and_fingerprint_mismatch(tmp_path):
+    pdf_path = _write_pdf(tmp_path / "CEI-2019.pdf", 3)
+    profiles = str(tmp_path / "profiles")
+
+    update_profile(profiles, pdf_path, 2019, "ocr", {"first_page": 2, "last_page": 3, "parsers": ["clean"]})
+    update_profile(profiles, pdf_path, 2019, "camelot", {"flavor": "stream", "pages": "2-3"})
+
+    profile = load_profile(profiles, pdf_path, 2019)
+    assert profile["ocr"]["parsers"] == ["clean"]
+    assert profile["camelot"]["flavor"] == "stream"
+
+    _write_pdf(tmp_path / "CEI-2019.pdf", 4)  # report replaced
+    assert load_profile(profiles, pdf_path, 2019) is None
+
+    update_profile(profiles, pdf_path, 2019, "ocr", {"first_page": 1, "last_page": 4, "parsers": ["clean"]})
+    with open(profile_path(profiles, 2019)) as f:
+        assert "camelot" not in json.load(f)
@@ -0,0 +1,59 @@
+"""
+Test cases for fuzzy matching of CEI employers to public companies.
+"""
+import pandas as pd
+
+from pfp.matching import (
+    blocking_keys,
+    match_cei_to_public,
+    match_cei_to_public_parallel,
+    match_names_blocked,
+    soundex,
+)
+
+PUBLIC = pd.DataFrame({"COMNAM": [
+    "KELLOGG CO", "ACME CORP", "ACME BRANDS INC", "BETA HOLDINGS", "Robert Half International Inc",
+    "Zeta Systems LLC", "Alpha Beta Gamma Inc",
+]})
+CEI = pd.DataFrame({"employer": [
+    "Kellogg Co.", "Kelogg Co", "Acme Corporation", "Rupert Half International", "Unknown Firm", "Kellogg Co.",
+]})
+
+
+def test_soundex_and_blocking_keys():
+    assert soundex("Robert") == soundex("Rupert") == "R163"
+    assert soundex("Tymczak") == "T522"
+    assert blocking_keys("kellogg company") == ["t:kellogg", "s:K420"]
+    assert blocking_keys("") == []
+
+
+def test_blocked_matching_agrees_with_full_scan():
+    full = match_cei_to_public(CEI, PUBLIC, threshold=85, employer_col="employer", company_col="COMNAM")
+    blocked = match_cei_to_public_parallel(CEI, PUBLIC, threshold=85, employer_col="employer",
+                                           company_col="COMNAM", workers=1)
+
+    assert blocked["Matched_Public_Company"].tolist() == full["Matched_Public_Company"].tolist()
+    assert blocked["Matched_Public_Company"].tolist()[:3] == ["KELLOGG CO", "KELLOGG CO", "ACME CORP"]
+
+
+def test_process_pool_returns_top_k():
+    queries = ["acme", "kellogg", "alpha beta"] * 20
+    names = ["acme", "acme brands", "acme corp east", "kellogg", "alpha beta gamma"]
+
+    serial = match_names_blocked(queries, names, threshold=50, top_k=2, workers=1)
+    pooled = match_names_blocked(queries, names, threshold=50, top_k=2, workers=2)
+
+    pd.testing.assert_frame_equal(serial, pooled)
+    assert serial[serial["query"] == "acme"]["name"].tolist()[0] == "acme"
+    assert serial.groupby("query").size().max() == 2
+
+
+def test_rebuilt_index_is_not_served_from_a_stale_mapping(tmp_path):
+    index_dir = str(tmp_path / "index")
+    queries = ["acme", "kellogg"]
+
+    first = match_names_blocked(queries, ["acme corp"], threshold=50, workers=1, index_dir=index_dir)
+    second = match_names_blocked(queries, ["zeta", "kellogg co", "acme"], threshold=50, workers=1, index_dir=index_dir)
+
+    assert first["name"].tolist() == ["acme corp"]
+    assert second["name"].tolist() == ["acme", "kellogg co"]
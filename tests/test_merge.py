@@ -0,0 +1,35 @@
+"""
+Test cases for merging extracted rows on normalized company names.
+"""
+import pandas as pd
+
+from pfp.merge import RowMerger
+
+
+def test_variants_collapse_to_first_seen_row():
+    merger = RowMerger()
+    merger.add_rows([("Kellogg Co.", 100), ("Acme Corp", 85)])
+    merger.add_rows([("Kellogg Co", 100), ("ACME Corporation", 85)])
+
+    df = merger.to_frame(year=2019)
+
+    assert df["Company"].tolist() == ["Kellogg Co.", "Acme Corp"]
+    assert df["Year"].tolist() == [2019, 2019]
+    assert merger.conflicts == 0
+
+
+def test_higher_confidence_wins_conflicts():
+    merger = RowMerger()
+    merger.add_frame(pd.DataFrame({"Company": ["Kellogg Co", "Acme Inc"], "CEI_Score": [10.0, 85.0]}), confidence=1)
+    merger.add_frame(pd.DataFrame({"Company": ["Kellogg Co.", "Acme, Inc."], "CEI_Score": [100.0, 80.0]}), confidence=5)
+    merger.add("Kellogg Company", 0.0, confidence=2)
+
+    df = merger.to_frame()
+
+    assert dict(zip(df["Company"], df["CEI_Score"])) == {"Kellogg Co.": 100.0, "Acme, Inc.": 80.0}
+    assert merger.conflicts == 3
+    assert "KELLOGG CO" in merger
+
+
+def test_empty_merger_gives_empty_frame():
+    assert RowMerger().to_frame().empty
@@ -0,0 +1,76 @@
+"""
+Test cases for the point-in-time name-history index.
+"""
+import pandas as pd
+
+from pfp.name_history import NameHistory, resolve_cusips
+
+STOCKNAMES = pd.DataFrame({
+    "COMNAM": ["KRAFT FOODS INC", "KRAFT HEINZ CO", "PHILIP MORRIS COS INC", "ALTRIA GROUP INC", "KRAFT FOODS INC"],
+    "NCUSIP": ["50075N10", "50076Q10", "71815410", "02209S10", "50075N20"],
+    "NAMEDT": ["2001-06-13", "2015-07-06", "1985-01-01", "2003-01-27", "2012-10-01"],
+    "NAMEENDT": ["2012-09-30", None, "2003-01-26", None, "2015-07-05"],
+})
+
+
+def test_lookup_respects_intervals():
+    history = NameHistory.from_frame(STOCKNAMES)
+
+    cusips = history.lookup(
+        ["Kraft Foods Inc.", "Kraft Foods Inc.", "Kraft Foods Inc.", "Philip Morris Cos", "Altria Group",
+         "Philip Morris Cos", "Nobody Corp", "Kraft Heinz Co"],
+        ["2010-09-01", "2013-09-01", "2016-09-01", "2002-09-01", "2002-09-01",
+         "2010-09-01", "2010-09-01", None],
+    )
+
+    assert list(cusips) == ["50075N10", "50075N20", None, "71815410", None, None, None, None]
+
+
+def test_resolve_cusips_falls_back_to_static_cusip():
+    cei = pd.DataFrame({
+        "employer": ["Kraft Foods", "Altria Group", "Unlisted Co"],
+        "cei_release_date": pd.to_datetime(["2014-11-01", "2014-11-01", "2014-11-01"]),
+        "static_cusip": ["X", "Y", "Z"],
+    })
+
+    out = resolve_cusips(cei, NameHistory.from_frame(STOCKNAMES), fallback="static_cusip")
+
+    assert out["cusip"].tolist() == ["50075N20", "02209S10", "Z"]
+
+
+def test_lookup_keeps_pre_1970_intervals_and_strips_locations():
+    stocknames = pd.DataFrame({
+        "COMNAM": ["ARCHER DANIELS MIDLAND CO", "ACME CORP"],
+        "NCUSIP": ["03948310", "00000010"],
+        "NAMEDT": ["1925-12-31", "1968-01-01"],
+        "NAMEENDT": [None, "1969-12-31"],
+    })
+    history = NameHistory.from_frame(stocknames)
+
+    cusips = history.lookup(
+        ["Archer Daniels Midland Co., Chicago, IL", "Archer Daniels Midland Co., Chicago, IL", "Acme Corp", "Acme Corp"],
+        ["2019-11-20", "1925-12-30", "1969-06-01", "1970-01-02"],
+    )
+
+    assert list(cusips) == ["03948310", None, "00000010", None]
+
+
+def test_lookup_on_empty_history_finds_nothing():
+    history = NameHistory.from_frame(STOCKNAMES.iloc[:0])
+
+    assert len(history) == 0
+    assert list(history.lookup(["Kraft Foods Inc."], ["2010-09-01"])) == [None]
+
+
+def test_lookup_finds_an_earlier_interval_covering_the_date():
+    stocknames = pd.DataFrame({
+        "COMNAM": ["ACME CORP", "ACME CORP", "ACME CORP"],
+        "NCUSIP": ["00000A10", "00000B10", "00000C10"],
+        "NAMEDT": ["1990-01-01", "2000-01-01", "2003-01-01"],
+        "NAMEENDT": ["2020-12-31", "2005-12-31", "2004-06-30"],
+    })
+    history = NameHistory.from_frame(stocknames)
+
+    cusips = history.lookup(["Acme Corp"] * 5, ["1995-06-01", "2003-06-01", "2005-06-01", "2010-06-01", "2021-06-01"])
+
+    assert list(cusips) == ["00000A10", "00000C10", "00000B10", "00000A10", None]
@@ -0,0 +1,156 @@
+"""
+Test cases for the staged OCR pipeline, with stub rasterizer and OCR backends.
+"""
+import asyncio
+import multiprocessing
+
+import pytest
+
+from pfp import ocr_cei_extractor, synthetic
+from pfp.ocr_cei_extractor import _filter_companies, _parse_cei_lines, iter_ocr_rows, ocr_extract_cei_data
+from pfp.utils import normalize_company_name
+
+ROWS_PER_PAGE = 20
+N_PAGES = 15
+
+
+def _stub_backend(monkeypatch):
+    text, _ = synthetic.make_ocr_text(N_PAGES * ROWS_PER_PAGE, seed=3)
+    lines = text.split("\n")
+    page_text = ["\n".join(lines[i:i + ROWS_PER_PAGE]) for i in range(0, len(lines), ROWS_PER_PAGE)]
+    rasterized = []
+
+    def convert_from_path(pdf_path, first_page=1, last_page=None, dpi=200, **kwargs):
+        rasterized.append(first_page)
+        return [p - 1 for p in range(first_page, last_page + 1) if p <= N_PAGES]
+
+    def image_to_string(page, config=""):
+        return page_text[page]
+
+    monkeypatch.setattr(ocr_cei_extractor, "_convert_from_path", convert_from_path)
+    monkeypatch.setattr(ocr_cei_extractor, "_image_to_string", image_to_string)
+    return page_text, rasterized
+
+
+def test_pipeline_matches_sequential_parse(monkeypatch):
+    page_text, _ = _stub_backend(monkeypatch)
+
+    df = ocr_extract_cei_data("CEI-2019.pdf", 2019, first_page=1, last_page=40, ocr_workers=3)
+
+    seen = set()
+    expected = [
+        row[:2] for text in page_text[:N_PAGES]
+        for row in _filter_companies(_parse_cei_lines(text.split("\n"), 2019), seen)
+    ]
+    expected_keys = {normalize_company_name(company) for company, _ in expected}
+    assert len(df) == len(expected_keys) > 0
+    assert set(df["Company"].map(normalize_company_name)) == expected_keys
+    assert (df["Year"] == 2019).all()
+
+
+def test_rows_stream_before_rasterization_finishes(monkeypatch):
+    _, rasterized = _stub_backend(monkeypatch)
+
+    async def first_row():
+        rows = iter_ocr_rows("CEI-2019.pdf", 2019, first_page=1, last_page=40, ocr_workers=1, queue_size=1)
+        row = await rows.__anext__()
+        pages_done = len(rasterized)
+        await rows.aclose()
+        return row, pages_done
+
+    (company, score, page, parser), pages_done = asyncio.run(first_row())
+
+    assert page == 1
+    assert pages_done < N_PAGES
+
+
+def test_ocr_layout_profile_is_learned_and_reused(monkeypatch, tmp_path):
+    _, rasterized = _stub_backend(monkeypatch)
+    pdf_path = tmp_path / "CEI-2019.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4 stub")
+
+    first = ocr_extract_cei_data(str(pdf_path), 2019, profiles_dir=str(tmp_path), first_page=1, last_page=40)
+    rasterized.clear()
+    second = ocr_extract_cei_data(str(pdf_path), 2019, profiles_dir=str(tmp_path))
+
+    assert rasterized[0] == 1
+    assert max(rasterized) <= N_PAGES
+    assert second["Company"].tolist() == first["Company"].tolist()
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="stub backends reach workers by fork")
+def test_process_mode_hands_pages_through_shared_buffers(monkeypatch):
+    from PIL import Image
+
+    page_text, _ = _stub_backend(monkeypatch)
+
+    def convert_from_path(pdf_path, first_page=1, last_page=None, dpi=200, **kwargs):
+        # The page index travels as the pixel value, so text can only be
+        # recovered if the OCR worker sees the rasterizer's pixels
+        return [Image.new("RGB", (120, 80), (p - 1, 0, 0)) for p in range(first_page, last_page + 1) if p <= N_PAGES]
+
+    def image_to_string(image, config=""):
+        return page_text[image.getpixel((60, 40))[0]]
+
+    monkeypatch.setattr(ocr_cei_extractor, "_convert_from_path", convert_from_path)
+    monkeypatch.setattr(ocr_cei_extractor, "_image_to_string", image_to_string)
+
+    threaded = ocr_extract_cei_data("CEI-2019.pdf", 2019, first_page=1, last_page=40, ocr_workers=2)
+    pooled = ocr_extract_cei_data("CEI-2019.pdf", 2019, first_page=1, last_page=40, ocr_workers=2,
+                                  processes=True, queue_size=2)
+
+    assert len(pooled) > 0
+    assert pooled["Company"].tolist() == threaded["Company"].tolist()
+
+
+def test_company_and_score_split_across_pages_are_joined(monkeypatch):
+    pages = ["Acme Widgets Corporation 90\nGlobex Industries Corporation", "95\nInitech Systems Corporation 80"]
+
+    def convert_from_path(pdf_path, first_page=1, last_page=None, dpi=200, **kwargs):
+        return [p - 1 for p in range(first_page, last_page + 1) if p <= len(pages)]
+
+    monkeypatch.setattr(ocr_cei_extractor, "_convert_from_path", convert_from_path)
+    monkeypatch.setattr(ocr_cei_extractor, "_image_to_string", lambda page, config="": pages[page])
+
+    df = ocr_extract_cei_data("CEI-2012.pdf", 2012, first_page=1, last_page=2, ocr_workers=2)
+
+    assert dict(zip(df["Company"], df["CEI_Score"]))["Globex Industries Corporation"] == 95
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="stub backends reach workers by fork")
+def test_page_larger_than_its_buffer_is_passed_by_value(monkeypatch):
+    from PIL import Image
+
+    from pfp import page_buffers
+
+    page_text, _ = _stub_backend(monkeypatch)
+
+    def convert_from_path(pdf_path, first_page=1, last_page=None, dpi=200, **kwargs):
+        size = (240, 160) if first_page == 3 else (120, 80)  # page 3 does not fit a buffer
+        return [Image.new("RGB", size, (p - 1, 0, 0)) for p in range(first_page, last_page + 1) if p <= N_PAGES]
+
+    def image_to_string(image, config=""):
+        return page_text[image.getpixel((60, 40))[0]]
+
+    monkeypatch.setattr(ocr_cei_extractor, "_convert_from_path", convert_from_path)
+    monkeypatch.setattr(ocr_cei_extractor, "_image_to_string", image_to_string)
+    monkeypatch.setattr(page_buffers, "DEFAULT_BUFFER_BYTES", 120 * 80 * 3)
+
+    threaded = ocr_extract_cei_data("CEI-2019.pdf", 2019, first_page=1, last_page=40, ocr_workers=2)
+    pooled = ocr_extract_cei_data("CEI-2019.pdf", 2019, first_page=1, last_page=40, ocr_workers=2,
+                                  processes=True, queue_size=2)
+
+    assert pooled["Company"].tolist() == threaded["Company"].tolist()
+
+
+def test_process_mode_falls_back_to_threads_without_shared_memory(monkeypatch, caplog):
+    from pfp import page_buffers
+
+    _stub_backend(monkeypatch)
+    monkeypatch.setattr(page_buffers, "shared_memory_available", lambda path="/dev/shm": 0)
+
+    with caplog.at_level("WARNING"):
+        pooled = ocr_extract_cei_data("CEI-2019.pdf", 2019, first_page=1, last_page=40, processes=True)
+
+    assert len(pooled) > 0
+    assert "running OCR in threads" in caplog.text
@@ -0,0 +1,50 @@
+"""
+Test cases for shared-memory page buffers.
+"""
+import asyncio
+import pickle
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from pfp.page_buffers import PageBufferPool, read_image, release_attached, view_pixels, write_image
+
+
+def test_write_and_view_share_memory():
+    with PageBufferPool(2, buffer_bytes=64 * 48 * 3) as pool:
+        name = pool.names[0]
+        image = Image.new("RGB", (64, 48), (10, 20, 30))
+        handle = pickle.loads(pickle.dumps(write_image(name, image)))
+
+        pixels = view_pixels(handle)
+        assert pixels.shape == (48, 64, 3)
+        assert pixels[0, 0].tolist() == [10, 20, 30]
+        pixels[0, 0] = [1, 2, 3]  # a view: visible through a second read
+        assert read_image(handle, copy=True).getpixel((0, 0)) == (1, 2, 3)
+        del pixels
+        release_attached()
+
+
+def test_free_list_recycles_buffers():
+    async def cycle():
+        pool = PageBufferPool(2, buffer_bytes=16)
+        try:
+            first, second = await pool.acquire(), await pool.acquire()
+            waiter = asyncio.ensure_future(pool.acquire())
+            await asyncio.sleep(0)
+            assert not waiter.done()
+            pool.release(first)
+            return first, second, await waiter
+        finally:
+            pool.close()
+
+    first, second, third = asyncio.run(cycle())
+    assert first != second and third == first
+
+
+def test_oversized_page_is_rejected():
+    with PageBufferPool(1, buffer_bytes=100) as pool:
+        with pytest.raises(ValueError, match="exceeds"):
+            write_image(pool.names[0], Image.fromarray(np.zeros((20, 20), dtype=np.uint8)))
+        release_attached()
@@ -0,0 +1,124 @@
+"""
+Test cases for per-page camelot flavor classification.
+"""
+import pandas as pd
+import pytest
+
+from pfp import comprehensive_cei_extractor, synthetic
+from pfp.page_flavor import classify_pages, expand_pages, flavor_pages
+from pfp.table_backends import GridTable
+
+fitz = pytest.importorskip("fitz")
+
+
+def _mixed_report(tmp_path):
+    """Prose page, 2 ruled pages, 2 unruled pages, 1 scanned page."""
+    parts = [
+        dict(n_pages=2, ruled=True, front_pages=1),
+        dict(n_pages=2, columns=2),
+        dict(n_pages=1, image_only=True),
+    ]
+    doc = fitz.open()
+    for i, kwargs in enumerate(parts):
+        path = str(tmp_path / f"part{i}.pdf")
+        synthetic.write_cei_pdf(path, rows_per_column=20, seed=i, **kwargs)
+        with fitz.open(path) as part:
+            doc.insert_pdf(part)
+    path = str(tmp_path / "CEI-2019.pdf")
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def test_pages_are_classified_by_rules_and_alignment(tmp_path):
+    pdf = _mixed_report(tmp_path)
+
+    assert classify_pages(pdf) == {1: None, 2: "lattice", 3: "lattice", 4: "stream", 5: "stream", 6: None}
+    assert flavor_pages(pdf, "all", "lattice") == "2-3"
+    assert flavor_pages(pdf, "3-100", "stream") == "4-5"
+    assert flavor_pages(str(tmp_path / "missing.pdf"), "30-100", "stream") == "30-100"
+
+
+def test_expand_pages():
+    assert expand_pages("all", 3) == [1, 2, 3]
+    assert expand_pages("2,5-7,9-end", 10) == [2, 5, 6, 7, 9, 10]
+    assert expand_pages("30-100", 40) == list(range(30, 41))
+
+
+def _score_grid(page, flavor):
+    rows = [["Company", "CEI Score"]] + [[f"Example Holdings {page}{i} Inc.", str(60 + i * 5)] for i in range(6)]
+    return GridTable(pd.DataFrame(rows), page, 1, flavor, (0, 0, 100, 100))
+
+
+def test_strategies_run_only_their_flavor(tmp_path, monkeypatch):
+    pdf = _mixed_report(tmp_path)
+    calls = []
+
+    def read_pdf_tables(pdf_path, pages, flavor, tables_dir=None, backend=None):
+        calls.append((pages, flavor))
+        return [_score_grid(p, flavor) for p in expand_pages(pages, 6)]
+
+    monkeypatch.setattr(comprehensive_cei_extractor, "read_pdf_tables", read_pdf_tables)
+
+    comprehensive_cei_extractor._strategy_lattice_all_pages(pdf, 2019)
+    comprehensive_cei_extractor._strategy_stream_all_pages(pdf, 2019)
+    comprehensive_cei_extractor._strategy_lattice_appendix(pdf, 2019)
+
+    assert calls == [("2-3", "lattice"), ("4-5", "stream")]
+
+
+def test_pages_without_rows_are_retried_with_the_other_flavor(tmp_path, monkeypatch):
+    pdf = _mixed_report(tmp_path)
+    calls = []
+
+    def read_pdf_tables(pdf_path, pages, flavor, tables_dir=None, backend=None):
+        calls.append((pages, flavor))
+        # Page 3 is classified lattice, but only stream reads its table
+        return [_score_grid(p, flavor) for p in expand_pages(pages, 6) if p == 2 or flavor == "stream"]
+
+    monkeypatch.setattr(comprehensive_cei_extractor, "read_pdf_tables", read_pdf_tables)
+
+    result = comprehensive_cei_extractor._strategy_lattice_all_pages(pdf, 2019)
+
+    assert calls == [("2-3", "lattice"), ("3", "stream")]
+    assert len(result) == 12
+    assert sorted(t["page"] for t in result.attrs["tables"]) == [2, 3]
+
+    # A profile learned from the result replays each page in its own flavor
+    calls.clear()
+    layout = comprehensive_cei_extractor._camelot_layout("_strategy_lattice_all_pages", result.attrs["tables"])
+    replayed = comprehensive_cei_extractor._strategy_profile(pdf, 2019, layout)
+    assert calls == [("2", "lattice"), ("3", "stream")]
+    assert len(replayed) == 12
+
+
+def test_classification_reads_fewer_lattice_pages(tmp_path, monkeypatch):
+    pdf = _mixed_report(tmp_path)
+    lattice_pages = []
+
+    def read_pdf_tables(pdf_path, pages, flavor, tables_dir=None, backend=None):
+        if flavor == "lattice":
+            lattice_pages.extend(expand_pages(pages, 6))
+        # The ratings list is on the ruled pages; the unruled pages hold no companies
+        return [_score_grid(p, flavor) for p in expand_pages(pages, 6) if p in (2, 3)]
+
+    monkeypatch.setattr(comprehensive_cei_extractor, "read_pdf_tables", read_pdf_tables)
+    strategies = [
+        comprehensive_cei_extractor._strategy_lattice_all_pages,
+        comprehensive_cei_extractor._strategy_stream_all_pages,
+        comprehensive_cei_extractor._strategy_lattice_appendix,
+        comprehensive_cei_extractor._strategy_stream_appendix,
+        comprehensive_cei_extractor._strategy_wide_range_lattice,
+        comprehensive_cei_extractor._strategy_wide_range_stream,
+    ]
+
+    for strategy in strategies:
+        strategy(pdf, 2019)
+    classified, lattice_pages[:] = len(lattice_pages), []
+    monkeypatch.setattr(comprehensive_cei_extractor, "classify_pages", lambda pdf_path: None)
+    for strategy in strategies:
+        strategy(pdf, 2019)
+
+    # Empty stream pages away from the list are not retried as lattice
+    assert classified == 2
+    assert len(lattice_pages) == 6
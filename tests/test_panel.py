@@ -0,0 +1,36 @@
+"""
+Test cases for the out-of-core event panel builder.
+"""
+import pandas as pd
+
+from pfp import synthetic
+from pfp.panel import build_event_panel, load_event_panel
+
+
+def test_streamed_panel_matches_in_memory_build(tmp_path):
+    prices_path = synthetic.make_price_csv(str(tmp_path / "prices.csv"), n_firms=6, n_days=300)
+    # The 2015 report is released in January 2016, like the 2018-2020 reports
+    dates = pd.DataFrame({"Year": [2014, 2015], "Release Date": ["2015-06-15", "2016-01-12"]})
+    universe = ["10000010", "100003"]  # full CUSIP and CUSIP6
+
+    paths = build_event_panel(prices_path, dates, str(tmp_path / "panel"), universe=universe,
+                              before_days=5, after_days=5, chunksize=97)
+    panel = load_event_panel(str(tmp_path / "panel"))
+
+    prices = pd.read_csv(prices_path, dtype={"CUSIP": str}, parse_dates=["date"])
+    prices = prices[prices["CUSIP"].isin(["10000010", "10000310"])].sort_values(["CUSIP", "date"])
+    prices["daily_return"] = prices.groupby("CUSIP")["PRC"].pct_change()
+    window = prices[prices["date"].between("2015-06-10", "2015-06-20")]
+
+    assert [p.rsplit("/", 1)[-1] for p in paths] == ["year=2014.csv", "year=2015.csv"]
+    got = panel[panel["cei_release_date"] == "2015-06-15"].sort_values(["CUSIP", "date"])
+    assert got["CUSIP"].astype(str).tolist() == window["CUSIP"].tolist()
+    pd.testing.assert_series_equal(
+        got["daily_return"].reset_index(drop=True),
+        window["daily_return"].astype("float32").reset_index(drop=True),
+        check_names=False, rtol=1e-5,
+    )
+    assert (got["cei_year"] == 2014).all()
+    assert (panel[panel["cei_release_date"] == "2016-01-12"]["cei_year"] == 2015).all()
+    release_day = got[got["date"] == "2015-06-15"]
+    assert (release_day["days_from_release"] == 0).all()
@@ -0,0 +1,44 @@
+"""
+Test cases for pipeline timing instrumentation.
+"""
+import json
+import os
+
+import pytest
+
+from pfp import profiling
+
+
+@pytest.fixture(autouse=True)
+def _reset_profiling():
+    yield
+    profiling.disable_profiling()
+
+
+def test_span_is_noop_when_disabled():
+    with profiling.span("ocr", page=1):
+        pass
+    profiling.count("ocr_pages")
+
+    assert profiling.span("ocr") is profiling.span("parse")
+    assert profiling.get_trace()["traceEvents"] == []
+
+
+def test_spans_and_counters_written_as_trace_events(tmp_path):
+    profiling.enable_profiling()
+    with profiling.span("strategy", strategy="stream", year=2019):
+        with profiling.span("ocr", year=2019, page=41):
+            pass
+    profiling.count("ocr_pages", 2, year=2019)
+
+    path = profiling.write_trace(str(tmp_path / "trace.json"))
+    with open(path) as f:
+        trace = json.load(f)
+
+    spans = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+    assert [e["name"] for e in spans] == ["ocr", "strategy"]
+    assert spans[0]["args"]["page"] == 41
+    assert "cpu_ms" in spans[0]["args"]
+    assert "rss_delta_mb" in spans[0]["args"] or not os.path.exists("/proc/self/statm")
+    assert spans[1]["dur"] >= spans[0]["dur"]
+    assert trace["otherData"]["counters"] == {"ocr_pages": 2}
@@ -0,0 +1,74 @@
+"""
+Test cases for release-date extraction from report front matter.
+"""
+import datetime
+
+import pandas as pd
+import pytest
+
+from pfp.release_dates import build_release_dates, extract_release_date, find_dates, reconcile
+
+fitz = pytest.importorskip("fitz")
+
+
+def _write_report(path, text, creation_date="D:20191101120000"):
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), text)
+    doc.set_metadata({"creationDate": creation_date})
+    doc.save(path)
+    doc.close()
+
+
+def test_find_dates_prefers_full_plausible_dates():
+    text = "Corporate Equality Index 2020\nNovember 2019\nFounded June 12, 1980. Released Jan. 21, 2020"
+
+    assert find_dates(text, 2019) == [datetime.date(2020, 1, 21), datetime.date(2019, 11, 1)]
+    assert find_dates("Published 03/28/2019", 2018) == [datetime.date(2019, 3, 28)]
+
+
+def test_reconcile_prefers_text_then_image_then_metadata():
+    assert reconcile({"Text_Source": "2019-03-28", "Image_Source": "2018-11-15"}) == "2019-03-28"
+    assert reconcile({"Text_Source": None, "Metadata_Source": "2018-11-01"}) == "2018-11-01"
+
+
+def test_extract_uses_text_layer_and_cache(tmp_path):
+    pdf = str(tmp_path / "CEI-2019.pdf")
+    _write_report(pdf, "Released January 21, 2020")
+    cache = tmp_path / "cache"
+
+    row = extract_release_date(pdf, 2019, cache_dir=str(cache), ocr=False)
+
+    assert row["Text_Source"] == "2020-01-21"
+    assert row["Metadata_Source"] == "2019-11-01"
+    assert row["Consolidated_Dates"] == "2020-01-21"
+    assert len(list(cache.iterdir())) == 1
+    assert extract_release_date(pdf, 2019, cache_dir=str(cache), ocr=False) == row
+
+
+def test_build_release_dates_writes_tables(tmp_path):
+    pdfs = {2018: str(tmp_path / "CEI-2018.pdf"), 2019: str(tmp_path / "CEI-2019.pdf")}
+    _write_report(pdfs[2018], "Corporate Equality Index", creation_date="D:20181115090000")
+    _write_report(pdfs[2019], "Released January 21, 2020")
+
+    build_release_dates(pdfs, dates_csv=str(tmp_path / "dates.csv"), ocr=False)
+
+    dates = pd.read_csv(tmp_path / "dates.csv")
+    assert dates.to_dict("list") == {"Year": [2018, 2019], "Release Date": ["2018-11-15", "2020-01-21"]}
+
+
+def test_comparison_keeps_curated_schema_and_cache_tracks_options(tmp_path):
+    pdfs = {2019: str(tmp_path / "CEI-2019.pdf")}
+    _write_report(pdfs[2019], "Released January 21, 2020")
+    original = tmp_path / "date_comparison.csv"
+    pd.DataFrame({"Year": [2019], "Original_CEI_Dates": ["2018-11-15"]}).to_csv(original, index=False)
+    cache = tmp_path / "cache"
+
+    build_release_dates(pdfs, comparison_csv=str(tmp_path / "out.csv"), cache_dir=str(cache),
+                        original_csv=str(original), ocr=False)
+    build_release_dates(pdfs, cache_dir=str(cache), ocr=False, max_pages=1)
+
+    written = pd.read_csv(tmp_path / "out.csv", dtype=str)
+    assert list(written.columns) == ["Year", "Image_Source", "Text_Source", "Original_CEI_Dates", "Consolidated_Dates"]
+    assert written.loc[0, "Original_CEI_Dates"] == "2018-11-15"
+    assert len(list(cache.iterdir())) == 2
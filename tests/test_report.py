@@ -0,0 +1,58 @@
+"""
+Test cases for headless report rendering.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from pfp.report import build_figures, render_report, roll_up_years
+
+
+def _summary():
+    rows = []
+    for year in [2018, 2019]:
+        for score_bin in ["0-9", "100-100"]:
+            for day in range(-2, 3):
+                rows.append((year, score_bin, day, 0.001 * day, 0.01, 10, 0.01 / np.sqrt(10)))
+    return pd.DataFrame(rows, columns=["year", "score_bin", "days_from_release", "avg_return",
+                                       "std_return", "count", "std_error"])
+
+
+def test_roll_up_pools_years():
+    rng = np.random.default_rng(0)
+    raw = pd.DataFrame({"year": np.repeat([2018, 2019], [7, 12]), "score_bin": "0-9",
+                        "days_from_release": 0, "RET": rng.normal(0, 0.01, 19)})
+    grouped = raw.groupby(["year", "score_bin", "days_from_release"])["RET"]
+    summary = grouped.agg(avg_return="mean", std_return="std", count="count").reset_index()
+
+    row = roll_up_years(summary).iloc[0]
+
+    assert row["count"] == 19
+    assert np.isclose(row["avg_return"], raw["RET"].mean())
+    assert np.isclose(row["std_return"], raw["RET"].std())
+
+
+def test_render_only_changed_figures(tmp_path):
+    cei = pd.DataFrame({"cei_score": [0, 5, 100, 100]})
+    event_returns = pd.DataFrame({"score_bin": ["0-9"] * 5 + ["100-100"] * 5,
+                                  "event_return": np.linspace(-0.05, 0.05, 10)})
+    figures = build_figures(_summary(), cei=cei, event_returns=event_returns)
+    assert set(figures) == {"score_distribution", "yearly_returns_2018_2019", "overall_returns",
+                            "cumulative_returns", "event_return_boxplot"}
+
+    rendered = render_report(figures, str(tmp_path), workers=2)
+
+    assert sorted(rendered) == sorted(figures)
+    for name in figures:
+        for fmt in ("png", "svg", "json"):
+            assert os.path.getsize(tmp_path / f"{name}.{fmt}") > 0
+    plotly = json.loads((tmp_path / "overall_returns.json").read_text())
+    assert {trace["name"] for trace in plotly["data"] if trace.get("showlegend")} == {"CEI 0-9", "CEI 100-100"}
+
+    assert render_report(figures, str(tmp_path), workers=1) == []
+    summary = _summary()
+    summary.loc[summary["year"] == 2019, "avg_return"] += 0.01
+    changed = render_report(build_figures(summary, cei=cei, event_returns=event_returns), str(tmp_path), workers=1)
+    assert sorted(changed) == ["cumulative_returns", "overall_returns", "yearly_returns_2018_2019"]
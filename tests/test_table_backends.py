@@ -0,0 +1,74 @@
+"""
+Test cases for the pluggable table-extraction backends.
+"""
+import os
+
+import pytest
+
+from pfp import synthetic
+from pfp.comprehensive_cei_extractor import _strategy_stream_all_pages
+from pfp.table_backends import read_tables, words_to_grid
+from pfp.table_store import read_pdf_tables
+from pfp.utils import normalize_company_name
+
+fitz = pytest.importorskip("fitz")
+
+
+def _keys(df):
+    return set(zip(df["Company"].map(normalize_company_name), df["CEI_Score"].astype(float)))
+
+
+def test_words_are_gridded_by_whitespace_gutters():
+    words = [
+        (40, 90, 200, 100, "Corporate Equality Index 2019 appendix"),  # spans the gutter
+        (40, 110, 70, 120, "Acme"), (72, 110, 90, 120, "Corp"), (300, 110, 315, 120, "100"),
+        (40, 130, 80, 140, "Initech"), (305, 130, 315, 140, "85"),
+        (40, 150, 75, 160, "Globex"), (300, 150, 315, 160, "90"),
+    ]
+
+    grid = words_to_grid(words, 612)
+
+    assert grid.values.tolist() == [
+        ["Corporate Equality Index 2019 appendix", ""],
+        ["Acme Corp", "100"],
+        ["Initech", "85"],
+        ["Globex", "90"],
+    ]
+
+
+@pytest.mark.parametrize("flavor,ruled", [("stream", False), ("lattice", True)])
+def test_words_backend_recovers_listing(tmp_path, flavor, ruled):
+    pdf = str(tmp_path / "CEI-2019.pdf")
+    labels = synthetic.write_cei_pdf(pdf, n_pages=2, rows_per_column=25, ruled=ruled, front_pages=1, seed=4)
+
+    tables = read_tables(pdf, "2-3", flavor, backend="words")
+
+    assert [t.page for t in tables] == ["2", "3"]
+    assert all(t.flavor == flavor and t.df.shape[1] >= 2 for t in tables)
+    names = [cell for t in tables for cell in t.df.iloc[:, 0]]
+    assert names[:3] == labels["Company"].tolist()[:3]
+
+
+def test_extractor_runs_on_words_backend(tmp_path):
+    pdf = str(tmp_path / "CEI-2019.pdf")
+    labels = synthetic.write_cei_pdf(pdf, n_pages=3, rows_per_column=25, seed=5)
+
+    result = _strategy_stream_all_pages(pdf, 2019, backend="words")
+
+    assert result.attrs["backend"] == "words"
+    assert len(_keys(result) & _keys(labels)) >= 0.9 * len(_keys(labels))
+
+
+def test_table_store_keys_backends_apart(tmp_path):
+    pdf = str(tmp_path / "CEI-2019.pdf")
+    synthetic.write_cei_pdf(pdf, n_pages=1, rows_per_column=10, seed=6)
+    store = tmp_path / "tables"
+
+    first = read_pdf_tables(pdf, "1", "stream", str(store), backend="words")
+    replayed = read_pdf_tables(pdf, "1", "stream", str(store), backend="words")
+
+    (name,) = os.listdir(store)
+    assert name.startswith("CEI-2019__") and name.endswith("__words-stream__1.npz")
+    assert replayed[0].df.values.tolist() == first[0].df.values.tolist()
+    with pytest.raises(ValueError, match="Unknown table backend"):
+        read_tables(pdf, "1", "stream", backend="tabula")
@@ -0,0 +1,70 @@
+"""
+Test cases for the raw table grid store.
+"""
+import pandas as pd
+
+from pfp.comprehensive_cei_extractor import _process_tables_comprehensive
+from pfp.table_store import load_tables, save_tables, table_store_path
+
+
+class _FakeTable:
+    def __init__(self, df, page, order, flavor, bbox):
+        self.df = df
+        self.page = page
+        self.order = order
+        self.flavor = flavor
+        self._bbox = bbox
+
+
+def _score_table():
+    rows = [["Company", "CEI Score"]]
+    rows += [[f"Example Holdings {i} Inc.", str(60 + i * 5)] for i in range(6)]
+    return pd.DataFrame(rows)
+
+
+def test_round_trip_preserves_grid_and_metadata(tmp_path):
+    tables = [
+        _FakeTable(_score_table(), "41", 1, "stream", (10.0, 20.0, 500.0, 700.0)),
+        _FakeTable(pd.DataFrame([["a\nb", ""], ["c", "d"]]), "42", 2, "lattice", None),
+    ]
+    path = save_tables(tables, str(tmp_path / "cei_2019__stream__all.npz"))
+
+    loaded = load_tables(path)
+
+    assert [t.page for t in loaded] == ["41", "42"]
+    assert [t.flavor for t in loaded] == ["stream", "lattice"]
+    assert loaded[0]._bbox == (10.0, 20.0, 500.0, 700.0)
+    assert loaded[1]._bbox is None
+    assert loaded[1].df.values.tolist() == [["a\nb", ""], ["c", "d"]]
+    pd.testing.assert_frame_equal(loaded[0].df, tables[0].df, check_dtype=False)
+
+
+def test_stored_tables_replay_through_extractor(tmp_path):
+    tables = [_FakeTable(_score_table(), "41", 1, "stream", None)]
+    path = save_tables(tables, str(tmp_path / "store.npz"))
+
+    result = _process_tables_comprehensive(load_tables(path), 2019)
+
+    assert len(result) == 6
+    assert result["CEI_Score"].max() == 85
+
+
+def test_store_path_changes_when_pdf_is_replaced(tmp_path):
+    pdf = tmp_path / "CEI-2019.pdf"
+    pdf.write_bytes(b"%PDF-1.4 first download")
+    first = table_store_path(str(tmp_path), str(pdf), "30-100", "stream")
+    assert table_store_path(str(tmp_path), str(pdf), "30-100", "stream") == first
+
+    pdf.write_bytes(b"%PDF-1.4 re-downloaded report")
+
+    assert table_store_path(str(tmp_path), str(pdf), "30-100", "stream") != first
+
+
+def test_replayed_table_without_page_still_contributes_rows(tmp_path):
+    tables = [_FakeTable(_score_table(), None, 1, "stream", None), _FakeTable(_score_table(), "41", 2, "stream", None)]
+    path = save_tables(tables, str(tmp_path / "store.npz"))
+
+    result = _process_tables_comprehensive(load_tables(path), 2019)
+
+    assert len(result) == 6
+    assert [t["page"] for t in result.attrs["tables"]] == [41]